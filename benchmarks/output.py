@@ -0,0 +1,107 @@
+"""Benchmark of the measurement output paths.
+
+Run with `python benchmarks/output.py [records]`. Prints the records per second of
+unbuffered JSON through click.echo, the buffered JSON writer and the buffered line
+protocol writer.
+"""
+import io
+import json
+import sys
+import time
+from typing import Callable, List
+
+import click
+
+from grand_exchanger import models, output
+
+
+def measurements(count: int) -> List[models.PriceMeasurement]:
+    """Returns measurements spread over 180 days and 40 categories.
+
+    Args:
+        count (int): Number of measurements.
+
+    Returns:
+        List[models.PriceMeasurement]: Price measurements.
+    """
+    start = 1577836800
+    categories = [models.Category(i, f"Category number {i}") for i in range(40)]
+
+    return [
+        models.PriceMeasurement(
+            models.Item(i, "Thing", categories[i % 40].name, bool(i % 2), i),
+            categories[i % 40],
+            i * 7,
+            start + i % 180 * 86400,
+        )
+        for i in range(count)
+    ]
+
+
+def echo_json(records: List[models.PriceMeasurement]) -> None:
+    """Writes records one at a time with click.echo.
+
+    Args:
+        records (List[models.PriceMeasurement]): Price measurements.
+    """
+    stream = io.StringIO()
+
+    for m in records:
+        click.echo(json.dumps(m.to_dict()), file=stream)
+
+
+def writer(format: str) -> Callable[[List[models.PriceMeasurement]], None]:
+    """Returns a benchmark function for an output writer.
+
+    Args:
+        format (str): An output format.
+
+    Returns:
+        Callable[[List[models.PriceMeasurement]], None]: The benchmark function.
+    """
+
+    def run(records: List[models.PriceMeasurement]) -> None:
+        with output.get_writer(format, io.StringIO()) as w:
+            for m in records:
+                w.write(m)
+
+    return run
+
+
+def main(count: int) -> None:
+    """Runs the benchmark.
+
+    Args:
+        count (int): Number of records per run.
+    """
+    records = measurements(count)
+    cases = [
+        ("click.echo json", echo_json),
+        ("buffered json", writer("json")),
+        ("buffered line-protocol", writer("line-protocol")),
+    ]
+
+    for name, func in cases:
+        best = min(_time(func, records) for _ in range(3))
+        print(f"{name:<24} {count / best:>12,.0f} records/s")
+
+
+def _time(
+    func: Callable[[List[models.PriceMeasurement]], None], records: list
+) -> float:
+    """Returns the duration of a single run.
+
+    Args:
+        func (Callable[[List[models.PriceMeasurement]], None]): A benchmark function.
+        records (list): Price measurements.
+
+    Returns:
+        float: Duration in seconds.
+    """
+    start = time.perf_counter()
+    func(records)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
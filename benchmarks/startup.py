@@ -0,0 +1,90 @@
+"""Benchmark of the cold start of the command line interface.
+
+Run with `python benchmarks/startup.py [runs]`. Starts a fresh interpreter per run
+that loads every command group, the way `ge poll` from cron does, and prints the
+fastest and median wall time, the slowest imports and any heavy dependencies that
+got imported. Exits with status 1 if the median exceeds the target.
+"""
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+TARGET = 0.35
+
+HEAVY = ["requests_html", "pyppeteer", "pyarrow", "numpy"]
+
+SCRIPT = """
+import sys
+from grand_exchanger import console
+for name in console.PLUGINS:
+    console.cli.get_command(None, name)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def start() -> Tuple[float, str]:
+    """Runs one cold start.
+
+    Returns:
+        Tuple[float, str]: Wall time in seconds and the heavy modules imported.
+    """
+    begin = time.perf_counter()
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SCRIPT.format(heavy=HEAVY)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return time.perf_counter() - begin, result.stdout.strip()
+
+
+def slowest_imports(count: int) -> List[Tuple[int, str]]:
+    """Returns the imports with the highest cumulative time.
+
+    Args:
+        count (int): Number of imports to return.
+
+    Returns:
+        List[Tuple[int, str]]: Cumulative microseconds and module names.
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", SCRIPT.format(heavy=HEAVY)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    imports = []
+
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.rstrip()))
+
+    return sorted(imports, reverse=True)[:count]
+
+
+def main(runs: int) -> None:
+    """Runs the benchmark.
+
+    Args:
+        runs (int): Number of cold starts.
+    """
+    results = [start() for _ in range(runs)]
+    times = [t for t, _ in results]
+    median = statistics.median(times)
+
+    print(f"fastest {min(times) * 1000:>8.1f} ms")
+    print(f"median  {median * 1000:>8.1f} ms (target {TARGET * 1000:.0f} ms)")
+    print(f"heavy imports: {results[0][1] or 'none'}")
+
+    for cumulative, name in slowest_imports(10):
+        print(f"{cumulative / 1000:>8.1f} ms {name}")
+
+    if median > TARGET:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,453 @@
+"""Benchmark suite for the decode, output and crawl hot paths.
+
+Run with `python benchmarks/suite.py [case ...] [--save]`. Microbenchmarks time the
+price and timestamp fields, graph decoding and listing, and measurement
+serialization. End to end benchmarks run `ge fetch category` and `ge poll all`
+against the stand-in for the itemdb services served by `ge serve`. Every case runs in
+a fresh interpreter, a few times to keep the best of each metric, and reports items
+and requests per second, peak RSS and peak traced allocations.
+
+Results are compared with the baseline stored in baseline.json, and the suite exits
+with status 1 if a metric is worse than the baseline by more than the tolerance.
+Without a baseline the suite refuses to run, cases missing from it are reported.
+--save stores the results as the new baseline instead.
+"""
+import argparse
+from contextlib import redirect_stdout
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.request import urlopen
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BASELINE = os.path.join(HERE, "baseline.json")
+
+TOLERANCE = 0.25
+
+RECORDS = 100000
+
+GRAPHS = 500
+
+RUNS = 3
+
+# Metrics with 1 if higher is better and -1 if lower is better.
+METRICS = {
+    "items_per_s": 1,
+    "requests_per_s": 1,
+    "peak_rss_mib": -1,
+    "allocated_mib": -1,
+}
+
+Run = Callable[[], Tuple[int, int]]
+
+
+class LineCounter:
+    """A text stream that counts the lines written to it."""
+
+    def __init__(self) -> None:
+        """Initialises the stream."""
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        """Counts the lines of written text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: Number of characters written.
+        """
+        self.lines += text.count("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        """Does nothing, nothing is buffered."""
+
+
+def fields(origin: str) -> Run:
+    """Returns a run of the price and timestamp fields.
+
+    Args:
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        Run: Deserializes formatted prices and epoch timestamps.
+    """
+    from grand_exchanger.resources.helpers import Price, TimeStamp
+
+    prices = [f"{i % 999 + 1}.{i % 10}k" for i in range(RECORDS)]
+    stamps = [str(1581638400000 + i * 86400000) for i in range(RECORDS)]
+    price, stamp = Price(), TimeStamp()
+
+    def run() -> Tuple[int, int]:
+        values = [price.deserialize(p) for p in prices]
+        values += [stamp.deserialize(s) for s in stamps]
+
+        return len(values), 0
+
+    return run
+
+
+def graph_decode(origin: str) -> Run:
+    """Returns a run of graph decoding.
+
+    Args:
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        Run: Decodes graph payloads, counting their points.
+    """
+    from grand_exchanger.resources import graph
+
+    with open(os.path.join(HERE, "..", "examples", "graph.json"), "rb") as f:
+        payload = f.read()
+
+    points = sum(len(v) for v in json.loads(payload).values())
+
+    def run() -> Tuple[int, int]:
+        graphs = [graph.decode(payload) for _ in range(GRAPHS)]
+
+        return len(graphs) * points, 0
+
+    return run
+
+
+def graph_listing(origin: str) -> Run:
+    """Returns a run of graph listing.
+
+    Args:
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        Run: Lists the daily and average prices of a graph.
+    """
+    from grand_exchanger.resources import graph
+
+    with open(os.path.join(HERE, "..", "examples", "graph.json"), "rb") as f:
+        decoded = graph.decode(f.read())
+
+    def run() -> Tuple[int, int]:
+        points = []
+
+        for _ in range(GRAPHS):
+            points += decoded.list_daily_prices()
+            points += decoded.list_average_prices()
+
+        return len(points), 0
+
+    return run
+
+
+def price_matrix(origin: str) -> Run:
+    """Returns a run of price matrix analysis.
+
+    Args:
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        Run: Builds a matrix of many graphs and computes their statistics.
+    """
+    from grand_exchanger import analysis
+    from grand_exchanger.resources import graph
+
+    with open(os.path.join(HERE, "..", "examples", "graph.json"), "rb") as f:
+        decoded = graph.decode(f.read())
+
+    def run() -> Tuple[int, int]:
+        matrix = analysis.PriceMatrix.from_graphs((i, decoded) for i in range(GRAPHS))
+        matrix.returns()
+        matrix.volatility()
+        matrix.zscores()
+
+        return matrix.daily.size + matrix.average.size, 0
+
+    return run
+
+
+def to_dict(origin: str) -> Run:
+    """Returns a run of measurement serialization.
+
+    Args:
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        Run: Converts measurements to dictionaries.
+    """
+    from grand_exchanger import models
+
+    categories = [models.Category(i, f"Category number {i}") for i in range(40)]
+    start = 1577836800
+    records = [
+        models.PriceMeasurement(
+            models.Item(i, "Thing", categories[i % 40].name, bool(i % 2), i),
+            categories[i % 40],
+            i * 7,
+            start + i % 180 * 86400,
+        )
+        for i in range(RECORDS)
+    ]
+
+    def run() -> Tuple[int, int]:
+        return len([m.to_dict() for m in records]), 0
+
+    return run
+
+
+def command(*args: str) -> Callable[[str], Run]:
+    """Returns a case that runs a command against the stand-in itemdb services.
+
+    Args:
+        args (str): The command and its arguments.
+
+    Returns:
+        Callable[[str], Run]: The case.
+    """
+
+    def case(origin: str) -> Run:
+        from grand_exchanger import console, store
+
+        def run() -> Tuple[int, int]:
+            with tempfile.TemporaryDirectory() as state:
+                os.environ["GE_STATE_DIR"] = state
+                store.reset()
+                served = _served(origin)
+                output = LineCounter()
+
+                with redirect_stdout(output):
+                    console.cli.main(
+                        ["--no-cache", "--api-url", origin, *args],
+                        standalone_mode=False,
+                    )
+
+                return output.lines, _served(origin) - served
+
+        return run
+
+    return case
+
+
+def _served(origin: str) -> int:
+    """Returns the number of requests the stand-in itemdb services have served.
+
+    Args:
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        int: Number of requests.
+    """
+    with urlopen(f"{origin}/stats") as response:  # noqa: S310
+        return json.load(response)["requests"]
+
+
+# Cases by name, with the number of timed runs.
+CASES: Dict[str, Tuple[Callable[[str], Run], int]] = {
+    "fields": (fields, 5),
+    "graph-decode": (graph_decode, 5),
+    "graph-listing": (graph_listing, 5),
+    "price-matrix": (price_matrix, 5),
+    "to-dict": (to_dict, 5),
+    "fetch-category": (command("fetch", "category", "1"), 1),
+    "poll-all": (command("poll", "all"), 1),
+}
+
+
+def measure(name: str, origin: str) -> Dict[str, float]:
+    """Measures a case in this interpreter.
+
+    The fastest of the timed runs gives the rates, and one more run with tracing
+    gives the peak of allocated memory. Microbenchmarks keep what they produce until
+    the end of a run, so the peak includes every object they allocate per item.
+
+    Args:
+        name (str): The case.
+        origin (str): Origin of the stand-in itemdb services.
+
+    Returns:
+        Dict[str, float]: The metrics.
+    """
+    case, repeat = CASES[name]
+    run = case(origin)
+    best = math.inf
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items, requests = run()
+        best = min(best, time.perf_counter() - start)
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    run()
+    _, allocated = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "items_per_s": items / best,
+        "requests_per_s": requests / best,
+        "peak_rss_mib": rss / 1024 if sys.platform != "darwin" else rss / 2**20,
+        "allocated_mib": allocated / 2**20,
+    }
+
+
+def best(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    """Returns the best value of every metric over several runs of a case.
+
+    Args:
+        runs (List[Dict[str, float]]): The metrics of each run.
+
+    Returns:
+        Dict[str, float]: The highest or lowest value of each metric.
+    """
+    return {
+        metric: max(sign * run[metric] for run in runs) * sign
+        for metric, sign in METRICS.items()
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Prints results next to the baseline and returns the regressions.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): Metrics by case.
+        baseline (Dict[str, Dict[str, float]]): Baseline metrics by case.
+        tolerance (float): Fraction by which a metric may be worse.
+
+    Returns:
+        List[str]: The regressed metrics as case/metric.
+    """
+    regressions = []
+
+    for name, metrics in results.items():
+        if name not in baseline:
+            print(f"{name:<16} no baseline", file=sys.stderr)
+
+        for metric, sign in METRICS.items():
+            value = metrics[metric]
+            base: Optional[float] = baseline.get(name, {}).get(metric)
+
+            if not value and not base:
+                continue
+
+            line = f"{name:<16} {metric:<16} {value:>14,.1f}"
+
+            if base:
+                change = value / base - 1
+                regressed = sign * change < -tolerance
+                line += f" {base:>14,.1f} {change:>+8.1%}"
+                line += " REGRESSION" if regressed else ""
+
+                if regressed:
+                    regressions.append(f"{name}/{metric}")
+
+            print(line)
+
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    """Loads the baseline metrics.
+
+    Args:
+        path (str): The baseline file.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Baseline metrics by case, empty if there is no
+            baseline yet.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv: List[str]) -> None:
+    """Runs the suite.
+
+    Args:
+        argv (List[str]): Command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help=f"Cases to run: {', '.join(CASES)}")
+    parser.add_argument("--save", action="store_true", help="Store a new baseline")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument(
+        "--runs", type=int, default=RUNS, help="Interpreters per case, best is kept"
+    )
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--items", type=int, default=960, help="Items in all")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--api-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    for name in args.cases:
+        if name not in CASES:
+            parser.error(f"unknown case {name!r}")
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.api_url)))
+        return
+
+    if not args.save and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}, store one with --save")
+
+    standin = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from grand_exchanger.console import cli; cli()",
+            "serve",
+            "--port=0",
+            f"--categories={args.categories}",
+            f"--items={args.items}",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    try:
+        origin = standin.stdout.readline().strip()  # type: ignore
+        results = {}
+
+        for name in args.cases or CASES:
+            runs = []
+
+            for _ in range(args.runs):
+                child = subprocess.run(  # noqa: S603
+                    [sys.executable, __file__, "--child", name, "--api-url", origin],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                runs.append(json.loads(child.stdout.splitlines()[-1]))
+
+            results[name] = best(runs)
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+    elif regressions:
+        print(f"regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -25,7 +25,7 @@ def install_with_constraints(session, *args, **kwargs):
 def tests(session):
     """Run the test suite."""
     args = session.posargs or ["--cov", "-m", "not e2e"]
-    session.run("poetry", "install", external=True)
+    session.run("poetry", "install", "--extras", "parquet analysis", external=True)
     session.run("pytest", *args)
 
 
@@ -61,3 +61,10 @@ def mypy(session):
     args = session.posargs or locations
     install_with_constraints(session, "mypy")
     session.run("mypy", *args)
+
+
+@nox.session(python=["3.8"])
+def benchmarks(session):
+    """Run the benchmark suite and compare it with the stored baseline."""
+    session.run("poetry", "install", external=True)
+    session.run("python", "benchmarks/suite.py", *session.posargs)
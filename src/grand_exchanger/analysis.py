@@ -0,0 +1,287 @@
+"""Module for vectorized price analysis.
+
+numpy is only imported when a matrix is built or loaded, so the other commands do
+not depend on it.
+"""
+from __future__ import annotations
+
+from types import ModuleType
+from typing import Iterable, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+    from grand_exchanger.resources.graph import Graph
+
+
+WINDOW = 30
+
+
+def get_numpy() -> ModuleType:
+    """Imports numpy.
+
+    Returns:
+        ModuleType: The numpy module.
+
+    Raises:
+        ImportError: numpy is not installed.
+    """
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError("Price analysis requires numpy") from error
+
+    return numpy
+
+
+class PriceMatrix:
+    """Daily and averaged prices of many items as items by days matrices.
+
+    Rows are items and columns are game days, in epoch seconds. Days on which an item
+    has no price are NaN. The matrices are filled straight from the integer arrays of
+    the decoded price series, so no objects are created per point.
+    """
+
+    def __init__(
+        self,
+        item_ids: np.ndarray,
+        days: np.ndarray,
+        daily: np.ndarray,
+        average: np.ndarray,
+    ) -> None:
+        """Initialises the matrix.
+
+        Args:
+            item_ids (np.ndarray): Item IDs of the rows.
+            days (np.ndarray): Ascending epoch seconds of the columns.
+            daily (np.ndarray): Daily prices.
+            average (np.ndarray): Averaged daily prices.
+        """
+        self.item_ids = item_ids
+        self.days = days
+        self.daily = daily
+        self.average = average
+
+    @classmethod
+    def from_graphs(cls, graphs: Iterable[Tuple[int, Graph]]) -> PriceMatrix:
+        """Returns a matrix for the price graphs of items.
+
+        Args:
+            graphs (Iterable[Tuple[int, Graph]]): Item IDs with their price graph.
+
+        Returns:
+            PriceMatrix: The matrix, with the days of all graphs.
+        """
+        numpy = get_numpy()
+        item_ids: List[int] = []
+        daily_epochs: List[np.ndarray] = []
+        daily_prices: List[np.ndarray] = []
+        average_epochs: List[np.ndarray] = []
+        average_prices: List[np.ndarray] = []
+
+        for item_id, graph in graphs:
+            item_ids.append(item_id)
+            daily_epochs.append(
+                numpy.frombuffer(graph.daily_series.epochs, numpy.int64)
+            )
+            daily_prices.append(
+                numpy.frombuffer(graph.daily_series.prices, numpy.int64)
+            )
+            average_epochs.append(
+                numpy.frombuffer(graph.average_series.epochs, numpy.int64)
+            )
+            average_prices.append(
+                numpy.frombuffer(graph.average_series.prices, numpy.int64)
+            )
+
+        epochs = numpy.unique(
+            numpy.concatenate([*daily_epochs, *average_epochs, empty()])
+        )
+
+        return cls(
+            numpy.array(item_ids, numpy.int64),
+            epochs // 1000,
+            fill(epochs, daily_epochs, daily_prices),
+            fill(epochs, average_epochs, average_prices),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> PriceMatrix:
+        """Loads a matrix saved with save.
+
+        Args:
+            path (str): The .npz file.
+
+        Returns:
+            PriceMatrix: The matrix.
+        """
+        with get_numpy().load(path) as data:
+            return cls(data["item_ids"], data["days"], data["daily"], data["average"])
+
+    def save(self, path: str) -> None:
+        """Saves the matrix as a compressed .npz file.
+
+        Args:
+            path (str): The .npz file.
+        """
+        get_numpy().savez_compressed(
+            path,
+            item_ids=self.item_ids,
+            days=self.days,
+            daily=self.daily,
+            average=self.average,
+        )
+
+    def __len__(self) -> int:
+        """Returns the number of items.
+
+        Returns:
+            int: Number of items.
+        """
+        return len(self.item_ids)
+
+    def returns(self) -> np.ndarray:
+        """Returns the daily returns of all items.
+
+        Returns:
+            np.ndarray: Relative price changes from the day before, NaN on the first
+                day and next to missing or zero prices.
+        """
+        numpy = get_numpy()
+        returns = numpy.full(self.daily.shape, numpy.nan)
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            returns[:, 1:] = self.daily[:, 1:] / self.daily[:, :-1] - 1
+
+        returns[~numpy.isfinite(returns)] = numpy.nan
+
+        return returns
+
+    def volatility(self, window: int = WINDOW) -> np.ndarray:
+        """Returns the rolling volatility of the daily returns of all items.
+
+        Args:
+            window (int): Number of returns per window.
+
+        Returns:
+            np.ndarray: Sample standard deviations of the returns in the window
+                ending on each day.
+        """
+        return rolling(self.returns(), window)[1]
+
+    def zscores(self, window: int = WINDOW) -> np.ndarray:
+        """Returns how unusual the daily prices of all items are.
+
+        Args:
+            window (int): Number of prices per window.
+
+        Returns:
+            np.ndarray: Distances of each price from the mean of the window ending on
+                its day, in standard deviations, NaN for flat windows.
+        """
+        numpy = get_numpy()
+        mean, std = rolling(self.daily, window)
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            zscores = (self.daily - mean) / std
+
+        zscores[~numpy.isfinite(zscores)] = numpy.nan
+
+        return zscores
+
+
+def empty() -> np.ndarray:
+    """Returns an empty series.
+
+    Returns:
+        np.ndarray: An empty array of 64-bit integers.
+    """
+    numpy = get_numpy()
+
+    return numpy.empty(0, numpy.int64)
+
+
+def fill(
+    epochs: np.ndarray, rows: List[np.ndarray], prices: List[np.ndarray]
+) -> np.ndarray:
+    """Places the price series of items in a matrix.
+
+    Args:
+        epochs (np.ndarray): Ascending epoch milliseconds of the columns.
+        rows (List[np.ndarray]): Epoch milliseconds of the points of each item.
+        prices (List[np.ndarray]): Prices of the points of each item.
+
+    Returns:
+        np.ndarray: Prices by item and day, NaN where an item has no point.
+    """
+    numpy = get_numpy()
+    matrix = numpy.full((len(rows), len(epochs)), numpy.nan)
+    lengths = numpy.fromiter(map(len, rows), numpy.int64, len(rows))
+    points = numpy.concatenate([*rows, empty()])
+
+    matrix[
+        numpy.repeat(numpy.arange(len(rows)), lengths),
+        numpy.searchsorted(epochs, points),
+    ] = numpy.concatenate([*prices, empty()])
+
+    return matrix
+
+
+def rolling(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the rolling mean and sample standard deviation along the rows.
+
+    The statistics are computed for all rows at once with one array operation per
+    position in the window, in two passes to stay accurate for large prices.
+
+    Args:
+        values (np.ndarray): A matrix.
+        window (int): Number of values per window, at least 2.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Means and standard deviations of the window
+            ending on each column, NaN until the window is full or where it contains
+            NaN.
+
+    Raises:
+        ValueError: The window is shorter than 2.
+    """
+    if window < 2:
+        raise ValueError("The window must span at least 2 values")
+
+    numpy = get_numpy()
+    mean = numpy.full(values.shape, numpy.nan)
+    std = numpy.full(values.shape, numpy.nan)
+    count = values.shape[1] - window + 1
+
+    if count > 0:
+        windows = [values[:, i : i + count] for i in range(window)]
+        mean[:, window - 1 :] = sum(windows) / window
+        deviations = sum((w - mean[:, window - 1 :]) ** 2 for w in windows)
+        std[:, window - 1 :] = numpy.sqrt(deviations / (window - 1))
+
+    return mean, std
+
+
+def latest(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the last value of each row that is not NaN.
+
+    Args:
+        values (np.ndarray): A matrix.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The column of the last value of each row,
+            or -1, and the value, or NaN.
+    """
+    numpy = get_numpy()
+
+    if not values.shape[1]:
+        return numpy.full(len(values), -1), numpy.full(len(values), numpy.nan)
+
+    valid = ~numpy.isnan(values)
+    columns = values.shape[1] - 1 - numpy.argmax(valid[:, ::-1], axis=1)
+    columns[~valid.any(axis=1)] = -1
+    found = numpy.where(
+        columns >= 0, values[numpy.arange(len(values)), columns], numpy.nan
+    )
+
+    return columns, found
@@ -1 +1,345 @@
 """Module for CLI plugins."""
+from functools import wraps
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import click
+
+from grand_exchanger import crawl, exceptions, output, planner, store
+from grand_exchanger.models import Category
+
+
+class ShardType(click.ParamType):
+    """Parameter type for shards of the form ``k/n``."""
+
+    name = "k/n"
+
+    def convert(
+        self,
+        value: Any,
+        param: Optional[click.Parameter],
+        ctx: Optional[click.Context],
+    ) -> planner.Shard:
+        """Converts a value to a shard.
+
+        Args:
+            value (Any): The value.
+            param (Optional[click.Parameter]): The parameter.
+            ctx (Optional[click.Context]): The context.
+
+        Returns:
+            planner.Shard: The shard.
+        """
+        try:
+            shard = planner.Shard.parse(value)
+        except ValueError as error:
+            self.fail(str(error), param, ctx)
+
+        return shard
+
+
+def parse_ids(text: str) -> Tuple[int, ...]:
+    """Parses IDs separated by whitespace or commas.
+
+    Args:
+        text (str): The IDs.
+
+    Returns:
+        Tuple[int, ...]: The IDs.
+
+    Raises:
+        BadParameter: A value is not an integer.
+    """
+    try:
+        return tuple(int(i) for i in text.replace(",", " ").split())
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="IDS") from error
+
+
+def ids_argument(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds an argument for one or more IDs to a command.
+
+    Without IDs on the command line, they are read from stdin, so the IDs of a
+    watchlist can be piped into a single run.
+
+    Args:
+        f (Callable[..., Any]): A command function.
+
+    Returns:
+        Callable[..., Any]: The command function with an IDs argument.
+    """
+
+    @wraps(f)
+    def read(*args: Any, **kwargs: Any) -> Any:
+        if not kwargs["ids"]:
+            stdin = click.get_text_stream("stdin")
+
+            if not stdin.isatty():
+                kwargs["ids"] = parse_ids(stdin.read())
+
+        if not kwargs["ids"]:
+            raise click.UsageError("Missing IDs, give them as arguments or on stdin")
+
+        return f(*args, **kwargs)
+
+    return click.argument("ids", type=int, nargs=-1)(read)
+
+
+def checkpoint_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds options for resuming an interrupted crawl to a command.
+
+    Args:
+        f (Callable[..., Any]): A command function.
+
+    Returns:
+        Callable[..., Any]: The command function with checkpoint options.
+    """
+    f = click.option(
+        "--checkpoint-interval",
+        type=click.FloatRange(min=0),
+        default=store.checkpoint.INTERVAL,
+        show_default=True,
+        help="Maximum seconds between checkpoints",
+    )(f)
+    f = click.option(
+        "--resume",
+        is_flag=True,
+        help="Continue the last crawl of this command if it was interrupted",
+    )(f)
+
+    return f
+
+
+def open_checkpoint(
+    command: str,
+    shard: Optional[planner.Shard],
+    resume: bool,
+    interval: float,
+    settings: Dict[str, Any],
+) -> store.Checkpoint:
+    """Starts the checkpoint of a crawl, or continues that of an interrupted one.
+
+    An interrupted crawl is only continued with the same settings, as its items
+    would otherwise be skipped although they were output differently. Exits with a
+    status code of 1 if the settings changed.
+
+    Args:
+        command (str): The command running the crawl.
+        shard (Optional[planner.Shard]): The shard of the crawl.
+        resume (bool): Continue the checkpoint of an interrupted crawl.
+        interval (float): Maximum seconds between checkpoints.
+        settings (Dict[str, Any]): The options that determine the output.
+
+    Returns:
+        store.Checkpoint: The checkpoint.
+    """
+    key = command if shard is None else f"{command} {shard.index} of {shard.count}"
+    encoded = json.dumps(settings, default=str, sort_keys=True)
+    checkpoint = store.Checkpoint(key, encoded, interval=interval)
+
+    if not resume:
+        checkpoint.start()
+    else:
+        try:
+            done = checkpoint.resume()
+        except exceptions.CheckpointMismatchException as error:
+            changed = ", ".join(changed_settings(json.loads(encoded), error.args[0]))
+            click.secho(
+                f"The interrupted crawl had other settings ({changed}), "
+                "run it again without --resume to start over",
+                fg="red",
+                err=True,
+            )
+            sys.exit(1)
+
+        click.secho(
+            f"Resuming after {done} items" if done else "Nothing to resume",
+            fg="yellow",
+            err=True,
+        )
+
+    return checkpoint
+
+
+def changed_settings(settings: Dict[str, Any], previous: str) -> List[str]:
+    """Returns the names of settings that differ from those of another crawl.
+
+    Args:
+        settings (Dict[str, Any]): The settings of this crawl.
+        previous (str): The JSON encoded settings of the other crawl, empty for
+            journals that predate settings.
+
+    Returns:
+        List[str]: Names of the settings that differ, in order.
+    """
+    other = json.loads(previous) if previous else {}
+
+    return sorted(
+        name for name in {*settings, *other} if settings.get(name) != other.get(name)
+    )
+
+
+def save_checkpoint(
+    checkpoint: store.Checkpoint,
+    writer: output.Writer,
+    item_id: int,
+    watermarks: Optional[store.Watermarks] = None,
+) -> None:
+    """Records that the output of an item is complete.
+
+    Items are journaled whenever the writer has written its buffer, so the
+    checkpoint never lists output that could still be lost. At each interval, the
+    buffer is written and the watermarks are saved along with the checkpoint.
+
+    Args:
+        checkpoint (store.Checkpoint): The checkpoint of the crawl.
+        writer (output.Writer): The writer for measurements.
+        item_id (int): The item ID.
+        watermarks (Optional[store.Watermarks]): Watermarks of emitted points.
+    """
+    checkpoint.add(item_id)
+
+    if checkpoint.due():
+        writer.flush()
+
+        if watermarks is not None:
+            watermarks.save()
+
+    if not writer.pending:
+        checkpoint.save()
+
+
+def crawl_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds options for configuring the crawl engine to a command.
+
+    Args:
+        f (Callable[..., Any]): A command function.
+
+    Returns:
+        Callable[..., Any]: The command function with crawl options.
+    """
+    f = click.option(
+        "--ordered/--unordered",
+        default=True,
+        show_default=True,
+        help="Keep the output order of a sequential crawl",
+    )(f)
+    f = click.option(
+        "--concurrency",
+        "-c",
+        type=click.IntRange(min=1),
+        default=crawl.CONCURRENCY,
+        show_default=True,
+        help="Maximum number of requests in flight",
+    )(f)
+
+    return f
+
+
+def output_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds options for the output format and destination to a command.
+
+    Stream formats are written to stdout, dataset formats to the destination given
+    with --output.
+
+    Args:
+        f (Callable[..., Any]): A command function.
+
+    Returns:
+        Callable[..., Any]: The command function with output options.
+    """
+
+    @wraps(f)
+    def check(*args: Any, **kwargs: Any) -> Any:
+        output_format = kwargs["output_format"]
+
+        if output_format in output.DATASET_WRITERS and kwargs["output_path"] is None:
+            raise click.UsageError(f"The {output_format} format requires --output")
+
+        if output_format in output.WRITERS and kwargs["output_path"] is not None:
+            raise click.UsageError(f"The {output_format} format is written to stdout")
+
+        return f(*args, **kwargs)
+
+    command = click.option(
+        "--output",
+        "-o",
+        "output_path",
+        help=(
+            "Directory or URI of dataset formats, such as s3://bucket/prefix, or the "
+            "InfluxDB write URL, such as http://localhost:8086/write?db=prices"
+        ),
+    )(check)
+    command = click.option(
+        "--format",
+        "-f",
+        "output_format",
+        type=click.Choice(sorted({**output.WRITERS, **output.DATASET_WRITERS})),
+        default="json",
+        show_default=True,
+        help="Output format",
+    )(command)
+
+    return command
+
+
+def shard_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds options for splitting a crawl over several nodes to a command.
+
+    Args:
+        f (Callable[..., Any]): A command function.
+
+    Returns:
+        Callable[..., Any]: The command function with shard options.
+    """
+    f = click.option(
+        "--plan",
+        is_flag=True,
+        help="Show the estimated requests of every shard and exit",
+    )(f)
+    f = click.option(
+        "--shard",
+        type=ShardType(),
+        help="Only crawl shard k of n shards of about the same number of requests",
+    )(f)
+
+    return f
+
+
+def select_shard(
+    categories: List[Category],
+    shard: Optional[planner.Shard],
+    plan: bool,
+    cost: Callable[[planner.Page], int],
+) -> Tuple[List[Category], Optional[crawl.Pages]]:
+    """Restricts a crawl to a shard, or shows the plan of all shards and exits.
+
+    Args:
+        categories (List[Category]): The categories of the whole crawl.
+        shard (Optional[planner.Shard]): The shard to crawl, or None for everything.
+        plan (bool): Show the plan instead of crawling.
+        cost (Callable[[planner.Page], int]): Returns the number of requests for a
+            page.
+
+    Returns:
+        Tuple[List[Category], Optional[crawl.Pages]]: The categories to crawl, and
+            their pages if only a part of them is crawled.
+    """
+    if plan:
+        count = shard.count if shard is not None else 1
+        parts = planner.partition(planner.plan_pages(categories), count, cost)
+
+        for index, part in enumerate(parts, 1):
+            click.echo(
+                f"shard {index}/{count}: {len(part)} pages, "
+                f"{sum(page.items for page in part)} items, "
+                f"{sum(map(cost, part))} requests"
+            )
+
+        click.get_current_context().exit()
+
+    if shard is None:
+        return categories, None
+
+    return planner.plan_shard(categories, shard, cost)
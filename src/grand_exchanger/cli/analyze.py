@@ -0,0 +1,164 @@
+"""Module for the analyze command group."""
+from dataclasses import dataclass
+import json
+import math
+import sys
+from typing import Dict, Iterator, Optional, Tuple, TYPE_CHECKING
+
+
+import click
+
+
+from grand_exchanger import analysis, crawl, exceptions, models
+from grand_exchanger.cli import crawl_options, ids_argument
+from grand_exchanger.timestamps import format_epoch
+
+if TYPE_CHECKING:  # pragma: no cover
+    from grand_exchanger.resources.graph import Graph
+
+
+@dataclass
+class Settings:
+    """Represents the settings of an analysis."""
+
+    window: int
+    save_path: Optional[str]
+
+
+@click.group()
+@click.option(
+    "--window",
+    type=click.IntRange(min=2),
+    default=analysis.WINDOW,
+    show_default=True,
+    help="Days per rolling window of volatility and z-scores",
+)
+@click.option(
+    "--save",
+    "save_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Also save the price matrices to a .npz file",
+)
+@click.pass_context
+def cli(ctx: click.Context, window: int, save_path: Optional[str]) -> None:
+    """Analyzes the price histories of many items at once.
+
+    The daily and averaged prices of all items are loaded into items by days
+    matrices. For every item, its latest price is output as JSON with its daily
+    return, the volatility of its returns and the z-score of its price over the
+    rolling window. Requires numpy.
+
+    Args:
+        ctx (click.Context): A context object
+        window (int): Days per rolling window.
+        save_path (Optional[str]): A .npz file for the price matrices.
+    """
+    try:
+        analysis.get_numpy()
+    except ImportError as error:
+        click.secho(str(error), fg="red", err=True)
+        sys.exit(1)
+
+    ctx.obj = Settings(window, save_path)
+
+
+def report(
+    settings: Settings, graphs: Iterator[Tuple[models.Category, models.Item, "Graph"]]
+) -> None:
+    """Outputs the latest statistics of every item.
+
+    Args:
+        settings (Settings): The settings of the analysis.
+        graphs (Iterator[Tuple[models.Category, models.Item, Graph]]): Items with
+            their category and price graph.
+    """
+    labels: Dict[int, Tuple[str, str]] = {}
+
+    def entries() -> Iterator[Tuple[int, "Graph"]]:
+        for category, item, graph in graphs:
+            labels[item.id] = item.name, category.name
+            yield item.id, graph
+
+    matrix = analysis.PriceMatrix.from_graphs(entries())
+
+    if settings.save_path is not None:
+        matrix.save(settings.save_path)
+
+    columns, prices = analysis.latest(matrix.daily)
+    rows = range(len(matrix))
+    averages = matrix.average[rows, columns]
+    statistics = {
+        "return": matrix.returns()[rows, columns],
+        "volatility": matrix.volatility(settings.window)[rows, columns],
+        "zscore": matrix.zscores(settings.window)[rows, columns],
+    }
+
+    for row, item_id in enumerate(matrix.item_ids.tolist()):
+        if columns[row] < 0:
+            continue
+
+        name, category = labels[item_id]
+        record = {
+            "item_id": item_id,
+            "name": name,
+            "category": category,
+            "time": format_epoch(int(matrix.days[columns[row]])),
+            "price": int(prices[row]),
+            "average": None if math.isnan(averages[row]) else int(averages[row]),
+        }
+
+        for key, values in statistics.items():
+            record[key] = to_json(float(values[row]))
+
+        click.echo(json.dumps(record))
+
+
+def to_json(value: float) -> Optional[float]:
+    """Returns a statistic as a JSON value.
+
+    Args:
+        value (float): A statistic.
+
+    Returns:
+        Optional[float]: The statistic, or None if it is NaN.
+    """
+    return None if math.isnan(value) else value
+
+
+@cli.command("category")
+@ids_argument
+@crawl_options
+@click.pass_obj
+def category(
+    settings: Settings, ids: Tuple[int, ...], concurrency: int, ordered: bool
+) -> None:
+    """Analyzes the items of these categories.
+
+    Args:
+        settings (Settings): The settings of the analysis.
+        ids (Tuple[int, ...]): Valid category IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the order of a sequential crawl.
+    """
+    try:
+        categories = [models.Category.get(i) for i in dict.fromkeys(ids)]
+        engine = crawl.CrawlEngine(concurrency, ordered)
+        report(settings, engine.graphs(categories))
+    except exceptions.NoSuchCategoryException:
+        click.secho("Invalid category", fg="red")
+        sys.exit(1)
+
+
+@cli.command("all")
+@crawl_options
+@click.pass_obj
+def all(settings: Settings, concurrency: int, ordered: bool) -> None:
+    """Analyzes all items.
+
+    Args:
+        settings (Settings): The settings of the analysis.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the order of a sequential crawl.
+    """
+    engine = crawl.CrawlEngine(concurrency, ordered)
+    report(settings, engine.graphs(models.Category.get_categories()))
@@ -1,36 +1,54 @@
 """Module for the fetch command group."""
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import json
+from functools import partial
 import sys
+from typing import Iterable, List, Optional, Tuple
 
 
 import click
 
 
-from grand_exchanger import __version__, exceptions, models
+from grand_exchanger import (
+    __version__,
+    crawl,
+    exceptions,
+    models,
+    output,
+    planner,
+    store,
+)
+from grand_exchanger.cli import (
+    checkpoint_options,
+    crawl_options,
+    ids_argument,
+    open_checkpoint,
+    output_options,
+    save_checkpoint,
+    select_shard,
+    shard_options,
+)
+from grand_exchanger.models.prefetching import prefetch
+from grand_exchanger.timestamps import to_epoch
 
 
 @dataclass
 class DateRange:
-    """Represents a date range."""
+    """Represents a date range in epoch seconds."""
 
-    start: datetime
-    end: datetime
+    start: int
+    end: int
 
-    def contains(self, dt: datetime) -> bool:
-        """Returns whether or not a given datetime is in range.
+    def contains(self, epoch: int) -> bool:
+        """Returns whether or not a given time is in range.
 
         Args:
-            dt (datetime): A datetime
+            epoch (int): Epoch seconds.
 
         Returns:
             bool: True if in the date range, False otherwise.
         """
-        if dt >= self.start and dt < self.end:
-            return True
-        else:
-            return False
+        return self.start <= epoch < self.end
 
 
 @click.group()
@@ -60,77 +78,279 @@ def cli(ctx: click.Context, start: datetime, final: datetime, date: datetime) ->
 
     if not date:
         ctx.obj = DateRange(
-            start if start else datetime.now() - timedelta(days=1000),
-            final if final else datetime.now(),
+            to_epoch(start if start else datetime.now() - timedelta(days=1000)),
+            to_epoch(final if final else datetime.now()),
         )
     else:
-        ctx.obj = DateRange(date, date + timedelta(days=1))
+        ctx.obj = DateRange(to_epoch(date), to_epoch(date + timedelta(days=1)))
+
+
+def emit(
+    category: models.Category,
+    item: models.Item,
+    prices: Iterable[Tuple[int, int]],
+    writer: output.Writer,
+    watermarks: Optional[store.Watermarks],
+) -> None:
+    """Outputs the price measurements of an item.
+
+    Args:
+        category (models.Category): The category of the item.
+        item (models.Item): An item.
+        prices (Iterable[Tuple[int, int]]): Daily price points of the item in the
+            date range, in epoch seconds.
+        writer (output.Writer): The writer for measurements.
+        watermarks (Optional[store.Watermarks]): Watermarks of emitted points, or
+            None to emit all points.
+    """
+    latest: Optional[Tuple[int, int]] = None
+
+    for epoch, price in prices:
+        if watermarks is not None:
+            if not watermarks.is_new(item.id, epoch, price):
+                continue
+
+            if latest is None or epoch > latest[0]:
+                latest = epoch, price
+
+        writer.write(models.PriceMeasurement(item, category, price, epoch))
+
+    if watermarks is not None:
+        if latest is not None:
+            watermarks.advance(item.id, *latest)
+
+        watermarks.set_listed(item.id, item.price)
+
+
+def is_current(watermarks: Optional[store.Watermarks], item: models.Item) -> bool:
+    """Returns whether the price history of an item can be skipped.
+
+    Args:
+        watermarks (Optional[store.Watermarks]): Watermarks of emitted points.
+        item (models.Item): An item.
+
+    Returns:
+        bool: True if nothing new was traded since the last emitted point.
+    """
+    return watermarks is not None and watermarks.is_current(item.id, item.price)
+
+
+def is_skipped(
+    checkpoint: store.Checkpoint,
+    watermarks: Optional[store.Watermarks],
+    item: models.Item,
+) -> bool:
+    """Returns whether an item can be skipped by a resumable crawl.
+
+    Args:
+        checkpoint (store.Checkpoint): The checkpoint of the crawl.
+        watermarks (Optional[store.Watermarks]): Watermarks of emitted points.
+        item (models.Item): An item.
+
+    Returns:
+        bool: True if the item was output before the crawl was interrupted, or
+            nothing new was traded since the last emitted point.
+    """
+    return item.id in checkpoint or is_current(watermarks, item)
+
+
+incremental_option = click.option(
+    "--incremental/--full",
+    default=False,
+    show_default=True,
+    help="Only output points newer than those of previous incremental runs",
+)
 
 
 @cli.command("item")
-@click.argument("id", type=int, required=True)
+@ids_argument
+@crawl_options
+@incremental_option
+@output_options
 @click.pass_obj
-def item(interval: DateRange, id: int) -> None:
-    """Output price measurements for this item in the date range.
+def item(
+    interval: DateRange,
+    ids: Tuple[int, ...],
+    concurrency: int,
+    ordered: bool,
+    incremental: bool,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
+    """Output price measurements for these items in the date range.
+
+    Items are looked up first, then their price histories are requested
+    concurrently.
 
     Args:
         interval (DateRange): A date range.
-        id (int): A valid item ID.
+        ids (Tuple[int, ...]): Valid item IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Output items in the order of their IDs.
+        incremental (bool): Only output points that were not output before.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
     """
+    watermarks = store.Watermarks() if incremental else None
+    invalid = False
+
+    def get_prices(item: models.Item) -> Tuple[models.Item, List[Tuple[int, int]]]:
+        return item, list(item.get_price_points(interval.start, interval.end))
+
     try:
-        item = models.Item.get(id)
-        category = models.Category.get_category_for_item(item)
+        items = []
 
-        for dt, price in item.get_historical_prices():
-            if interval.contains(dt):
-                measurement = models.PriceMeasurement(item, category, price, dt)
-                click.echo(json.dumps(measurement.to_dict()))
+        for item_id, item in models.Item.get_many(
+            ids, live=incremental, concurrency=concurrency
+        ):
+            if item is None:
+                click.secho(f"Invalid item {item_id}", fg="red", err=True)
+                invalid = True
+            elif not is_current(watermarks, item):
+                items.append(item)
 
-    except exceptions.NoSuchItemException:
-        click.secho("Invalid item", fg="red")
+        with output.get_writer(output_format, destination=output_path) as writer:
+            for item, prices in prefetch(get_prices, items, concurrency, ordered):
+                category = models.Category.get_category_for_item(item)
+                emit(category, item, prices, writer, watermarks)
+
+    finally:
+        if watermarks is not None:
+            watermarks.save()
+
+    if invalid:
         sys.exit(1)
 
 
 @cli.command("category")
-@click.argument("id", type=int, required=True)
+@ids_argument
+@crawl_options
+@incremental_option
+@output_options
 @click.pass_obj
-def category(interval: DateRange, id: int) -> None:
-    """Output price measurements for items in this category in the date range.
+def category(
+    interval: DateRange,
+    ids: Tuple[int, ...],
+    concurrency: int,
+    ordered: bool,
+    incremental: bool,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
+    """Output price measurements for items in these categories in the date range.
 
     Args:
         interval (DateRange): A date range.
-        id (int): A valid category ID.
+        ids (Tuple[int, ...]): Valid category IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the output order of a sequential crawl.
+        incremental (bool): Only output points that were not output before.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
     """
+    watermarks = store.Watermarks() if incremental else None
+
     try:
-        category = models.Category.get(id)
+        engine = crawl.CrawlEngine(concurrency, ordered)
 
-        for item in category.get_items():
-            for dt, price in item.get_historical_prices():
-                if interval.contains(dt):
-                    measurement = models.PriceMeasurement(item, category, price, dt)
-                    click.echo(json.dumps(measurement.to_dict()))
+        with output.get_writer(output_format, destination=output_path) as writer:
+            for category, item, prices in engine.prices(
+                [models.Category.get(i) for i in dict.fromkeys(ids)],
+                partial(is_current, watermarks),
+                interval.start,
+                interval.end,
+            ):
+                emit(category, item, prices, writer, watermarks)
 
     except exceptions.NoSuchCategoryException:
         click.secho("Invalid category", fg="red")
         sys.exit(1)
 
+    finally:
+        if watermarks is not None:
+            watermarks.save()
+
 
 @cli.command("all")
+@crawl_options
+@shard_options
+@checkpoint_options
+@incremental_option
+@output_options
 @click.pass_obj
-def all(interval: DateRange) -> None:
+def all(
+    interval: DateRange,
+    concurrency: int,
+    ordered: bool,
+    shard: Optional[planner.Shard],
+    plan: bool,
+    resume: bool,
+    checkpoint_interval: float,
+    incremental: bool,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
     """Output price measurements for all items in the date range.
 
+    The crawl is checkpointed, so an interrupted crawl can be resumed without
+    outputting any item again. It is only resumed with the same dates, output and
+    incremental options. Dates are compared as given, so a crawl up to today can be
+    resumed on a later day.
+
     Args:
         interval (DateRange): A date range.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the output order of a sequential crawl.
+        shard (Optional[planner.Shard]): Only output the items of this shard.
+        plan (bool): Show the estimated requests of every shard instead.
+        resume (bool): Continue the last crawl if it was interrupted.
+        checkpoint_interval (float): Maximum seconds between checkpoints.
+        incremental (bool): Only output points that were not output before.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
     """
+    categories, pages = select_shard(
+        list(models.Category.get_categories()), shard, plan, planner.price_requests
+    )
+    watermarks = store.Watermarks() if incremental else None
+    checkpoint = open_checkpoint(
+        "fetch all",
+        shard,
+        resume,
+        checkpoint_interval,
+        {
+            **click.get_current_context().find_root().params,
+            "incremental": incremental,
+            "format": output_format,
+            "output": output_path,
+        },
+    )
+
     try:
-        for category in models.Category.get_categories():
-            for item in category.get_items():
-                for dt, price in item.get_historical_prices():
-                    if interval.contains(dt):
-                        measurement = models.PriceMeasurement(item, category, price, dt)
-                        click.echo(json.dumps(measurement.to_dict()))
+        engine = crawl.CrawlEngine(concurrency, ordered)
+
+        with output.get_writer(output_format, destination=output_path) as writer:
+            try:
+                for category, item, prices in engine.prices(
+                    categories,
+                    partial(is_skipped, checkpoint, watermarks),
+                    interval.start,
+                    interval.end,
+                    pages,
+                ):
+                    writer.reserve(len(prices))
+                    emit(category, item, prices, writer, watermarks)
+                    save_checkpoint(checkpoint, writer, item.id, watermarks)
+            finally:
+                writer.flush()
+                checkpoint.save()
+
+        checkpoint.clear()
 
     except exceptions.NoSuchCategoryException:
         click.secho("Invalid category", fg="red")
         sys.exit(1)
+
+    finally:
+        if watermarks is not None:
+            watermarks.save()
@@ -1,61 +1,131 @@
 """Module for the info command group."""
 import sys
+from typing import Tuple
 
 import click
 
-from grand_exchanger import __version__, exceptions, models
+from grand_exchanger import __version__, crawl, exceptions, models, store
+from grand_exchanger.cli import crawl_options, ids_argument
+from grand_exchanger.models.prefetching import prefetch
+from grand_exchanger.resources import transport
 
 
 @click.group()
 @click.version_option(version=__version__)
 def cli() -> None:
-    """CLI group."""
-    pass
+    """CLI group.
+
+    Cached responses are displayed even when stale, and revalidated in the background.
+    """
+    response_cache = transport.get_cache()
+
+    if response_cache is not None:
+        response_cache.stale_while_revalidate = True
 
 
 @cli.command("ls")
 @click.option("--with-counts/--without-counts", default=True)
-def list_categories(with_counts: bool) -> None:
+@crawl_options
+def list_categories(with_counts: bool, concurrency: int, ordered: bool) -> None:
     """Lists all categories with name and total items.
 
+    Item counts are requested concurrently, and every category is listed as soon as
+    its count is known.
+
     Args:
         with_counts (bool): Include item counts per category.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): List categories by ID rather than as counts arrive.
     """
-    for c in models.Category.get_categories():
-        if not with_counts:
+    categories = list(models.Category.get_categories())
+
+    if not with_counts:
+        for c in categories:
             click.secho(f"{c.id}: {c.name}", fg="green")
-        else:
-            click.secho(f"{c.id}: {c.name} ({c.total})", fg="green")
+
+        return
+
+    for c, total in prefetch(lambda c: (c, c.total), categories, concurrency, ordered):
+        click.secho(f"{c.id}: {c.name} ({total})", fg="green")
 
 
 @cli.command("item")
-@click.argument("id", type=int, required=True)
-def item(id: int) -> None:
-    """Displays information about an item.
+@ids_argument
+@crawl_options
+def item(ids: Tuple[int, ...], concurrency: int, ordered: bool) -> None:
+    """Displays information about items.
 
     Args:
-        id (int): A valid item ID.
+        ids (Tuple[int, ...]): Valid item IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Display items in the order of their IDs.
     """
-    try:
-        obj = models.Item.get(id)
-        click.secho(obj.to_str(), fg="green")
-    except exceptions.NoSuchItemException:
-        click.secho("Invalid item", fg="red")
+    invalid = False
+
+    for item_id, obj in models.Item.get_many(
+        ids, concurrency=concurrency, ordered=ordered
+    ):
+        if obj is None:
+            click.secho(f"Invalid item {item_id}", fg="red", err=True)
+            invalid = True
+        else:
+            click.secho(obj.to_str(), fg="green")
+
+    if invalid:
         sys.exit(1)
 
 
 @cli.command("category")
-@click.argument("id", type=int, required=True)
-def category(id: int) -> None:
-    """Displays information about items for a category.
+@ids_argument
+@crawl_options
+def category(ids: Tuple[int, ...], concurrency: int, ordered: bool) -> None:
+    """Displays information about items for categories.
 
     Args:
-        id (int): A valid category ID.
+        ids (Tuple[int, ...]): Valid category IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the order of a sequential crawl.
     """
     try:
-        obj = models.Category.get(id)
-        for i in obj.get_items():
+        categories = [models.Category.get(i) for i in dict.fromkeys(ids)]
+        engine = crawl.CrawlEngine(concurrency, ordered)
+
+        for _, i in engine.items(categories):
             click.secho(i.to_str(), fg="green")
     except exceptions.NoSuchCategoryException:
         click.secho("Invalid category", fg="red")
         sys.exit(1)
+
+
+@cli.command("index")
+@click.option(
+    "--category",
+    "category_ids",
+    type=int,
+    multiple=True,
+    help="Only index this category, can be repeated",
+)
+@crawl_options
+def index(category_ids: Tuple[int, ...], concurrency: int, ordered: bool) -> None:
+    """Builds the local item catalogue by crawling the item pages.
+
+    Args:
+        category_ids (Tuple[int, ...]): Categories to index, all if empty.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the order of a sequential crawl.
+    """
+    try:
+        if category_ids:
+            categories = [models.Category.get(i) for i in category_ids]
+        else:
+            categories = list(models.Category.get_categories())
+
+        engine = crawl.CrawlEngine(concurrency, ordered)
+        count = sum(1 for _ in engine.items(categories))
+    except exceptions.NoSuchCategoryException:
+        click.secho("Invalid category", fg="red")
+        sys.exit(1)
+
+    click.secho(
+        f"Indexed {count} items, {len(store.get_catalogue())} in catalogue", fg="green"
+    )
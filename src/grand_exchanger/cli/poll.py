@@ -1,13 +1,34 @@
 """Module for the info command group."""
 from datetime import datetime
-import json
 import sys
+from typing import Any, Callable, List, Optional, Tuple
 
 
 import click
 
 
-from grand_exchanger import __version__, exceptions, models
+from grand_exchanger import (
+    __version__,
+    crawl,
+    exceptions,
+    metrics,
+    models,
+    output,
+    planner,
+    scheduler,
+    store,
+)
+from grand_exchanger.cli import (
+    checkpoint_options,
+    crawl_options,
+    ids_argument,
+    open_checkpoint,
+    output_options,
+    save_checkpoint,
+    select_shard,
+    shard_options,
+)
+from grand_exchanger.timestamps import to_epoch
 
 
 @click.group()
@@ -17,59 +38,390 @@ def cli() -> None:
     pass
 
 
+def changes_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds options for only outputting items whose price moved to a command.
+
+    Args:
+        f (Callable[..., Any]): A command function.
+
+    Returns:
+        Callable[..., Any]: The command function with changes options.
+    """
+    f = click.option(
+        "--keyframe-interval",
+        type=click.FloatRange(min=0),
+        default=0,
+        show_default=True,
+        help="Seconds between polls that output every item, 0 for never",
+    )(f)
+    return click.option(
+        "--changes-only/--every-item",
+        default=False,
+        show_default=True,
+        help="Only output items whose price moved since it was last output",
+    )(f)
+
+
+def emit(
+    category: models.Category,
+    item: models.Item,
+    epoch: int,
+    writer: output.Writer,
+    last_prices: Optional[store.LastPrices],
+    keyframe: bool,
+) -> None:
+    """Outputs the measurement of an item, unless its price did not move.
+
+    Args:
+        category (models.Category): The category of the item.
+        item (models.Item): An item.
+        epoch (int): The time of the poll in epoch seconds.
+        writer (output.Writer): The writer for measurements.
+        last_prices (Optional[store.LastPrices]): Prices of the items when they
+            were last output, or None to output all items.
+        keyframe (bool): Output the item even if its price did not move.
+    """
+    if last_prices is not None:
+        if not keyframe and not last_prices.is_changed(item.id, item.price):
+            metrics.inc("measurements_unchanged_total", command=writer.command)
+            return
+
+        last_prices.update(item.id, item.price)
+
+    writer.write(models.PriceMeasurement(item, category, item.price, epoch))
+
+
+def is_keyframe(last_prices: Optional[store.LastPrices], interval: float) -> bool:
+    """Returns whether a poll in changes-only mode should output every item.
+
+    Args:
+        last_prices (Optional[store.LastPrices]): Prices of the items when they
+            were last output, or None to output all items.
+        interval (float): Seconds between keyframes, or 0 for no keyframes.
+
+    Returns:
+        bool: True if the keyframe interval has passed.
+    """
+    return last_prices is not None and last_prices.is_keyframe_due(interval)
+
+
+def finish(last_prices: Optional[store.LastPrices], keyframe: bool) -> None:
+    """Records the keyframe of a completed poll.
+
+    Args:
+        last_prices (Optional[store.LastPrices]): Prices of the items when they
+            were last output, or None to output all items.
+        keyframe (bool): The poll output every item.
+    """
+    if last_prices is not None and keyframe:
+        last_prices.mark_keyframe()
+
+
 @cli.command("item")
-@click.argument("id", type=int, required=True)
-def item(id: int) -> None:
-    """Outputs a measurement for latest item price.
+@ids_argument
+@crawl_options
+@output_options
+def item(
+    ids: Tuple[int, ...],
+    concurrency: int,
+    ordered: bool,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
+    """Outputs measurements for latest item prices.
 
     Args:
-        id (int): A valid item ID.
+        ids (Tuple[int, ...]): Valid item IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Output items in the order of their IDs.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
     """
-    try:
-        item = models.Item.get(id)
-        category = models.Category.get_category_for_item(item)
-        measurement = models.PriceMeasurement(
-            item, category, item.price, datetime.now()
-        )
-
-        click.echo(json.dumps(measurement.to_dict()))
-    except exceptions.NoSuchItemException:
-        click.secho("Invalid item", fg="red")
+    invalid = False
+
+    with output.get_writer(output_format, destination=output_path) as writer:
+        for item_id, item in models.Item.get_many(
+            ids, live=True, concurrency=concurrency, ordered=ordered
+        ):
+            if item is None:
+                click.secho(f"Invalid item {item_id}", fg="red", err=True)
+                invalid = True
+                continue
+
+            category = models.Category.get_category_for_item(item)
+            writer.write(
+                models.PriceMeasurement(
+                    item, category, item.price, to_epoch(datetime.now())
+                )
+            )
+
+    if invalid:
         sys.exit(1)
 
 
 @cli.command("category")
-@click.argument("id", type=int, required=True)
-def category(id: int) -> None:
-    """Outputs measurements for latest item prices in a category.
+@ids_argument
+@crawl_options
+@changes_options
+@output_options
+def category(
+    ids: Tuple[int, ...],
+    concurrency: int,
+    ordered: bool,
+    changes_only: bool,
+    keyframe_interval: float,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
+    """Outputs measurements for latest item prices in categories.
 
     Args:
-        id (int): A valid category ID.
+        ids (Tuple[int, ...]): Valid category IDs, read from stdin if none are given.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the output order of a sequential crawl.
+        changes_only (bool): Only output items whose price moved.
+        keyframe_interval (float): Seconds between polls that output every item.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
     """
+    last_prices = store.LastPrices() if changes_only else None
+    keyframe = is_keyframe(last_prices, keyframe_interval)
+
     try:
-        category = models.Category.get(id)
+        categories = [models.Category.get(i) for i in dict.fromkeys(ids)]
+        engine = crawl.CrawlEngine(concurrency, ordered)
+
+        with output.get_writer(output_format, destination=output_path) as writer:
+            for category, item in engine.items(categories):
+                emit(
+                    category,
+                    item,
+                    to_epoch(datetime.now()),
+                    writer,
+                    last_prices,
+                    keyframe,
+                )
+
+        finish(last_prices, keyframe)
 
-        for item in category.get_items():
-            measurement = models.PriceMeasurement(
-                item, category, item.price, datetime.now()
-            )
-            click.echo(json.dumps(measurement.to_dict()))
     except exceptions.NoSuchCategoryException:
         click.secho("Invalid category", fg="red")
         sys.exit(1)
 
+    finally:
+        if last_prices is not None:
+            last_prices.save()
+
 
 @cli.command("all")
-def all() -> None:
-    """Output price measurements for all items in the date range."""
+@crawl_options
+@shard_options
+@checkpoint_options
+@changes_options
+@output_options
+def all(
+    concurrency: int,
+    ordered: bool,
+    shard: Optional[planner.Shard],
+    plan: bool,
+    resume: bool,
+    checkpoint_interval: float,
+    changes_only: bool,
+    keyframe_interval: float,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
+    """Output price measurements for all items in the date range.
+
+    The crawl is checkpointed, so an interrupted crawl can be resumed without
+    outputting any item again.
+
+    Args:
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the output order of a sequential crawl.
+        shard (Optional[planner.Shard]): Only output the items of this shard.
+        plan (bool): Show the estimated requests of every shard instead.
+        resume (bool): Continue the last crawl if it was interrupted.
+        checkpoint_interval (float): Maximum seconds between checkpoints.
+        changes_only (bool): Only output items whose price moved.
+        keyframe_interval (float): Seconds between polls that output every item.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
+    """
+    categories, pages = select_shard(
+        list(models.Category.get_categories()), shard, plan, planner.page_requests
+    )
+    checkpoint = open_checkpoint(
+        "poll all",
+        shard,
+        resume,
+        checkpoint_interval,
+        {
+            "changes_only": changes_only,
+            "format": output_format,
+            "output": output_path,
+        },
+    )
+    last_prices = store.LastPrices() if changes_only else None
+    keyframe = is_keyframe(last_prices, keyframe_interval)
+
     try:
-        for category in models.Category.get_categories():
-            for item in category.get_items():
-                measurement = models.PriceMeasurement(
-                    item, category, item.price, datetime.now()
-                )
-                click.echo(json.dumps(measurement.to_dict()))
+        engine = crawl.CrawlEngine(concurrency, ordered)
+
+        with output.get_writer(output_format, destination=output_path) as writer:
+            try:
+                for category, item in engine.items(categories, pages):
+                    if item.id in checkpoint:
+                        continue
+
+                    emit(
+                        category,
+                        item,
+                        to_epoch(datetime.now()),
+                        writer,
+                        last_prices,
+                        keyframe,
+                    )
+                    save_checkpoint(checkpoint, writer, item.id)
+            finally:
+                writer.flush()
+                checkpoint.save()
+
+        checkpoint.clear()
+        finish(last_prices, keyframe)
+
+    except exceptions.NoSuchCategoryException:
+        click.secho("Invalid category", fg="red")
+        sys.exit(1)
+
+    finally:
+        if last_prices is not None:
+            last_prices.save()
+
+
+def poll_once(
+    engine: crawl.CrawlEngine,
+    categories: List[models.Category],
+    writer: output.Writer,
+    pages: Optional[crawl.Pages] = None,
+    last_prices: Optional[store.LastPrices] = None,
+    keyframe_interval: float = 0,
+) -> None:
+    """Outputs measurements for latest item prices, all stamped with the same time.
+
+    A failed poll is reported instead of raised, so a watcher survives it.
+
+    Args:
+        engine (crawl.CrawlEngine): The crawl engine.
+        categories (List[models.Category]): The categories to poll.
+        writer (output.Writer): The writer for measurements.
+        pages (Optional[crawl.Pages]): Only poll these pages of the categories.
+        last_prices (Optional[store.LastPrices]): Prices of the items when they
+            were last output, or None to output all items.
+        keyframe_interval (float): Seconds between polls that output every item.
+    """
+    now = to_epoch(datetime.now())
+    keyframe = is_keyframe(last_prices, keyframe_interval)
+
+    try:
+        for category, item in engine.items(categories, pages):
+            emit(category, item, now, writer, last_prices, keyframe)
+
+        finish(last_prices, keyframe)
+    except Exception as error:
+        click.secho(f"Poll failed: {error!r}", fg="red", err=True)
+
+    writer.flush()
+
+    if last_prices is not None:
+        last_prices.save()
+
+
+@cli.command("watch")
+@click.option(
+    "--interval",
+    "-i",
+    type=click.FloatRange(min=1),
+    default=300,
+    show_default=True,
+    help="Seconds between polls",
+)
+@click.option(
+    "--cycles",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Stop after this many polls, 0 to poll until interrupted",
+)
+@click.option(
+    "--category",
+    "category_ids",
+    type=int,
+    multiple=True,
+    help="Only poll this category, can be repeated",
+)
+@crawl_options
+@shard_options
+@changes_options
+@output_options
+def watch(
+    interval: float,
+    cycles: int,
+    category_ids: Tuple[int, ...],
+    concurrency: int,
+    ordered: bool,
+    shard: Optional[planner.Shard],
+    plan: bool,
+    changes_only: bool,
+    keyframe_interval: float,
+    output_format: str,
+    output_path: Optional[str],
+) -> None:
+    """Outputs measurements for latest item prices on a fixed cadence.
 
+    The process stays resident, so connections, caches and the category index are
+    reused between polls. A poll that takes longer than the interval skips the polls
+    it ran into instead of overlapping them, and a failed poll is retried at the next
+    one.
+
+    Args:
+        interval (float): Seconds between polls.
+        cycles (int): Number of polls, or 0 to poll until interrupted.
+        category_ids (Tuple[int, ...]): Categories to poll, all if empty.
+        concurrency (int): Maximum number of requests in flight.
+        ordered (bool): Keep the output order of a sequential crawl.
+        shard (Optional[planner.Shard]): Only poll the items of this shard.
+        plan (bool): Show the estimated requests of every shard instead.
+        changes_only (bool): Only output items whose price moved.
+        keyframe_interval (float): Seconds between polls that output every item.
+        output_format (str): The output format.
+        output_path (Optional[str]): The destination of dataset formats.
+    """
+    try:
+        if category_ids:
+            categories = [models.Category.get(i) for i in category_ids]
+        else:
+            categories = list(models.Category.get_categories())
     except exceptions.NoSuchCategoryException:
         click.secho("Invalid category", fg="red")
         sys.exit(1)
+
+    categories, pages = select_shard(categories, shard, plan, planner.page_requests)
+    engine = crawl.CrawlEngine(concurrency, ordered)
+    last_prices = store.LastPrices() if changes_only else None
+
+    try:
+        with output.get_writer(output_format, destination=output_path) as writer:
+            for tick in scheduler.Scheduler(interval).ticks(cycles or None):
+                if tick.skipped:
+                    click.secho(
+                        f"Poll overran, skipped {tick.skipped} poll(s)",
+                        fg="yellow",
+                        err=True,
+                    )
+
+                poll_once(
+                    engine, categories, writer, pages, last_prices, keyframe_interval
+                )
+    except KeyboardInterrupt:
+        pass
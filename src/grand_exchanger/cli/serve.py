@@ -0,0 +1,132 @@
+"""Module for the serve command."""
+from typing import Optional
+
+import click
+
+from grand_exchanger import standin
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface")
+@click.option(
+    "--port",
+    type=click.IntRange(min=0, max=65535),
+    default=8080,
+    show_default=True,
+    help="Port, 0 for any free port",
+)
+@click.option(
+    "--items",
+    type=click.IntRange(min=0),
+    default=standin.ITEMS,
+    show_default=True,
+    help="Number of items in the catalogue",
+)
+@click.option(
+    "--categories",
+    type=click.IntRange(min=1),
+    default=standin.CATEGORIES,
+    show_default=True,
+    help="Number of categories",
+)
+@click.option(
+    "--days",
+    type=click.IntRange(min=1),
+    default=standin.DAYS,
+    show_default=True,
+    help="Days of price history",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed")
+@click.option(
+    "--latency",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Mean or median response delay in seconds",
+)
+@click.option(
+    "--latency-distribution",
+    type=click.Choice(standin.DISTRIBUTIONS),
+    default="fixed",
+    show_default=True,
+    help="Distribution of response delays",
+)
+@click.option(
+    "--latency-spread",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Spread of uniform delays in seconds, or shape of lognormal delays",
+)
+@click.option(
+    "--error-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests that fail with a server error",
+)
+@click.option(
+    "--throttle-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests that are throttled with 429",
+)
+@click.option(
+    "--rate-limit",
+    type=click.FloatRange(min=0.1),
+    help="Requests per second served before throttling with 429",
+)
+def cli(
+    host: str,
+    port: int,
+    items: int,
+    categories: int,
+    days: int,
+    seed: int,
+    latency: float,
+    latency_distribution: str,
+    latency_spread: float,
+    error_rate: float,
+    throttle_rate: float,
+    rate_limit: Optional[float],
+) -> None:
+    """Serves a synthetic catalogue as a stand-in for the itemdb services.
+
+    The origin is printed on the first line of output, pass it to other commands
+    with --api-url.
+
+    Args:
+        host (str): The interface to listen on.
+        port (int): The port, 0 for any free port.
+        items (int): Number of items.
+        categories (int): Number of categories.
+        days (int): Days of price history.
+        seed (int): Seed of the catalogue, delays and faults.
+        latency (float): Mean or median response delay in seconds.
+        latency_distribution (str): Distribution of response delays.
+        latency_spread (float): Spread or shape of the delay distribution.
+        error_rate (float): Fraction of requests that fail with a server error.
+        throttle_rate (float): Fraction of requests that are throttled.
+        rate_limit (Optional[float]): Requests per second served before throttling.
+    """
+    faults = standin.Faults(
+        standin.Latency(latency_distribution, latency, latency_spread),
+        error_rate,
+        throttle_rate,
+        rate_limit,
+        seed=seed,
+    )
+    server = standin.StandIn(
+        standin.Catalogue(items, categories, days, seed), faults, host, port
+    )
+
+    click.echo(server.origin)
+    click.echo(f"Serving {items} items in {categories} categories", err=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
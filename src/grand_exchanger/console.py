@@ -1,19 +1,122 @@
 """Module for high level console commands."""
+from contextlib import suppress
+from functools import lru_cache, partial
+from importlib import import_module
+import json
 import os
-from typing import Any, Dict, List, Optional
+import sys
+from typing import Dict, List, Optional
 
 
 import click
 
+from grand_exchanger import metrics
+from grand_exchanger.resources import cache, transport
+from grand_exchanger.store import state_path, write_atomic
 
-plugin_folder = os.path.join(os.path.dirname(__file__), "cli")
+
+ENTRY_POINT_GROUP = "grand_exchanger.plugins"
+
+PLUGINS = {
+    "analyze": "grand_exchanger.cli.analyze:cli",
+    "fetch": "grand_exchanger.cli.fetch:cli",
+    "info": "grand_exchanger.cli.info:cli",
+    "poll": "grand_exchanger.cli.poll:cli",
+    "serve": "grand_exchanger.cli.serve:cli",
+}
+
+
+@lru_cache(maxsize=None)
+def get_plugins() -> Dict[str, str]:
+    """Returns the command groups of all installed plugins.
+
+    Plugins of other distributions register a command group under the
+    ``grand_exchanger.plugins`` entry point group. Scanning the installed
+    distributions is slow, so the result is kept in the state directory until a
+    directory on the import path changes, as it does when distributions are
+    installed or removed.
+
+    Returns:
+        Dict[str, str]: Object references of command groups by name.
+    """
+    path = state_path("plugins.json")
+    key = _import_path_key()
+
+    try:
+        with open(path, "rb") as f:
+            data = json.load(f)
+
+        plugins = dict(data["plugins"]) if data["key"] == key else None
+    except (OSError, ValueError, KeyError, TypeError):
+        plugins = None
+
+    if plugins is None:
+        plugins = scan_plugins()
+
+        with suppress(OSError):
+            write_atomic(path, json.dumps({"key": key, "plugins": plugins}).encode())
+
+    plugins.update(PLUGINS)
+
+    return plugins
+
+
+def scan_plugins() -> Dict[str, str]:
+    """Scans the installed distributions for plugins.
+
+    Returns:
+        Dict[str, str]: Object references of command groups by name.
+    """
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+
+    if hasattr(entry_points, "select"):
+        group = entry_points.select(group=ENTRY_POINT_GROUP)  # type: ignore
+    else:
+        group = entry_points.get(ENTRY_POINT_GROUP, [])  # type: ignore
+
+    return {ep.name: ep.value for ep in group}
+
+
+def _import_path_key() -> List[List[object]]:
+    """Returns the import path with the modification time of each directory.
+
+    Returns:
+        List[List[object]]: Pairs of path entry and modification time.
+    """
+    key: List[List[object]] = []
+
+    for entry in sys.path:
+        try:
+            mtime: Optional[float] = os.stat(entry or os.curdir).st_mtime
+        except OSError:
+            mtime = None
+
+        key.append([entry, mtime])
+
+    return key
+
+
+def load_plugin(reference: str) -> click.Command:
+    """Imports a command group.
+
+    Args:
+        reference (str): An object reference of the form ``module:attribute``.
+
+    Returns:
+        click.Command: The command group.
+    """
+    module, _, attribute = reference.partition(":")
+
+    return getattr(import_module(module), attribute or "cli")
 
 
 class CLI(click.MultiCommand):
     """CLI multi command class for loading command plugins."""
 
     def list_commands(self, ctx: click.Context) -> List[str]:
-        """Lists all command groups from plugins in the plugin folder.
+        """Lists all command groups of the installed plugins.
 
         Args:
             ctx (click.Context): A context object
@@ -21,34 +124,109 @@ class CLI(click.MultiCommand):
         Returns:
             List[str]: A list of command group names.
         """
-        rv = []
-        for filename in os.listdir(plugin_folder):
-            if filename.endswith(".py") and not filename.endswith("__init__.py"):
-                rv.append(filename[:-3])
-
-        rv.sort()
-        return rv
+        return sorted(get_plugins())
 
     def get_command(self, ctx: click.Context, name: str) -> Optional[click.Command]:
         """Returns a command object for a command group name.
 
+        Only the module of the requested command group is imported.
+
         Args:
             ctx (click.Context): A context object
             name (str): A valid command group name.
 
         Returns:
-            Optional[click.Command]: The command object.__class__(
+            Optional[click.Command]: The command object, or None for an unknown name.
         """
-        ns: Dict[str, Any] = {}
-        fn = os.path.join(plugin_folder, name + ".py")
-        with open(fn) as f:
-            code = compile(f.read(), fn, "exec")
-            eval(code, ns, ns)
+        reference = PLUGINS.get(name) or get_plugins().get(name)
 
-        return ns["cli"]
+        return load_plugin(reference) if reference is not None else None
 
 
 @click.command(cls=CLI)
-def cli() -> None:
-    """CLI group."""
-    pass
+@click.option(
+    "--pool-size",
+    type=click.IntRange(min=1),
+    default=transport.POOL_SIZE,
+    show_default=True,
+    help="Pooled connections per host",
+)
+@click.option(
+    "--connect-timeout",
+    type=float,
+    default=transport.CONNECT_TIMEOUT,
+    show_default=True,
+    help="Connect timeout in seconds",
+)
+@click.option(
+    "--read-timeout",
+    type=float,
+    default=transport.READ_TIMEOUT,
+    show_default=True,
+    help="Read timeout in seconds",
+)
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=True,
+    show_default=True,
+    help="Cache responses on disk",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=1),
+    default=cache.MAX_SIZE // 2**20,
+    show_default=True,
+    help="Disk budget of the response cache in MiB",
+)
+@click.option(
+    "--api-url",
+    envvar="GE_API_URL",
+    help="Origin of a stand-in for the itemdb services, such as http://localhost:8080",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write a JSON summary of request and output metrics to a file at exit",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(min=0, max=65535),
+    help="Serve metrics in the Prometheus text format on a local port",
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    pool_size: int,
+    connect_timeout: float,
+    read_timeout: float,
+    use_cache: bool,
+    cache_size: int,
+    api_url: Optional[str],
+    metrics_file: Optional[str],
+    metrics_port: Optional[int],
+) -> None:
+    """CLI group.
+
+    Args:
+        ctx (click.Context): A context object
+        pool_size (int): Maximum number of pooled connections per host.
+        connect_timeout (float): Seconds to wait for a connection.
+        read_timeout (float): Seconds to wait between received bytes.
+        use_cache (bool): Cache responses on disk.
+        cache_size (int): Disk budget of the response cache in MiB.
+        api_url (Optional[str]): Origin of a stand-in for the itemdb services.
+        metrics_file (Optional[str]): File for a JSON summary of the metrics.
+        metrics_port (Optional[int]): Port for the Prometheus metrics endpoint.
+    """
+    transport.configure(pool_size, connect_timeout, read_timeout)
+    transport.set_origin(api_url)
+    transport.set_cache(
+        cache.ResponseCache(max_size=cache_size * 2**20) if use_cache else None
+    )
+
+    if metrics_file is not None:
+        ctx.call_on_close(partial(metrics.write_json, metrics_file))
+
+    if metrics_port is not None:
+        ctx.call_on_close(metrics.serve(metrics_port).shutdown)
@@ -0,0 +1,401 @@
+"""Module for the concurrent crawl engine."""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    TypeVar,
+)
+
+from grand_exchanger.models import Category, Item
+
+if TYPE_CHECKING:  # pragma: no cover
+    from grand_exchanger.resources.graph import Graph
+
+
+CONCURRENCY = 8
+BUFFER = 64
+
+Pages = Mapping[int, Sequence[Tuple[str, int]]]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+def iterate(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Drives an asynchronous generator from synchronous code.
+
+    The event loop only runs while the next value is awaited, so a slow consumer
+    pauses the producers instead of letting results pile up.
+
+    Args:
+        agen (AsyncIterator[T]): An asynchronous generator.
+
+    Yields:
+        T: The next value of the generator.
+    """
+    loop = asyncio.new_event_loop()
+
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())  # type: ignore
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+class CrawlEngine:
+    """Crawls items and price histories of categories concurrently.
+
+    Every blocking resource call, for breakdowns, item pages and price histories,
+    runs on one pool of `concurrency` threads, which bounds the number of requests
+    in flight. Stages are connected by bounded queues, so memory
+    use does not grow with the size of the catalogue.
+    """
+
+    def __init__(
+        self, concurrency: int = CONCURRENCY, ordered: bool = True, buffer: int = BUFFER
+    ) -> None:
+        """Initialises the engine.
+
+        Args:
+            concurrency (int): Maximum number of requests in flight.
+            ordered (bool): Yield results in the same order as a sequential crawl.
+            buffer (int): Maximum number of results buffered between stages.
+        """
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.buffer = buffer
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def items(
+        self, categories: Iterable[Category], pages: Optional[Pages] = None
+    ) -> Iterator[Tuple[Category, Item]]:
+        """Yields the items of several categories.
+
+        Args:
+            categories (Iterable[Category]): The categories to crawl.
+            pages (Optional[Pages]): Only crawl these pages, given by letter and page
+                number per category ID.
+
+        Returns:
+            Iterator[Tuple[Category, Item]]: Items with their category.
+        """
+        return iterate(self._run(self._items(categories, pages)))
+
+    def prices(
+        self,
+        categories: Iterable[Category],
+        skip: Optional[Callable[[Item], bool]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        pages: Optional[Pages] = None,
+    ) -> Iterator[Tuple[Category, Item, List[Tuple[int, int]]]]:
+        """Yields the items of several categories with their historical prices.
+
+        Args:
+            categories (Iterable[Category]): The categories to crawl.
+            skip (Optional[Callable[[Item], bool]]): Returns True for items whose
+                price history should not be fetched.
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+            pages (Optional[Pages]): Only crawl these pages, given by letter and page
+                number per category ID.
+
+        Returns:
+            Iterator[Tuple[Category, Item, List[Tuple[int, int]]]]: Items with their
+                category and daily price points in epoch seconds.
+        """
+        return iterate(self._run(self._prices(categories, skip, start, end, pages)))
+
+    def graphs(
+        self,
+        categories: Iterable[Category],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        pages: Optional[Pages] = None,
+    ) -> Iterator[Tuple[Category, Item, "Graph"]]:
+        """Yields the items of several categories with their price graphs.
+
+        Args:
+            categories (Iterable[Category]): The categories to crawl.
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+            pages (Optional[Pages]): Only crawl these pages, given by letter and page
+                number per category ID.
+
+        Returns:
+            Iterator[Tuple[Category, Item, Graph]]: Items with their category and
+                their daily and averaged price series.
+        """
+
+        def get_graph(item: Item) -> "Graph":
+            return item.get_graph(start, end)
+
+        return iterate(self._run(self._histories(categories, get_graph, None, pages)))
+
+    async def _run(self, agen: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Runs a pipeline on a dedicated thread pool.
+
+        Args:
+            agen (AsyncIterator[T]): The pipeline.
+
+        Yields:
+            T: The next result of the pipeline.
+        """
+        self._executor = ThreadPoolExecutor(self.concurrency)
+
+        try:
+            async for value in agen:
+                yield value
+        finally:
+            await agen.aclose()  # type: ignore
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _call(self, func: Callable[..., R], *args: Any) -> R:
+        """Runs a blocking function on the thread pool.
+
+        Args:
+            func (Callable[..., R]): A blocking function.
+            args (Any): Arguments for the function.
+
+        Returns:
+            R: The result of the function.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _drain(
+        self,
+        category: Category,
+        queue: "asyncio.Queue[Any]",
+        pages: Optional[Sequence[Tuple[str, int]]] = None,
+        prefetch: int = 1,
+    ) -> None:
+        """Moves the items of a category into a queue.
+
+        The pages are planned and requested on the thread pool of the engine, so
+        they share its bound on requests in flight.
+
+        Args:
+            category (Category): A category.
+            queue (asyncio.Queue[Any]): A bounded queue.
+            pages (Optional[Sequence[Tuple[str, int]]]): Only the items of these
+                pages.
+            prefetch (int): Maximum number of page requests of the category in
+                flight.
+        """
+
+        async def planned() -> AsyncIterator[Tuple[str, int]]:
+            for page in (
+                await self._call(category.get_pages) if pages is None else pages
+            ):
+                yield page
+
+        def get_page(page: Tuple[str, int]) -> List[Item]:
+            return category.get_page(*page)
+
+        try:
+            async for _, batch in self._map(get_page, planned(), prefetch):
+                for item in batch:
+                    await queue.put((category, item))
+        except Exception as error:
+            await queue.put(error)
+
+        await queue.put(_DONE)
+
+    async def _items(
+        self, categories: Iterable[Category], pages: Optional[Pages] = None
+    ) -> AsyncIterator[Tuple[Category, Item]]:
+        """Yields the items of several categories.
+
+        Up to `concurrency` categories are paginated at the same time. When there are
+        fewer categories than that, the pages of each category are requested
+        concurrently, so a crawl of a single category uses all its slots. When
+        ordered, every category has its own queue and the queues are drained in turn.
+
+        Args:
+            categories (Iterable[Category]): The categories to crawl.
+            pages (Optional[Pages]): Only crawl these pages, given by letter and page
+                number per category ID.
+
+        Yields:
+            Tuple[Category, Item]: The next item with its category.
+
+        Raises:
+            entry: The exception raised while crawling a category.
+        """
+        loop = asyncio.get_running_loop()
+        categories = list(categories)
+        prefetch = max(self.concurrency // max(len(categories), 1), 1)
+        remaining = iter(categories)
+        shared: "asyncio.Queue[Any]" = asyncio.Queue(self.buffer)
+        streams: Deque[Tuple["asyncio.Queue[Any]", "asyncio.Task[None]"]] = deque()
+        running = 0
+
+        def start() -> None:
+            nonlocal running
+            category = next(remaining, None)
+
+            if category is not None:
+                queue = asyncio.Queue(self.buffer) if self.ordered else shared
+                drain = self._drain(
+                    category,
+                    queue,
+                    None if pages is None else pages.get(category.id, []),
+                    prefetch,
+                )
+                streams.append((queue, loop.create_task(drain)))
+                running += 1
+
+        for _ in range(self.concurrency):
+            start()
+
+        try:
+            while running:
+                entry = await (streams[0][0] if self.ordered else shared).get()
+
+                if entry is _DONE:
+                    running -= 1
+
+                    if self.ordered:
+                        streams.popleft()
+
+                    start()
+                elif isinstance(entry, Exception):
+                    raise entry
+                else:
+                    yield entry
+        finally:
+            for _, task in streams:
+                task.cancel()
+
+    async def _map(
+        self,
+        func: Callable[[T], R],
+        source: AsyncIterator[T],
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[T, R]]:
+        """Applies a blocking function to a stream of values concurrently.
+
+        At most `limit` calls are pending at any time, `buffer` by default.
+
+        Args:
+            func (Callable[[T], R]): A blocking function.
+            source (AsyncIterator[T]): The input values.
+            limit (Optional[int]): Maximum number of pending calls.
+
+        Yields:
+            Tuple[T, R]: The next input value with its result.
+        """
+        pending: Deque[Tuple[T, "asyncio.Future[R]"]] = deque()
+        limit = limit or self.buffer
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < limit:
+                    try:
+                        value = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        task = asyncio.ensure_future(self._call(func, value))
+                        pending.append((value, task))
+
+                if not pending:
+                    break
+
+                if not self.ordered:
+                    await asyncio.wait(
+                        [f for _, f in pending], return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    pending.rotate(
+                        -next(i for i, (_, f) in enumerate(pending) if f.done())
+                    )
+
+                value, result = pending.popleft()
+                yield value, await result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _prices(
+        self,
+        categories: Iterable[Category],
+        skip: Optional[Callable[[Item], bool]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        pages: Optional[Pages] = None,
+    ) -> AsyncIterator[Tuple[Category, Item, List[Tuple[int, int]]]]:
+        """Yields the items of several categories with their historical prices.
+
+        Args:
+            categories (Iterable[Category]): The categories to crawl.
+            skip (Optional[Callable[[Item], bool]]): Returns True for items whose
+                price history should not be fetched.
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+            pages (Optional[Pages]): Only crawl these pages, given by letter and page
+                number per category ID.
+
+        Returns:
+            AsyncIterator[Tuple[Category, Item, List[Tuple[int, int]]]]: Items with
+                their category and daily price points in epoch seconds.
+        """
+
+        def get_prices(item: Item) -> List[Tuple[int, int]]:
+            return list(item.get_price_points(start, end))
+
+        return self._histories(categories, get_prices, skip, pages)
+
+    async def _histories(
+        self,
+        categories: Iterable[Category],
+        func: Callable[[Item], R],
+        skip: Optional[Callable[[Item], bool]] = None,
+        pages: Optional[Pages] = None,
+    ) -> AsyncIterator[Tuple[Category, Item, R]]:
+        """Yields the items of several categories with the result of a request.
+
+        Args:
+            categories (Iterable[Category]): The categories to crawl.
+            func (Callable[[Item], R]): Requests the history of an item.
+            skip (Optional[Callable[[Item], bool]]): Returns True for items whose
+                history should not be requested.
+            pages (Optional[Pages]): Only crawl these pages, given by letter and page
+                number per category ID.
+
+        Yields:
+            Tuple[Category, Item, R]: The next item with its category and history.
+        """
+
+        def get(entry: Tuple[Category, Item]) -> R:
+            return func(entry[1])
+
+        async def items() -> AsyncIterator[Tuple[Category, Item]]:
+            async for category, item in self._items(categories, pages):
+                if skip is None or not skip(item):
+                    yield category, item
+
+        async for (category, item), result in self._map(get, items()):
+            yield category, item, result
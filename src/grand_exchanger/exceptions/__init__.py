@@ -11,3 +11,15 @@ class NoSuchCategoryException(Exception):
     """Denotes a non-existent category."""
 
     pass
+
+
+class CheckpointMismatchException(Exception):
+    """Denotes a checkpoint of the same crawl with other settings."""
+
+    pass
+
+
+class WriteFailedException(Exception):
+    """Denotes measurements that could not be written to their destination."""
+
+    pass
@@ -0,0 +1,284 @@
+"""Module for request and output metrics."""
+from bisect import bisect_left
+from contextlib import contextmanager
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from http.server import ThreadingHTTPServer
+
+
+PREFIX = "ge_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DECODE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Counts observations in cumulative buckets, the way Prometheus does."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Initialises the histogram.
+
+        Args:
+            buckets (Sequence[float]): Ascending upper bounds of the buckets.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records an observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Returns the number of observations up to each bucket bound.
+
+        Returns:
+            List[Tuple[str, int]]: Bucket bounds, ending in +Inf, and counts.
+        """
+        bounds = [repr(b) for b in self.buckets] + ["+Inf"]
+        total = 0
+        result = []
+
+        for i, count in enumerate(self.counts):
+            total += count
+            result.append((bounds[i], total))
+
+        return result
+
+
+class Registry:
+    """Counters and histograms by name and labels.
+
+    Updates take a lock and a dictionary lookup, so metrics can stay on while
+    crawling.
+    """
+
+    def __init__(self) -> None:
+        """Initialises an empty registry."""
+        self._counters: Dict[Key, float] = {}
+        self._histograms: Dict[Key, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increases a counter.
+
+        Args:
+            name (str): The counter name.
+            value (float): The increase.
+            labels (str): Labels of the counter.
+        """
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> None:
+        """Records an observation in a histogram.
+
+        Args:
+            name (str): The histogram name.
+            value (float): The observed value.
+            buckets (Sequence[float]): Bucket bounds, if the histogram is new.
+            labels (str): Labels of the histogram.
+        """
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+
+            histogram.observe(value)
+
+    @contextmanager
+    def time(
+        self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str
+    ) -> Iterator[None]:
+        """Records the seconds spent in a block in a histogram.
+
+        Args:
+            name (str): The histogram name.
+            buckets (Sequence[float]): Bucket bounds, if the histogram is new.
+            labels (str): Labels of the histogram.
+
+        Yields:
+            None: While the block runs.
+        """
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, buckets, **labels)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a summary of all metrics.
+
+        Returns:
+            Dict[str, Any]: Counters and histograms by name, each a list of series
+                with their labels.
+        """
+        summary: Dict[str, Any] = {"counters": {}, "histograms": {}}
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                summary["counters"].setdefault(name, []).append(
+                    {"labels": dict(labels), "value": value}
+                )
+
+            for (name, labels), h in sorted(self._histograms.items()):
+                summary["histograms"].setdefault(name, []).append(
+                    {
+                        "labels": dict(labels),
+                        "count": h.count,
+                        "sum": h.sum,
+                        "buckets": dict(h.cumulative()),
+                    }
+                )
+
+        return summary
+
+    def to_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text format.
+
+        Returns:
+            str: The exposition.
+        """
+        lines = []
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, h.cumulative(), h.count, h.sum)
+                for key, h in self._histograms.items()
+            )
+
+        previous = None
+
+        for (name, labels), value in counters:
+            if name != previous:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                previous = name
+
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {value!r}")
+
+        for (name, labels), cumulative, count, total in histograms:
+            if name != previous:
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                previous = name
+
+            for bound, value in cumulative:
+                le = _labels(labels + (("le", bound),))
+                lines.append(f"{PREFIX}{name}_bucket{le} {value}")
+
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total!r}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forgets all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Formats labels for the Prometheus text format.
+
+    Args:
+        labels (Tuple[Tuple[str, str], ...]): Label names and values.
+
+    Returns:
+        str: The labels in braces, or nothing if there are none.
+    """
+    if not labels:
+        return ""
+
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+
+    return "{" + ",".join('%s="%s"' % label for label in escaped) + "}"
+
+
+REGISTRY = Registry()
+
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.time
+
+
+def write_json(path: str) -> None:
+    """Writes a summary of all metrics to a file.
+
+    Args:
+        path (str): The file.
+    """
+    with open(path, "w") as f:
+        json.dump(REGISTRY.to_dict(), f, indent=2)
+        f.write("\n")
+
+
+def serve(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serves the metrics in the Prometheus text format from a background thread.
+
+    http.server is imported on first use, since most commands do not serve metrics.
+
+    Args:
+        port (int): The port, 0 for any free port.
+        host (str): The interface to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        """Responds with the metrics to any GET request."""
+
+        def do_GET(self) -> None:  # noqa: N802
+            """Sends the metrics."""
+            body = REGISTRY.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            """Does not log requests.
+
+            Args:
+                args (Any): The message and its arguments.
+            """
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
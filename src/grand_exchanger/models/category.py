@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-from grand_exchanger import resources
+from grand_exchanger import resources, store
 from .item import Item
+from .prefetching import PREFETCH, prefetch
 from ..exceptions import NoSuchCategoryException
 
 
@@ -26,34 +27,73 @@ class Category:
         breakdown = resources.get_category_breakdown(self.id)
         return sum(map(lambda x: x.items, breakdown.alpha))
 
-    def get_items(self) -> Iterator[Item]:
+    def get_pages(self) -> List[Tuple[str, int]]:
+        """Returns the item pages of this category.
+
+        Pages are planned like those of a sharded crawl, so letters without items
+        are left out and no page past the last one is requested.
+
+        Returns:
+            List[Tuple[str, int]]: Letters and numbers of the pages, in crawl order.
+        """
+        from grand_exchanger import planner
+
+        return [(page.letter, page.number) for page in planner.plan_pages([self])]
+
+    def get_items(
+        self,
+        pages: Optional[Iterable[Tuple[str, int]]] = None,
+        concurrency: int = PREFETCH,
+        ordered: bool = True,
+    ) -> Iterator[Item]:
         """Yields all the items in this category.
 
+        All pages are planned upfront and up to `concurrency` of them are requested
+        at the same time. The items are added to the local catalogue as they are
+        crawled.
+
+        Args:
+            pages (Optional[Iterable[Tuple[str, int]]]): Only yield the items of
+                these pages, given by letter and page number.
+            concurrency (int): Maximum number of page requests in flight.
+            ordered (bool): Yield items in page order, rather than as pages arrive.
+
         Yields:
             Item: The next item in this category.
         """
-        breakdown = resources.get_category_breakdown(self.id)
+        planned = self.get_pages() if pages is None else list(pages)
 
-        for lc in breakdown.alpha:
-            count = 0
-            page = 1
-            empty_page = False
+        for batch in prefetch(
+            lambda page: self.get_page(*page), planned, concurrency, ordered
+        ):
+            yield from batch
 
-            letter = lc.letter if lc.letter != "#" else "%23"
+    def get_page(self, letter: str, page: int) -> List[Item]:
+        """Returns the items on a page of this category.
 
-            while count < lc.items and not empty_page:
-                batch = resources.get_items_page(self.id, letter, page)
+        The items are added to the local catalogue.
+
+        Args:
+            letter (str): The first letter of the items, as in the breakdown.
+            page (int): The page number, starting at 1.
 
-                if batch.items:
-                    for i in batch.items:
-                        item = Item(i.id, i.name, self.name, i.members, i.current.price)
-                        yield item
+        Returns:
+            List[Item]: The items on the page.
+        """
+        batch = resources.get_items_page(
+            self.id, letter if letter != "#" else "%23", page
+        )
 
-                        count += 1
-                else:
-                    empty_page = True
+        if batch.items:
+            store.get_catalogue().upsert(
+                store.CatalogueEntry(i.id, i.name, self.id, i.members, i.current.price)
+                for i in batch.items
+            )
 
-                page += 1
+        return [
+            Item(i.id, i.name, self.name, i.members, i.current.price)
+            for i in batch.items
+        ]
 
     @classmethod
     def get_categories(cls) -> Iterator[Category]:
@@ -62,7 +102,7 @@ class Category:
         Yields:
             Category: The next category.
         """
-        for category_id, name in resources.get_categories():
+        for category_id, name in store.get_category_index().categories():
             yield cls(category_id, name)
 
     @classmethod
@@ -78,11 +118,12 @@ class Category:
         Raises:
             NoSuchCategoryException: The category does not exist.
         """
-        for c in cls.get_categories():
-            if c.id == category_id:
-                return c
+        name = store.get_category_index().get_name(category_id)
 
-        raise NoSuchCategoryException
+        if name is None:
+            raise NoSuchCategoryException
+
+        return cls(category_id, name)
 
     @classmethod
     def get_category_for_item(cls, item: Item) -> Category:
@@ -97,8 +138,9 @@ class Category:
         Raises:
             NoSuchCategoryException: This item does not have a valid type.
         """
-        for c in cls.get_categories():
-            if c.name == item.type:
-                return c
+        category_id = store.get_category_index().get_id(item.type)
+
+        if category_id is None:
+            raise NoSuchCategoryException
 
-        raise NoSuchCategoryException
+        return cls(category_id, item.type)
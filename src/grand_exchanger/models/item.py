@@ -1,43 +1,231 @@
 """Module for item classes."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Iterator, Tuple
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
 
-from grand_exchanger import resources
+from grand_exchanger import resources, store
+from grand_exchanger.timestamps import from_epoch, to_epoch
+from .prefetching import PREFETCH, prefetch
+from ..exceptions import NoSuchItemException
+
+if TYPE_CHECKING:  # pragma: no cover
+    from grand_exchanger.resources.graph import Graph
 
 
 @dataclass
 class Item:
-    """Representation of an item."""
+    """Representation of an item.
+
+    The price of an item from the local catalogue carries the epoch time at which it
+    was seen, live prices have no such time.
+    """
 
     id: int
     name: str
     type: str
     members: bool
     price: int
+    updated: Optional[float] = field(default=None, compare=False)
 
-    def get_historical_prices(self) -> Iterator[Tuple[datetime, int]]:
+    def get_historical_prices(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[Tuple[datetime, int]]:
         """Returns historical daily prices for this item.
 
+        Points outside of the date range are dropped while decoding the graph.
+
+        Args:
+            start (Optional[datetime]): Inclusive lower bound of the date range.
+            end (Optional[datetime]): Exclusive upper bound of the date range.
+
         Yields:
             Tuple[datetime, int]: The next price point with corresponding timestamp.
         """
-        yield from resources.get_historical_prices(self.id).list_daily_prices()
+        for epoch, price in self.get_price_points(
+            None if start is None else to_epoch(start),
+            None if end is None else to_epoch(end),
+        ):
+            yield from_epoch(epoch), price
+
+    def get_price_points(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Iterator[Tuple[int, int]]:
+        """Returns historical daily prices for this item in epoch seconds.
+
+        Points outside of the time range are dropped while decoding the graph.
+
+        Args:
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+
+        Returns:
+            Iterator[Tuple[int, int]]: Price points, the latest first.
+        """
+        return self.get_graph(start, end).list_daily_points()
+
+    def get_graph(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Graph:
+        """Returns the daily and averaged price series of this item.
+
+        Args:
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+
+        Returns:
+            Graph: The decoded price graph.
+        """
+        return resources.get_historical_prices(
+            self.id,
+            start=None if start is None else start * 1000,
+            end=None if end is None else end * 1000,
+        )
 
     @classmethod
-    def get(cls, item_id: int) -> Item:
+    def get(cls, item_id: int, live: bool = False) -> Item:
         """Returns an item object for an item ID.
 
+        Items are looked up in the local catalogue first, and IDs recently found to
+        be unknown are rejected without a request.
+
+        Args:
+            item_id (int): A valid item ID.
+            live (bool): Always request the current price, bypassing the catalogue
+                and the response cache.
+
+        Returns:
+            Item
+
+        Raises:
+            NoSuchItemException: The item does not exist.
+        """
+        catalogue = store.get_catalogue()
+
+        if catalogue.is_missing(item_id):
+            raise NoSuchItemException
+
+        if not live:
+            entry = catalogue.get(item_id)
+
+            if entry is not None:
+                item = cls._from_entry(entry)
+
+                if item is not None:
+                    return item
+
+        return cls._request(item_id, live)
+
+    @classmethod
+    def get_many(
+        cls,
+        item_ids: Iterable[int],
+        live: bool = False,
+        concurrency: int = PREFETCH,
+        ordered: bool = True,
+    ) -> Iterator[Tuple[int, Optional[Item]]]:
+        """Returns item objects for many item IDs.
+
+        Duplicate IDs are looked up once. Items in the local catalogue are looked up
+        in a single query, the others are requested concurrently.
+
         Args:
-            item_id: A valid item ID.
+            item_ids (Iterable[int]): Item IDs.
+            live (bool): Always request the current prices, bypassing the catalogue
+                and the response cache.
+            concurrency (int): Maximum number of requests in flight.
+            ordered (bool): Yield items in the order of their IDs, rather than as
+                they arrive.
+
+        Returns:
+            Iterator[Tuple[int, Optional[Item]]]: Item IDs with their item, or None
+                for IDs of items that do not exist.
+        """
+        ids = list(dict.fromkeys(item_ids))
+        catalogue = store.get_catalogue()
+        known: Dict[int, Item] = {}
+
+        if not live:
+            for entry in catalogue.get_many(ids).values():
+                item = cls._from_entry(entry)
+
+                if item is not None:
+                    known[item.id] = item
+
+        def get(item_id: int) -> Tuple[int, Optional[Item]]:
+            if item_id in known:
+                return item_id, known[item_id]
+
+            if catalogue.is_missing(item_id):
+                return item_id, None
+
+            try:
+                return item_id, cls._request(item_id, live)
+            except NoSuchItemException:
+                return item_id, None
+
+        return prefetch(get, ids, concurrency, ordered)
+
+    @classmethod
+    def _from_entry(cls, entry: store.CatalogueEntry) -> Optional[Item]:
+        """Returns an item object for a catalogue entry.
+
+        Args:
+            entry (store.CatalogueEntry): A catalogue entry.
+
+        Returns:
+            Optional[Item]: The item, or None if its category is unknown.
+        """
+        name = store.get_category_index().get_name(entry.category_id)
+
+        if name is None:
+            return None
+
+        return cls(
+            entry.id, entry.name, name, entry.members, entry.price, entry.updated
+        )
+
+    @classmethod
+    def _request(cls, item_id: int, live: bool) -> Item:
+        """Requests the details of an item, recording them in the catalogue.
+
+        Unknown IDs are remembered in the catalogue.
+
+        Args:
+            item_id (int): An item ID.
+            live (bool): Bypass the response cache.
 
         Returns:
             Item
+
+        Raises:
+            NoSuchItemException: The item does not exist.
         """
-        details = resources.get_item_details(item_id)
+        catalogue = store.get_catalogue()
+
+        try:
+            details = resources.get_item_details(item_id, live=live)
+        except NoSuchItemException:
+            catalogue.mark_missing(item_id)
+            raise
+
         item = details.item
+        category_id = store.get_category_index().get_id(item.type)
+
+        if category_id is not None:
+            catalogue.upsert(
+                [
+                    store.CatalogueEntry(
+                        item.id,
+                        item.name,
+                        category_id,
+                        item.members,
+                        item.current.price,
+                    )
+                ]
+            )
 
         return cls(item.id, item.name, item.type, item.members, item.current.price)
 
@@ -52,5 +240,23 @@ class Item:
         category: {self.type}
         members: {self.members}
 
-        price: {self.price}
+        price: {self.price}{self._age()}
+        """
+
+    def _age(self) -> str:
+        """Returns how long ago the price was seen, for display.
+
+        Returns:
+            str: The age of a catalogue price, empty for a live price.
         """
+        if self.updated is None:
+            return ""
+
+        minutes = int(time.time() - self.updated) // 60
+
+        for unit, size in (("day", 24 * 60), ("hour", 60)):
+            if minutes >= size:
+                count = minutes // size
+                return f" ({count} {unit}{'s' if count > 1 else ''} ago)"
+
+        return f" ({minutes} min ago)"
@@ -2,18 +2,31 @@
 from dataclasses import dataclass
 from datetime import datetime
 
+from grand_exchanger.timestamps import format_epoch, from_epoch
 from .category import Category
 from .item import Item
 
 
 @dataclass
 class PriceMeasurement:
-    """Representation of a price measurement for an item."""
+    """Representation of a price measurement for an item.
+
+    The time is kept in epoch seconds, a datetime is only created on request.
+    """
 
     item: Item
     category: Category
     price: int
-    dt: datetime
+    epoch: int
+
+    @property
+    def dt(self) -> datetime:
+        """Returns the time of the measurement.
+
+        Returns:
+            datetime: A naive datetime in UTC.
+        """
+        return from_epoch(self.epoch)
 
     def to_dict(self) -> dict:
         """Returns a data representation for use in InfluxDB."""
@@ -24,6 +37,6 @@ class PriceMeasurement:
                 "item_id": self.item.id,
                 "members": self.item.members,
             },
-            "time": self.dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "time": format_epoch(self.epoch),
             "fields": {"value": self.price},
         }
@@ -0,0 +1,57 @@
+"""Module for fetching values ahead of their consumer."""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Deque, Iterator, Sequence, TypeVar
+
+
+PREFETCH = 4
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def prefetch(
+    func: Callable[[T], R], values: Sequence[T], concurrency: int, ordered: bool = True
+) -> Iterator[R]:
+    """Applies a blocking function to values on a pool of threads.
+
+    At most `concurrency` calls are pending, and a call is started whenever a result
+    is taken, so results are fetched just ahead of the consumer.
+
+    Args:
+        func (Callable[[T], R]): A blocking function.
+        values (Sequence[T]): The input values.
+        concurrency (int): Maximum number of pending calls.
+        ordered (bool): Yield results in the order of the values, rather than as
+            they complete.
+
+    Yields:
+        R: The next result.
+    """
+    if concurrency <= 1 or len(values) <= 1:
+        yield from map(func, values)
+        return
+
+    remaining = iter(values)
+
+    with ThreadPoolExecutor(min(concurrency, len(values))) as executor:
+        pending: Deque["Future[R]"] = deque(
+            executor.submit(func, value) for value in islice(remaining, concurrency)
+        )
+
+        try:
+            while pending:
+                if not ordered:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.rotate(-next(i for i, f in enumerate(pending) if f in done))
+
+                result = pending.popleft().result()
+
+                for value in islice(remaining, 1):
+                    pending.append(executor.submit(func, value))
+
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
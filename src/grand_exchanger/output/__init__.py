@@ -0,0 +1,50 @@
+"""Output writers for price measurements."""
+from typing import IO, Optional
+
+from .influx import InfluxWriter
+from .parquet import ParquetWriter
+from .writers import JsonWriter, LineProtocolWriter, StreamWriter, Writer
+
+
+WRITERS = {"json": JsonWriter, "line-protocol": LineProtocolWriter}
+
+DATASET_WRITERS = {"influx": InfluxWriter, "parquet": ParquetWriter}
+
+
+def get_writer(
+    format: str, stream: Optional[IO[str]] = None, destination: Optional[str] = None
+) -> Writer:
+    """Returns a writer for an output format.
+
+    Args:
+        format (str): One of the formats in WRITERS or DATASET_WRITERS.
+        stream (Optional[IO[str]]): The stream to write to, defaults to stdout.
+        destination (Optional[str]): The directory or URI of a dataset format, or
+            the write URL of InfluxDB.
+
+    Returns:
+        Writer: A writer for the format.
+
+    Raises:
+        ValueError: A dataset format is missing its destination.
+    """
+    if format not in DATASET_WRITERS:
+        return WRITERS[format](stream)
+
+    if destination is None:
+        raise ValueError(f"The {format} format requires a destination")
+
+    return DATASET_WRITERS[format](destination)
+
+
+__all__ = [
+    "DATASET_WRITERS",
+    "get_writer",
+    "InfluxWriter",
+    "JsonWriter",
+    "LineProtocolWriter",
+    "ParquetWriter",
+    "StreamWriter",
+    "Writer",
+    "WRITERS",
+]
@@ -0,0 +1,248 @@
+"""Module for the InfluxDB write writer."""
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+import gzip
+import os
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+import requests.adapters
+
+from grand_exchanger import metrics
+from grand_exchanger.exceptions import WriteFailedException
+from grand_exchanger.models import PriceMeasurement
+from grand_exchanger.resources.governor import parse_retry_after, RETRY_STATUSES
+from grand_exchanger.resources.transport import CONNECT_TIMEOUT, READ_TIMEOUT
+from .writers import encode_line, Writer
+
+
+BATCH_SIZE = 5000
+
+FLUSH_INTERVAL = 10.0
+
+CONCURRENCY = 2
+
+RETRIES = 5
+
+BACKOFF = 0.5
+
+MAX_BACKOFF = 30.0
+
+TOKEN_VARIABLE = "INFLUX_TOKEN"
+
+
+class InfluxWriter(Writer):
+    """Posts measurements as gzipped line protocol to an InfluxDB write endpoint.
+
+    The destination is the write URL with its query, such as
+    ``http://localhost:8086/write?db=prices`` for InfluxDB 1.x or
+    ``http://localhost:8086/api/v2/write?org=ge&bucket=prices`` for 2.x. A token in
+    the INFLUX_TOKEN environment variable is sent with every request.
+
+    A batch is posted when it is full or its oldest measurement has waited for the
+    flush interval. Batches are posted from a thread pool over pooled connections,
+    with at most a few in flight, and throttled or failed posts are retried with
+    exponential backoff. Measurements count as pending until their post succeeded,
+    so flush waits for every batch in flight.
+    """
+
+    def __init__(
+        self,
+        destination: str,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        concurrency: int = CONCURRENCY,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+    ) -> None:
+        """Initialises the writer.
+
+        Args:
+            destination (str): The write URL.
+            batch_size (int): Number of measurements per post.
+            flush_interval (float): Maximum seconds a measurement is buffered.
+            concurrency (int): Maximum number of posts in flight.
+            retries (int): Number of retries of a failed post.
+            backoff (float): Seconds before the first retry, doubled for each retry.
+
+        Raises:
+            ValueError: The destination is not a write URL.
+        """
+        super().__init__(batch_size)
+
+        parts = urlsplit(destination)
+
+        if parts.scheme not in ("http", "https") or not parts.path.endswith("/write"):
+            raise ValueError(f"{destination} is not an InfluxDB write URL")
+
+        self.url = urlunsplit(parts._replace(query=""))
+        self.params = dict(parse_qsl(parts.query))
+        self.params["precision"] = "ns" if parts.path.endswith("/api/v2/write") else "n"
+
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+
+        self.headers = {
+            "Content-Encoding": "gzip",
+            "Content-Type": "text/plain; charset=utf-8",
+        }
+        token = os.environ.get(TOKEN_VARIABLE)
+
+        if token:
+            self.headers["Authorization"] = f"Token {token}"
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=concurrency
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(concurrency)
+        self._in_flight: Dict[Future, int] = {}
+        self._lines: List[str] = []
+        self._since = 0.0
+
+    def write(self, measurement: PriceMeasurement) -> None:
+        """Buffers a measurement, posting the buffer when full or due.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+        """
+        if not self._lines:
+            self._since = time.monotonic()
+
+        self._lines.append(encode_line(measurement))
+
+        if (
+            len(self._lines) >= self.batch_size
+            or time.monotonic() - self._since >= self.flush_interval
+        ):
+            self._submit()
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of measurements not yet written.
+
+        Returns:
+            int: Number of buffered measurements and measurements in flight.
+        """
+        return len(self._lines) + sum(self._in_flight.values())
+
+    def reserve(self, count: int) -> None:
+        """Posts the buffer first if a number of measurements would not fit in it.
+
+        Unlike flush, this does not wait for the posts in flight.
+
+        Args:
+            count (int): Number of measurements about to be written.
+        """
+        if self._lines and len(self._lines) + count > self.batch_size:
+            self._submit()
+
+    def flush(self) -> None:
+        """Posts the buffer and waits until all posts in flight succeeded."""
+        self._submit()
+
+        if self._in_flight:
+            self._wait(ALL_COMPLETED)
+
+    def close(self) -> None:
+        """Writes all buffered measurements and closes the connections."""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+            self.session.close()
+
+    def _submit(self) -> None:
+        """Posts the buffer in the background, once fewer posts are in flight."""
+        if not self._lines:
+            return
+
+        while len(self._in_flight) >= self.concurrency:
+            self._wait(FIRST_COMPLETED)
+
+        body = "".join(self._lines).encode()
+        future = self._executor.submit(self._post, body, len(self._lines))
+        self._in_flight[future] = len(self._lines)
+        self._lines = []
+
+    def _wait(self, return_when: str) -> None:
+        """Waits for posts in flight, raising the error of a failed post.
+
+        Args:
+            return_when (str): FIRST_COMPLETED or ALL_COMPLETED.
+        """
+        done, _ = wait(list(self._in_flight), return_when=return_when)
+
+        for future in done:
+            del self._in_flight[future]
+
+        for future in done:
+            future.result()
+
+    def _post(self, body: bytes, count: int) -> None:
+        """Posts a batch, retrying connection errors, throttling and server errors.
+
+        Args:
+            body (bytes): Line protocol points.
+            count (int): Number of points.
+
+        Raises:
+            WriteFailedException: The batch was refused or all retries failed.
+        """
+        data = gzip.compress(body)
+        attempt = 0
+
+        while True:
+            delay: Optional[float] = None
+
+            try:
+                response = self.session.post(
+                    self.url,
+                    params=self.params,
+                    data=data,
+                    headers=self.headers,
+                    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                )
+            except (requests.ConnectionError, requests.Timeout) as error:
+                metrics.inc("influx_writes_total", status=type(error).__name__)
+
+                if attempt == self.retries:
+                    raise WriteFailedException(
+                        f"Writing to {self.url} failed"
+                    ) from error
+            else:
+                metrics.inc("influx_writes_total", status=str(response.status_code))
+
+                if response.ok:
+                    self.emitted(count)
+                    return
+
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.retries
+                ):
+                    raise WriteFailedException(
+                        f"Writing to {self.url} failed with {response.status_code}: "
+                        f"{response.text[:200]}"
+                    )
+
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+
+            time.sleep(
+                delay
+                if delay is not None
+                else min(self.backoff * 2**attempt, MAX_BACKOFF)
+            )
+            attempt += 1
@@ -0,0 +1,235 @@
+"""Module for the partitioned Parquet dataset writer."""
+from collections import OrderedDict
+from datetime import date, timedelta
+import os
+import typing
+from typing import Any, Dict, List, Tuple
+import uuid
+
+from grand_exchanger.models import PriceMeasurement
+from .writers import Writer
+
+
+ROW_GROUP_SIZE = 256 * 1024
+
+MAX_OPEN_FILES = 64
+
+DICTIONARY_COLUMNS = ["category", "members"]
+
+DAY = 24 * 60 * 60
+
+EPOCH = date(1970, 1, 1)
+
+
+class ParquetWriter(Writer):
+    """Writes measurements to a Parquet dataset partitioned by date and category.
+
+    Files are laid out as ``date=YYYY-MM-DD/category_id=N/part-*.parquet``, so a scan
+    of one day only reads the files of that day. Each partition has one open file,
+    to which a row group is appended whenever the buffer is full, with the category
+    name and members flag dictionary encoded.
+
+    Files only become readable once they are closed, so measurements count as
+    pending until then. Flushing closes all files, and the next measurements of a
+    partition start a new one. At most `max_open_files` are open at once, the least
+    recently written is closed early to open another.
+
+    The destination is a local directory or a URI that pyarrow understands, such as
+    ``s3://bucket/prefix?endpoint_override=localhost:9000&scheme=http`` for an S3
+    compatible store. pyarrow is only imported when a writer is created.
+    """
+
+    def __init__(
+        self,
+        destination: str,
+        batch_size: int = ROW_GROUP_SIZE,
+        max_open_files: int = MAX_OPEN_FILES,
+    ) -> None:
+        """Initialises the writer.
+
+        Args:
+            destination (str): The dataset directory or URI.
+            batch_size (int): Number of measurements buffered per row group.
+            max_open_files (int): Maximum number of partition files open at once.
+
+        Raises:
+            ImportError: pyarrow is not installed.
+        """
+        super().__init__(batch_size)
+
+        try:
+            from pyarrow import fs
+        except ImportError as error:
+            raise ImportError("The parquet format requires pyarrow") from error
+
+        if "://" not in destination:
+            destination = os.path.abspath(destination)
+
+        self.filesystem, self.path = fs.FileSystem.from_uri(destination)
+        self.max_open_files = max_open_files
+
+        self._prefix = f"part-{uuid.uuid4().hex}"
+        self._files_opened = 0
+        self._files: typing.OrderedDict[
+            Tuple[int, int], Tuple[Any, Any, int]
+        ] = OrderedDict()
+        self._times: List[int] = []
+        self._item_ids: List[int] = []
+        self._categories: List[str] = []
+        self._category_ids: List[int] = []
+        self._members: List[bool] = []
+        self._prices: List[int] = []
+
+    def write(self, measurement: PriceMeasurement) -> None:
+        """Buffers a measurement, appending the buffer to the open files when full.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+        """
+        self._times.append(measurement.epoch)
+        self._item_ids.append(measurement.item.id)
+        self._categories.append(measurement.category.name)
+        self._category_ids.append(measurement.category.id)
+        self._members.append(measurement.item.members)
+        self._prices.append(measurement.price)
+
+        if len(self._times) >= self.batch_size:
+            self._append()
+
+    def reserve(self, count: int) -> None:
+        """Appends the buffer to the open files if measurements would not fit in it.
+
+        Args:
+            count (int): Number of measurements about to be written.
+        """
+        if self._times and len(self._times) + count > self.batch_size:
+            self._append()
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of measurements that are not readable yet.
+
+        Returns:
+            int: Number of measurements buffered or in files that are still open.
+        """
+        return len(self._times) + sum(rows for _, _, rows in self._files.values())
+
+    def flush(self) -> None:
+        """Writes all buffered measurements and closes the open files."""
+        self._append()
+
+        while self._files:
+            self._close(next(iter(self._files)))
+
+    def _append(self) -> None:
+        """Appends the buffered measurements to the files of their partitions."""
+        if not self._times:
+            return
+
+        rows: Dict[Tuple[int, int], List[int]] = {}
+
+        for row, epoch in enumerate(self._times):
+            rows.setdefault((epoch // DAY, self._category_ids[row]), []).append(row)
+
+        table = self._table()
+
+        for partition, indices in rows.items():
+            stream, writer, count = self._open(partition)
+            writer.write_table(table.take(indices), row_group_size=self.batch_size)
+            self._files[partition] = stream, writer, count + len(indices)
+
+        for column in (
+            self._times,
+            self._item_ids,
+            self._categories,
+            self._category_ids,
+            self._members,
+            self._prices,
+        ):
+            column.clear()
+
+    def _open(self, partition: Tuple[int, int]) -> Tuple[Any, Any, int]:
+        """Returns the open file of a partition, opening a new file if needed.
+
+        Args:
+            partition (Tuple[int, int]): Days since the epoch and category ID.
+
+        Returns:
+            Tuple[Any, Any, int]: The output stream, the pyarrow Parquet writer and
+                the number of measurements written to the file.
+        """
+        import pyarrow.parquet as pq
+
+        if partition in self._files:
+            self._files.move_to_end(partition)
+            return self._files[partition]
+
+        while len(self._files) >= self.max_open_files:
+            self._close(next(iter(self._files)))
+
+        day, category_id = partition
+        directory = (
+            f"{self.path}/date={EPOCH + timedelta(days=day)}/category_id={category_id}"
+        )
+        self.filesystem.create_dir(directory, recursive=True)
+        stream = self.filesystem.open_output_stream(
+            f"{directory}/{self._prefix}-{self._files_opened}.parquet"
+        )
+        writer = pq.ParquetWriter(
+            stream,
+            self._schema(),
+            use_dictionary=DICTIONARY_COLUMNS,
+            compression="zstd",
+        )
+        self._files_opened += 1
+        self._files[partition] = stream, writer, 0
+
+        return self._files[partition]
+
+    def _close(self, partition: Tuple[int, int]) -> None:
+        """Closes the open file of a partition, making its measurements readable.
+
+        Args:
+            partition (Tuple[int, int]): Days since the epoch and category ID.
+        """
+        stream, writer, count = self._files.pop(partition)
+        writer.close()
+        stream.close()
+        self.emitted(count)
+
+    def _schema(self) -> Any:
+        """Returns the schema of the files, without the partition columns.
+
+        Returns:
+            Any: A pyarrow schema.
+        """
+        import pyarrow as pa
+
+        return pa.schema(
+            [
+                ("time", pa.timestamp("s", tz="UTC")),
+                ("item_id", pa.int32()),
+                ("category", pa.dictionary(pa.int32(), pa.string())),
+                ("members", pa.bool_()),
+                ("price", pa.int64()),
+            ]
+        )
+
+    def _table(self) -> Any:
+        """Returns the buffered measurements as a table.
+
+        Returns:
+            Any: A pyarrow table with the columns of the files.
+        """
+        import pyarrow as pa
+
+        return pa.table(
+            {
+                "time": pa.array(self._times, pa.timestamp("s", tz="UTC")),
+                "item_id": pa.array(self._item_ids, pa.int32()),
+                "category": pa.array(self._categories, pa.string()).dictionary_encode(),
+                "members": pa.array(self._members, pa.bool_()),
+                "price": pa.array(self._prices, pa.int64()),
+            },
+            schema=self._schema(),
+        )
@@ -0,0 +1,220 @@
+"""Module for buffered measurement writers."""
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import json
+from typing import Any, IO, List, Optional
+
+import click
+
+from grand_exchanger import metrics
+from grand_exchanger.models import PriceMeasurement
+
+
+BATCH_SIZE = 4096
+
+
+def get_command() -> str:
+    """Returns the command that is running, without the program name.
+
+    Returns:
+        str: The command path, such as ``fetch all``, or an empty string.
+    """
+    ctx = click.get_current_context(silent=True)
+
+    return ctx.command_path.partition(" ")[2] if ctx is not None else ""
+
+
+class Writer(ABC):
+    """Writes measurements in large batches."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE) -> None:
+        """Initialises the writer.
+
+        Args:
+            batch_size (int): Number of measurements buffered between writes.
+        """
+        self.batch_size = batch_size
+        self.command = get_command()
+
+    @abstractmethod
+    def write(self, measurement: PriceMeasurement) -> None:
+        """Buffers a measurement, writing the buffer when full.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+        """
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Writes all buffered measurements."""
+
+    @property
+    @abstractmethod
+    def pending(self) -> int:
+        """Returns the number of buffered measurements.
+
+        Returns:
+            int: Number of measurements not yet written.
+        """
+
+    def emitted(self, count: int) -> None:
+        """Counts measurements written by the running command.
+
+        Args:
+            count (int): Number of measurements written.
+        """
+        metrics.inc("measurements_emitted_total", count, command=self.command)
+
+    def reserve(self, count: int) -> None:
+        """Writes the buffer first if a number of measurements would not fit in it.
+
+        Measurements written after a reservation are written together.
+
+        Args:
+            count (int): Number of measurements about to be written.
+        """
+        if self.pending and self.pending + count > self.batch_size:
+            self.flush()
+
+    def close(self) -> None:
+        """Writes all buffered measurements."""
+        self.flush()
+
+    def __enter__(self) -> "Writer":
+        """Returns the writer as a context manager.
+
+        Returns:
+            Writer: This writer.
+        """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Writes all buffered measurements when leaving the context.
+
+        Args:
+            args (Any): Exception information.
+        """
+        self.close()
+
+
+class StreamWriter(Writer):
+    """Writes encoded measurements to a stream in large batches."""
+
+    def __init__(
+        self, stream: Optional[IO[str]] = None, batch_size: int = BATCH_SIZE
+    ) -> None:
+        """Initialises the writer.
+
+        Args:
+            stream (Optional[IO[str]]): The stream to write to, defaults to stdout.
+            batch_size (int): Number of measurements buffered between writes.
+        """
+        super().__init__(batch_size)
+        self.stream = stream or click.get_text_stream("stdout")
+        self._lines: List[str] = []
+
+    @abstractmethod
+    def encode(self, measurement: PriceMeasurement) -> str:
+        """Encodes a measurement as a line of output.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+
+        Returns:
+            str: The encoded measurement, ending in a newline.
+        """
+
+    def write(self, measurement: PriceMeasurement) -> None:
+        """Buffers a measurement, writing the buffer when full.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+        """
+        self._lines.append(self.encode(measurement))
+
+        if len(self._lines) >= self.batch_size:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of buffered measurements.
+
+        Returns:
+            int: Number of measurements not yet written to the stream.
+        """
+        return len(self._lines)
+
+    def flush(self) -> None:
+        """Writes all buffered measurements."""
+        if self._lines:
+            self.stream.write("".join(self._lines))
+            self.emitted(len(self._lines))
+            self._lines = []
+
+        self.stream.flush()
+
+
+class JsonWriter(StreamWriter):
+    """Writes measurements as newline delimited JSON."""
+
+    def encode(self, measurement: PriceMeasurement) -> str:
+        """Encodes a measurement as a JSON document.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+
+        Returns:
+            str: A line of JSON.
+        """
+        return json.dumps(measurement.to_dict()) + "\n"
+
+
+@lru_cache(maxsize=None)
+def escape_tag(value: str) -> str:
+    """Escapes a tag key or value for line protocol.
+
+    Args:
+        value (str): A tag key or value.
+
+    Returns:
+        str: The escaped tag.
+    """
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace("=", "\\=")
+        .replace(" ", "\\ ")
+    )
+
+
+def encode_line(measurement: PriceMeasurement) -> str:
+    """Encodes a measurement as a line protocol point with a nanosecond timestamp.
+
+    Args:
+        measurement (PriceMeasurement): A price measurement.
+
+    Returns:
+        str: A line protocol point, ending in a newline.
+    """
+    return "price,category=%s,item_id=%d,members=%s value=%di %d000000000\n" % (
+        escape_tag(measurement.category.name),
+        measurement.item.id,
+        "true" if measurement.item.members else "false",
+        measurement.price,
+        measurement.epoch,
+    )
+
+
+class LineProtocolWriter(StreamWriter):
+    """Writes measurements as InfluxDB line protocol with nanosecond timestamps."""
+
+    def encode(self, measurement: PriceMeasurement) -> str:
+        """Encodes a measurement as a line protocol point.
+
+        Args:
+            measurement (PriceMeasurement): A price measurement.
+
+        Returns:
+            str: A line protocol point.
+        """
+        return encode_line(measurement)
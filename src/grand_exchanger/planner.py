@@ -0,0 +1,180 @@
+"""Module for planning crawls that are split over several nodes."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from grand_exchanger import resources
+from grand_exchanger.models import Category
+
+
+PAGE_SIZE = 12
+
+SHARD_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+@dataclass
+class Page:
+    """A page of items to request, with the number of items expected on it."""
+
+    category: Category
+    letter: str
+    number: int
+    items: int
+
+
+@dataclass
+class Shard:
+    """One of several equal parts of a crawl, numbered from 1."""
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, value: str) -> Shard:
+        """Parses a shard of the form ``k/n``.
+
+        Args:
+            value (str): The shard.
+
+        Returns:
+            Shard: The shard.
+
+        Raises:
+            ValueError: The value is not of the form ``k/n`` with 1 <= k <= n.
+        """
+        match = SHARD_PATTERN.match(value)
+
+        if match is None:
+            raise ValueError(f"{value!r} is not of the form k/n")
+
+        shard = cls(int(match.group(1)), int(match.group(2)))
+
+        if not 1 <= shard.index <= shard.count:
+            raise ValueError(f"{value!r} is not a shard between 1/n and n/n")
+
+        return shard
+
+    def __str__(self) -> str:
+        """Returns the shard in the form ``k/n``.
+
+        Returns:
+            str: The shard.
+        """
+        return f"{self.index}/{self.count}"
+
+
+def plan_pages(categories: Iterable[Category]) -> Iterator[Page]:
+    """Yields the item pages of categories in the order of a sequential crawl.
+
+    Page counts follow from the item counts per letter of the category breakdowns,
+    so letters without items are left out.
+
+    Args:
+        categories (Iterable[Category]): The categories to crawl.
+
+    Yields:
+        Page: The next page.
+    """
+    for category in categories:
+        breakdown = resources.get_category_breakdown(category.id)
+
+        for lc in breakdown.alpha:
+            for number in range(1, math.ceil(lc.items / PAGE_SIZE) + 1):
+                items = min(PAGE_SIZE, lc.items - (number - 1) * PAGE_SIZE)
+                yield Page(category, lc.letter, number, items)
+
+
+def page_requests(page: Page) -> int:
+    """Returns the number of requests to crawl the items of a page.
+
+    Args:
+        page (Page): A page.
+
+    Returns:
+        int: One request.
+    """
+    return 1
+
+
+def price_requests(page: Page) -> int:
+    """Returns the number of requests to crawl the price histories of a page.
+
+    Args:
+        page (Page): A page.
+
+    Returns:
+        int: One request for the page and one for each of its items.
+    """
+    return 1 + page.items
+
+
+def partition(
+    pages: Iterable[Page], count: int, cost: Callable[[Page], int] = page_requests
+) -> List[List[Page]]:
+    """Splits pages into contiguous parts of about the same cost.
+
+    A page goes to the part that contains the midpoint of its cost on the cumulative
+    cost of all pages, so parts differ by at most the cost of one page. The split only
+    depends on the pages, which makes it the same on every node.
+
+    Args:
+        pages (Iterable[Page]): Pages in crawl order.
+        count (int): Number of parts.
+        cost (Callable[[Page], int]): Returns the number of requests for a page.
+
+    Returns:
+        List[List[Page]]: The pages of each part.
+    """
+    costed = [(page, cost(page)) for page in pages]
+    total = sum(c for _, c in costed) or 1
+    parts: List[List[Page]] = [[] for _ in range(count)]
+    done = 0
+
+    for page, c in costed:
+        parts[min(count - 1, (2 * done + c) * count // (2 * total))].append(page)
+        done += c
+
+    return parts
+
+
+def group_pages(pages: Iterable[Page]) -> Dict[int, List[Tuple[str, int]]]:
+    """Groups pages by category.
+
+    Args:
+        pages (Iterable[Page]): Pages.
+
+    Returns:
+        Dict[int, List[Tuple[str, int]]]: Letters and numbers of the pages by category
+            ID, in crawl order.
+    """
+    grouped: Dict[int, List[Tuple[str, int]]] = {}
+
+    for page in pages:
+        grouped.setdefault(page.category.id, []).append((page.letter, page.number))
+
+    return grouped
+
+
+def plan_shard(
+    categories: Iterable[Category],
+    shard: Shard,
+    cost: Callable[[Page], int] = page_requests,
+) -> Tuple[List[Category], Dict[int, List[Tuple[str, int]]]]:
+    """Returns the part of a crawl that a shard is responsible for.
+
+    Args:
+        categories (Iterable[Category]): The categories of the whole crawl.
+        shard (Shard): The shard.
+        cost (Callable[[Page], int]): Returns the number of requests for a page.
+
+    Returns:
+        Tuple[List[Category], Dict[int, List[Tuple[str, int]]]]: The categories with
+            pages in the shard, and those pages by category ID.
+    """
+    pages = partition(plan_pages(categories), shard.count, cost)[shard.index - 1]
+    selected = {page.category.id: page.category for page in pages}
+
+    return list(selected.values()), group_pages(pages)
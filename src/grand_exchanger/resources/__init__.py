@@ -1,14 +1,58 @@
-"""Resources classes and methods."""
-from .category import (
-    get_categories,
-    get_category_breakdown,
-)
-from .details import get_item_details
-from .graph import get_historical_prices
-from .items import get_items_page
+"""Resources classes and methods.
+
+Resource modules are imported on first use, so commands only pay for the resources
+they call.
+"""
+from importlib import import_module
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .category import (
+        fetch_category_breakdown,
+        forget_category_breakdowns,
+        get_categories,
+        get_category_breakdown,
+    )
+    from .details import get_item_details
+    from .graph import get_historical_prices
+    from .items import get_items_page
+
+
+_MODULES = {
+    "fetch_category_breakdown": "category",
+    "forget_category_breakdowns": "category",
+    "get_categories": "category",
+    "get_category_breakdown": "category",
+    "get_historical_prices": "graph",
+    "get_item_details": "details",
+    "get_items_page": "items",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Imports a resource function on first access.
+
+    Args:
+        name (str): The attribute name.
+
+    Returns:
+        Any: The resource function.
+
+    Raises:
+        AttributeError: The attribute does not exist.
+    """
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{_MODULES[name]}", __name__), name)
+    globals()[name] = value
+
+    return value
 
 
 __all__ = [
+    "fetch_category_breakdown",
+    "forget_category_breakdowns",
     "get_categories",
     "get_category_breakdown",
     "get_historical_prices",
@@ -0,0 +1,430 @@
+"""Module for the on-disk HTTP response cache."""
+from dataclasses import dataclass, field
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+import zlib
+
+import requests
+import requests.adapters
+from requests.structures import CaseInsensitiveDict
+
+from grand_exchanger.store.paths import state_path, write_atomic
+from .governor import Cert, GovernedAdapter, Timeout
+
+
+MAX_SIZE = 256 * 1024 * 1024
+
+MAX_STALE = 24 * 60 * 60
+
+TTLS = {
+    "breakdown": 24 * 60 * 60,
+    "details": 60 * 60,
+    "graph": 6 * 60 * 60,
+    "items": 60 * 60,
+}
+
+ENDPOINTS = [
+    ("breakdown", re.compile(r"/api/catalogue/category\.json")),
+    ("details", re.compile(r"/api/catalogue/detail\.json")),
+    ("graph", re.compile(r"/api/graph/\d+\.json")),
+    ("items", re.compile(r"/api/catalogue/items\.json")),
+]
+
+
+def get_endpoint(url: str) -> Optional[str]:
+    """Returns the name of the cacheable endpoint for a URL.
+
+    Args:
+        url (str): A request URL.
+
+    Returns:
+        Optional[str]: The endpoint name, or None if the URL is not cacheable.
+    """
+    for name, pattern in ENDPOINTS:
+        if pattern.search(url):
+            return name
+
+    return None
+
+
+@dataclass
+class Entry:
+    """Representation of a cached response."""
+
+    url: str
+    stored: float
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Returns headers for conditionally revalidating this entry.
+
+        Returns:
+            Dict[str, str]: Conditional request headers.
+        """
+        validators = {}
+
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+
+        return validators
+
+
+class ResponseCache:
+    """Persistent cache of response bodies.
+
+    Entries are zlib compressed files named after the hash of their URL. Files are
+    replaced atomically and evicted in least recently used order under a file lock,
+    so several processes can share the same cache directory.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size: int = MAX_SIZE,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_while_revalidate: bool = False,
+        max_stale: float = MAX_STALE,
+    ) -> None:
+        """Initialises the cache.
+
+        Args:
+            directory (Optional[str]): The directory to store entries in.
+            max_size (int): Disk budget in bytes.
+            ttls (Optional[Dict[str, float]]): Seconds to live per endpoint.
+            stale_while_revalidate (bool): Serve stale entries while they are
+                revalidated in the background.
+            max_stale (float): Seconds past their time to live for which stale
+                entries may be served, after which they are revalidated first.
+        """
+        self.directory = directory or state_path("http")
+        self.max_size = max_size
+        self.ttls = {**TTLS, **(ttls or {})}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        """Returns the file for a URL.
+
+        Args:
+            url (str): A request URL.
+
+        Returns:
+            str: The path of the cache entry.
+        """
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest())
+
+    def get(self, url: str) -> Optional[Entry]:
+        """Returns the entry for a URL and marks it as recently used.
+
+        Args:
+            url (str): A request URL.
+
+        Returns:
+            Optional[Entry]: The cached entry, or None on a miss.
+        """
+        path = self._path(url)
+
+        try:
+            with open(path, "rb") as f:
+                header, body = f.read().split(b"\n", 1)
+
+            meta = json.loads(header)
+            entry = Entry(url, meta["stored"], zlib.decompress(body), meta["headers"])
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zlib.error):
+            return None
+
+        return entry if entry.url == meta["url"] else None
+
+    def put(self, entry: Entry) -> None:
+        """Stores an entry, evicting old entries when over budget.
+
+        Args:
+            entry (Entry): The entry to store.
+        """
+        header = {"url": entry.url, "stored": entry.stored, "headers": entry.headers}
+        data = json.dumps(header).encode() + b"\n" + zlib.compress(entry.body)
+        write_atomic(self._path(entry.url), data)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(data)
+
+            if self._size > self.max_size:
+                self._size = self.evict()
+
+    def is_fresh(self, endpoint: str, entry: Entry) -> bool:
+        """Returns whether an entry is within its time to live.
+
+        Args:
+            endpoint (str): The endpoint name.
+            entry (Entry): A cached entry.
+
+        Returns:
+            bool: True if the entry can be served without revalidation.
+        """
+        return time.time() - entry.stored < self.ttls[endpoint]
+
+    def is_servable(self, endpoint: str, entry: Entry) -> bool:
+        """Returns whether a stale entry can be served while it is revalidated.
+
+        Background revalidations do not outlive the process, so a process that keeps
+        exiting before they complete would otherwise serve the same entry forever.
+
+        Args:
+            endpoint (str): The endpoint name.
+            entry (Entry): A cached entry.
+
+        Returns:
+            bool: True if the entry can be served before revalidation.
+        """
+        return (
+            self.stale_while_revalidate
+            and time.time() - entry.stored < self.ttls[endpoint] + self.max_stale
+        )
+
+    def _scan(self) -> Iterator[Tuple[float, int, str]]:
+        """Lists the entries on disk, skipping entries removed while listing.
+
+        Yields:
+            Tuple[float, int, str]: Last use, size in bytes and path of an entry.
+        """
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.is_file() and not e.name.startswith("."):
+                    try:
+                        stat = e.stat()
+                    except OSError:
+                        continue
+
+                    yield stat.st_mtime, stat.st_size, e.path
+
+    def _disk_usage(self) -> int:
+        """Returns the total size of all entries.
+
+        Returns:
+            int: Size in bytes.
+        """
+        return sum(size for _, size, _ in self._scan())
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits its budget.
+
+        Returns:
+            int: The remaining size in bytes.
+        """
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            entries = list(self._scan())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_size * 0.9
+
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+
+                total -= size
+
+        return total
+
+
+class CachingAdapter(GovernedAdapter):
+    """Transport adapter that serves cacheable GET requests from a ResponseCache.
+
+    Requests with a `Cache-Control: no-cache` header always revalidate the cached
+    entry with the API.
+    """
+
+    def __init__(self, cache: ResponseCache, **kwargs: Any) -> None:
+        """Initialises the adapter.
+
+        Args:
+            cache (ResponseCache): The response cache.
+            kwargs (Any): Arguments for requests.adapters.HTTPAdapter.
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+
+        self._revalidations: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Cert = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """Sends a request, using the cache where possible.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            stream (bool): Stream the response content.
+            timeout (Timeout): Seconds to wait for the server.
+            verify (Union[bool, str]): Verify TLS certificates, or a CA bundle path.
+            cert (Cert): A client certificate.
+            proxies (Optional[Dict[str, str]]): Proxies by protocol.
+
+        Returns:
+            requests.Response: A live or cached response.
+        """
+        kwargs: Dict[str, Any] = dict(
+            stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies
+        )
+        endpoint = get_endpoint(request.url or "")
+
+        if request.method != "GET" or endpoint is None:
+            return super().send(request, **kwargs)
+
+        entry = self.cache.get(request.url)  # type: ignore
+
+        if entry is not None and "no-cache" not in request.headers.get(
+            "Cache-Control", ""
+        ):
+            if self.cache.is_fresh(endpoint, entry):
+                return self._build(request, entry)
+
+            if self.cache.is_servable(endpoint, entry):
+                self._revalidate_in_background(request.copy(), entry, kwargs)
+                return self._build(request, entry)
+
+        return self._revalidate(request, entry, kwargs)
+
+    def wait(self) -> None:
+        """Waits for the background revalidations in progress."""
+        with self._lock:
+            revalidations = list(self._revalidations.values())
+
+        for thread in revalidations:
+            thread.join()
+
+    def _revalidate_in_background(
+        self,
+        request: requests.PreparedRequest,
+        entry: Entry,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """Starts revalidating an entry, unless it is being revalidated already.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            entry (Entry): The stale entry.
+            kwargs (Dict[str, Any]): Arguments for requests.adapters.HTTPAdapter.send.
+        """
+        with self._lock:
+            if entry.url not in self._revalidations:
+                thread = threading.Thread(
+                    target=self._revalidate_quietly,
+                    args=(request, entry, kwargs),
+                    daemon=True,
+                )
+                self._revalidations[entry.url] = thread
+                thread.start()
+
+    def _revalidate(
+        self,
+        request: requests.PreparedRequest,
+        entry: Optional[Entry],
+        kwargs: Dict[str, Any],
+    ) -> requests.Response:
+        """Sends a request, conditional on a stale entry if there is one.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            entry (Optional[Entry]): The stale entry.
+            kwargs (Dict[str, Any]): Arguments for requests.adapters.HTTPAdapter.send.
+
+        Returns:
+            requests.Response: A live or revalidated cached response.
+        """
+        if entry is not None:
+            request.headers.update(entry.validators)
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            entry.stored = time.time()
+            self.cache.put(entry)
+
+            return self._build(request, entry)
+
+        if response.status_code == 200:
+            headers = {
+                k: response.headers[k]
+                for k in ("Content-Type", "ETag", "Last-Modified")
+                if k in response.headers
+            }
+            self.cache.put(
+                Entry(request.url, time.time(), response.content, headers)  # type: ignore
+            )
+
+        return response
+
+    def _revalidate_quietly(
+        self,
+        request: requests.PreparedRequest,
+        entry: Entry,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """Revalidates an entry, ignoring failures.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            entry (Entry): The stale entry.
+            kwargs (Dict[str, Any]): Arguments for requests.adapters.HTTPAdapter.send.
+        """
+        try:
+            self._revalidate(request, entry, kwargs).close()
+        except Exception:  # noqa: S110
+            pass
+        finally:
+            with self._lock:
+                del self._revalidations[entry.url]
+
+    @staticmethod
+    def _build(request: requests.PreparedRequest, entry: Entry) -> requests.Response:
+        """Builds a response from a cached entry.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            entry (Entry): The cached entry.
+
+        Returns:
+            requests.Response: The cached response.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = entry.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response._content_consumed = True  # type: ignore
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+
+        return response
@@ -1,14 +1,15 @@
 """Module for category API resources."""
 from dataclasses import dataclass
-from typing import Iterator, List, Tuple
+import json
+import time
+from typing import Dict, Iterator, List, Tuple
 
-import desert
 import marshmallow
-import requests
-import requests_html
 import retrying
 
-from .helpers import retry_cases
+from grand_exchanger import metrics
+from . import cache, transport
+from .helpers import lazy_schema, parse_int, parse_str, RETRY
 
 
 API_URL = (
@@ -16,6 +17,10 @@ API_URL = (
     "category={category_id}"
 )
 
+MEMO_TTL = cache.TTLS["breakdown"]
+
+_breakdowns: Dict[int, Tuple[float, "CategoryBreakdown"]] = {}
+
 
 @dataclass
 class LetterCount:
@@ -32,13 +37,62 @@ class CategoryBreakdown:
     alpha: List[LetterCount]
 
 
-schema = desert.schema(CategoryBreakdown, meta={"unknown": marshmallow.EXCLUDE})
+__getattr__ = lazy_schema(CategoryBreakdown, __name__)
+
+
+def decode(content: bytes) -> CategoryBreakdown:
+    """Decodes a category breakdown payload.
+
+    Args:
+        content (bytes): The JSON payload.
+
+    Returns:
+        CategoryBreakdown: A category breakdown.
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    data = json.loads(content)
+
+    try:
+        alpha = [
+            LetterCount(parse_str(i["letter"]), parse_int(i["items"]))
+            for i in data["alpha"]
+        ]
+    except (KeyError, TypeError) as error:
+        raise marshmallow.ValidationError("Missing data for required field.") from error
+
+    return CategoryBreakdown(alpha)
 
 
-@retrying.retry(
-    retry_on_exception=retry_cases, wait_random_min=1000, wait_random_max=3000
-)
 def get_category_breakdown(category_id: int) -> CategoryBreakdown:
+    """Returns the breakdown of a category, requested once per process.
+
+    Breakdowns change as items are added to the catalogue, so they are requested
+    again once they are older than the response cache keeps them.
+
+    Args:
+        category_id (int): A valid category ID.
+
+    Returns:
+        CategoryBreakdown: A category breakdown.
+    """
+    memo = _breakdowns.get(category_id)
+
+    if memo is None or time.monotonic() - memo[0] > MEMO_TTL:
+        memo = (time.monotonic(), fetch_category_breakdown(category_id))
+        _breakdowns[category_id] = memo
+
+    return memo[1]
+
+
+def forget_category_breakdowns() -> None:
+    """Forgets the breakdowns requested by this process."""
+    _breakdowns.clear()
+
+
+@retrying.retry(**RETRY)
+def fetch_category_breakdown(category_id: int) -> CategoryBreakdown:
     """Parses a category breakdown payload.
 
     Args:
@@ -47,25 +101,26 @@ def get_category_breakdown(category_id: int) -> CategoryBreakdown:
     Returns:
         CategoryBreakdown: A category breakdown.
     """
-    with requests.get(API_URL.format(category_id=category_id)) as response:
+    with transport.get(API_URL.format(category_id=category_id)) as response:
         response.raise_for_status()
-        return schema.load(response.json())
+        with metrics.timer(
+            "decode_seconds", metrics.DECODE_BUCKETS, resource="breakdown"
+        ):
+            return decode(response.content)
 
 
 CATEGORY_URL = "https://secure.runescape.com/m=itemdb_rs/catalogue"
 
 
-@retrying.retry(
-    retry_on_exception=retry_cases, wait_random_min=1000, wait_random_max=3000
-)
+@retrying.retry(**RETRY)
 def get_categories() -> Iterator[Tuple[int, str]]:
     """Parses categories from HTML.
 
     Yields:
         Tuple[int, str]: The next tuple of category ID and name.
     """
-    session = requests_html.HTMLSession()
-    response = session.get(CATEGORY_URL)
+    response = transport.get_html(CATEGORY_URL)
+    response.raise_for_status()
 
     categories = {}
 
@@ -1,9 +1,13 @@
 """Module for common functionality."""
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Mapping
 
 import desert
+import marshmallow
+from marshmallow import ValidationError
 
-from .helpers import Price
+from .helpers import parse_bool, parse_int, parse_price, parse_str, Price
 
 
 @dataclass
@@ -25,3 +29,69 @@ class Item:
     current: PriceTrend
     today: PriceTrend
     members: bool
+
+
+@lru_cache(maxsize=None)
+def item_schema() -> marshmallow.Schema:
+    """Returns the schema for nested item payloads.
+
+    Returns:
+        marshmallow.Schema: The item schema.
+    """
+    return desert.schema_class(Item, meta={"unknown": marshmallow.EXCLUDE})()
+
+
+def decode_price_trend(data: Mapping[str, Any], strict: bool = True) -> PriceTrend:
+    """Decodes a price trend payload.
+
+    Args:
+        data (Mapping[str, Any]): A decoded JSON object.
+        strict (bool): Validate the types of all fields.
+
+    Returns:
+        PriceTrend: A price trend.
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    try:
+        trend = data["trend"]
+        price = data["price"]
+    except (KeyError, TypeError) as error:
+        raise ValidationError("Missing data for required field.") from error
+
+    return PriceTrend(parse_str(trend) if strict else trend, parse_price(price))
+
+
+def decode_item(data: Mapping[str, Any], strict: bool = True) -> Item:
+    """Decodes an item payload.
+
+    Args:
+        data (Mapping[str, Any]): A decoded JSON object.
+        strict (bool): Validate the types of all fields.
+
+    Returns:
+        Item: An item.
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    try:
+        item = Item(
+            parse_int(data["id"]),
+            data["name"],
+            data["description"],
+            data["type"],
+            decode_price_trend(data["current"], strict),
+            decode_price_trend(data["today"], strict),
+            parse_bool(data["members"]),
+        )
+    except (KeyError, TypeError) as error:
+        raise ValidationError("Missing data for required field.") from error
+
+    if strict:
+        parse_str(item.name)
+        parse_str(item.description)
+        parse_str(item.type)
+
+    return item
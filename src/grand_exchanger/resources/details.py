@@ -1,13 +1,16 @@
 """Module for item details API resources."""
 from dataclasses import dataclass
+import json
 
 import desert
 import marshmallow
 import requests
 import retrying
 
-from .common import Item
-from .helpers import retry_cases
+from grand_exchanger import metrics
+from . import transport
+from .common import decode_item, Item, item_schema
+from .helpers import is_transient, lazy_schema, LazyNested, RETRY
 from ..exceptions import NoSuchItemException
 
 
@@ -16,38 +19,71 @@ API_URL = (
     "item={item_id}"
 )
 
-
-ItemSchema = desert.schema_class(Item, meta={"unknown": marshmallow.EXCLUDE})()
+NO_CACHE = {"Cache-Control": "no-cache"}
 
 
 @dataclass
 class ItemDetails:
     """Representation for item details."""
 
-    item: Item = desert.field(marshmallow_field=marshmallow.fields.Nested(ItemSchema))
+    item: Item = desert.field(marshmallow_field=LazyNested(item_schema))
 
 
-schema = desert.schema(ItemDetails, meta={"unknown": marshmallow.EXCLUDE})
+__getattr__ = lazy_schema(ItemDetails, __name__)
 
 
-@retrying.retry(
-    retry_on_exception=retry_cases, wait_random_min=1000, wait_random_max=3000
-)
-def get_item_details(item_id: int) -> ItemDetails:
+def decode(content: bytes, strict: bool = True) -> ItemDetails:
+    """Decodes an item details payload.
+
+    Args:
+        content (bytes): The JSON payload.
+        strict (bool): Validate the types of all fields.
+
+    Returns:
+        ItemDetails: An item details object.
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    data = json.loads(content)
+
+    try:
+        item = data["item"]
+    except (KeyError, TypeError) as error:
+        raise marshmallow.ValidationError("Missing data for required field.") from error
+
+    return ItemDetails(decode_item(item, strict))
+
+
+@retrying.retry(**RETRY)
+def get_item_details(
+    item_id: int, strict: bool = True, live: bool = False
+) -> ItemDetails:
     """Parses an item details payload.
 
     Args:
         item_id (int): A valid item ID.
+        strict (bool): Validate the types of all fields.
+        live (bool): Revalidate a cached response instead of serving it.
 
     Returns:
         ItemDetails: An item details object.
 
     Raises:
+        error: The API throttled the request or failed.
         NoSuchItemException: An invalid item ID was provided.
     """
     try:
-        with requests.get(API_URL.format(item_id=item_id)) as response:
+        with transport.get(
+            API_URL.format(item_id=item_id), headers=NO_CACHE if live else None
+        ) as response:
             response.raise_for_status()
-            return schema.load(response.json())
-    except requests.HTTPError:
-        raise NoSuchItemException
+            with metrics.timer(
+                "decode_seconds", metrics.DECODE_BUCKETS, resource="details"
+            ):
+                return decode(response.content, strict)
+    except requests.HTTPError as error:
+        if is_transient(error):
+            raise error
+
+        raise NoSuchItemException from error
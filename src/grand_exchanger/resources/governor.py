@@ -0,0 +1,356 @@
+"""Module for client-side rate control of requests to the itemdb API."""
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+import re
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+import requests.adapters
+
+from grand_exchanger import metrics
+
+INITIAL_LIMIT = 4.0
+MIN_LIMIT = 1.0
+MAX_LIMIT = 64.0
+DECREASE_FACTOR = 0.5
+
+THROTTLED_STATUSES = frozenset([429, 503])
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+MAX_RETRY_AFTER = 300.0
+
+ID_SEGMENT = re.compile(r"/\d+[^/]*$")
+
+RETRY_RATIO = 0.2
+MIN_RETRIES = 10
+
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+Cert = Union[None, str, Tuple[str, str]]
+
+
+class Limiter:
+    """Limits the requests in flight to an endpoint.
+
+    The limit grows by one request per limit's worth of successful responses and is
+    halved when the endpoint throttles or fails, at most once per round of requests
+    that were in flight at the time.
+    """
+
+    def __init__(
+        self,
+        limit: float = INITIAL_LIMIT,
+        min_limit: float = MIN_LIMIT,
+        max_limit: float = MAX_LIMIT,
+    ) -> None:
+        """Initialises the limiter.
+
+        Args:
+            limit (float): The initial number of requests allowed in flight.
+            min_limit (float): The lowest limit.
+            max_limit (float): The highest limit.
+        """
+        self.limit = limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._started = 0
+        self._recover_after = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> int:
+        """Waits for a free slot and any Retry-After delay.
+
+        Returns:
+            int: A sequence number for the request.
+        """
+        with self._condition:
+            while True:
+                delay = self.blocked_until - time.monotonic()
+
+                if delay > 0:
+                    self._condition.wait(delay)
+                elif self.in_flight >= int(self.limit):
+                    self._condition.wait()
+                else:
+                    break
+
+            self.in_flight += 1
+            self._started += 1
+
+            return self._started
+
+    def release(self, sequence: int, throttled: bool) -> None:
+        """Frees a slot and adapts the limit to the outcome of the request.
+
+        Args:
+            sequence (int): The sequence number returned by acquire.
+            throttled (bool): The endpoint throttled or failed the request.
+        """
+        with self._condition:
+            self.in_flight -= 1
+
+            if throttled:
+                if sequence > self._recover_after:
+                    self.limit = max(self.min_limit, self.limit * DECREASE_FACTOR)
+                    self._recover_after = self._started
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+    def block(self, seconds: float) -> None:
+        """Holds back new requests for a while.
+
+        Args:
+            seconds (float): Seconds to wait before sending new requests.
+        """
+        with self._condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+
+class RetryBudget:
+    """Limits retries to a fraction of all requests.
+
+    A crawl against a failing API then gives up instead of multiplying its load.
+    """
+
+    def __init__(self, ratio: float = RETRY_RATIO, minimum: int = MIN_RETRIES) -> None:
+        """Initialises the budget.
+
+        Args:
+            ratio (float): Retries allowed per request sent.
+            minimum (int): Retries allowed regardless of the number of requests.
+        """
+        self.ratio = ratio
+        self.minimum = minimum
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Records a request."""
+        with self._lock:
+            self.requests += 1
+
+    def withdraw(self) -> bool:
+        """Takes a retry from the budget.
+
+        Returns:
+            bool: True if the retry is allowed, False if the budget is exhausted.
+        """
+        with self._lock:
+            if self.retries >= self.minimum + self.ratio * self.requests:
+                return False
+
+            self.retries += 1
+            return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header.
+
+    Args:
+        value (Optional[str]): Delay in seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class Governor:
+    """Adapts the request rate to the responses of each endpoint."""
+
+    def __init__(self, budget: Optional[RetryBudget] = None) -> None:
+        """Initialises the governor.
+
+        Args:
+            budget (Optional[RetryBudget]): The retry budget shared by all endpoints.
+        """
+        self.budget = budget or RetryBudget()
+        self._limiters: Dict[str, Limiter] = {}
+        self._lock = threading.Lock()
+
+    def get_limiter(self, url: str) -> Limiter:
+        """Returns the limiter of the endpoint of a URL.
+
+        URLs share an endpoint if they only differ in query or a trailing ID.
+
+        Args:
+            url (str): A request URL.
+
+        Returns:
+            Limiter: The limiter for the endpoint.
+        """
+        endpoint = get_endpoint(url)
+
+        with self._lock:
+            if endpoint not in self._limiters:
+                self._limiters[endpoint] = Limiter()
+
+            return self._limiters[endpoint]
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator["Slot"]:
+        """Holds a slot for a request while it is in flight.
+
+        Args:
+            url (str): The request URL.
+
+        Yields:
+            Slot: The slot, to be told about the response.
+        """
+        limiter = self.get_limiter(url)
+        slot = Slot(limiter, limiter.acquire())
+        self.budget.deposit()
+
+        try:
+            yield slot
+        finally:
+            limiter.release(slot.sequence, slot.throttled)
+
+
+def get_endpoint(url: str) -> str:
+    """Returns the endpoint of a URL.
+
+    URLs share an endpoint if they only differ in query or a trailing ID.
+
+    Args:
+        url (str): A request URL.
+
+    Returns:
+        str: Host and path of the URL without a trailing ID.
+    """
+    parts = urlsplit(url)
+
+    return parts.netloc + ID_SEGMENT.sub("/", parts.path)
+
+
+class Slot:
+    """A request in flight."""
+
+    def __init__(self, limiter: Limiter, sequence: int) -> None:
+        """Initialises the slot.
+
+        Args:
+            limiter (Limiter): The limiter of the endpoint.
+            sequence (int): The sequence number of the request.
+        """
+        self.limiter = limiter
+        self.sequence = sequence
+        self.throttled = True
+
+    def observe(self, response: requests.Response) -> None:
+        """Records the response to the request.
+
+        Args:
+            response (requests.Response): The response.
+        """
+        self.throttled = response.status_code in RETRY_STATUSES
+
+        if response.status_code in THROTTLED_STATUSES:
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+
+            if delay is not None:
+                self.limiter.block(delay)
+
+
+class GovernedAdapter(requests.adapters.HTTPAdapter):
+    """Transport adapter that sends requests through the governor."""
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: Union[bool, str] = True,
+        cert: Cert = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """Sends a request once the governor allows it.
+
+        The content of a response is read while the request holds its slot, so the
+        latency recorded for the endpoint covers the whole transfer.
+
+        Args:
+            request (requests.PreparedRequest): The request.
+            stream (bool): Stream the response content.
+            timeout (Timeout): Seconds to wait for the server.
+            verify (Union[bool, str]): Verify TLS certificates, or a CA bundle path.
+            cert (Cert): A client certificate.
+            proxies (Optional[Dict[str, str]]): Proxies by protocol.
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.RequestException: The request failed.
+        """
+        url = request.url or ""
+        endpoint = get_endpoint(url)
+
+        with get_governor().slot(url) as slot:
+            start = time.perf_counter()
+
+            try:
+                response = super().send(request, stream, timeout, verify, cert, proxies)
+                size = 0 if stream else len(response.content or b"")
+            except requests.RequestException as error:
+                metrics.inc(
+                    "errors_total", endpoint=endpoint, reason=type(error).__name__
+                )
+                raise
+            finally:
+                metrics.observe(
+                    "request_seconds", time.perf_counter() - start, endpoint=endpoint
+                )
+
+            slot.observe(response)
+
+        status = str(response.status_code)
+        metrics.inc("requests_total", endpoint=endpoint, status=status)
+        metrics.inc("response_bytes_total", size, endpoint=endpoint)
+
+        if response.status_code >= 400:
+            metrics.inc("errors_total", endpoint=endpoint, reason=status)
+
+        return response
+
+
+_governor = Governor()
+
+
+def get_governor() -> Governor:
+    """Returns the governor shared by all resources.
+
+    Returns:
+        Governor: The governor.
+    """
+    return _governor
+
+
+def reset(budget: Optional[RetryBudget] = None) -> None:
+    """Replaces the shared governor, forgetting all learned limits.
+
+    Args:
+        budget (Optional[RetryBudget]): The retry budget of the new governor.
+    """
+    global _governor
+
+    _governor = Governor(budget)
@@ -1,69 +1,402 @@
 """Module for item price graphs."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Iterator
+from datetime import datetime, timedelta
+import json
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
 import desert
 import marshmallow
-import requests
 import retrying
 
-from .helpers import Price, retry_cases, TimeStamp
+from grand_exchanger import metrics
+from grand_exchanger.timestamps import EPOCH, to_epoch
+from . import transport
+from .helpers import (
+    lazy_schema,
+    parse_epoch,
+    parse_price,
+    Price,
+    RETRY,
+    TimeStamp,
+)
 
 API_URL = "https://services.runescape.com/m=itemdb_rs/api/graph/{item_id}.json"
 
 
-@dataclass
+class Series:
+    """Price points sorted by time.
+
+    Points are stored as two arrays of 64-bit integers, epoch milliseconds and
+    prices, so no objects are created per point until the series is iterated.
+    """
+
+    __slots__ = ("epochs", "prices")
+
+    def __init__(
+        self, epochs: Optional[array] = None, prices: Optional[array] = None
+    ) -> None:
+        """Initialises the series.
+
+        Args:
+            epochs (Optional[array]): Ascending epoch timestamps in milliseconds.
+            prices (Optional[array]): Prices for each of the timestamps.
+        """
+        self.epochs = epochs if epochs is not None else array("q")
+        self.prices = prices if prices is not None else array("q")
+
+    @classmethod
+    def from_points(cls, points: List[Tuple[int, int]]) -> Series:
+        """Returns a series for unsorted points.
+
+        Args:
+            points (List[Tuple[int, int]]): Epoch milliseconds and prices.
+
+        Returns:
+            Series: The sorted series.
+        """
+        points.sort()
+        return cls(
+            array("q", [e for e, _ in points]), array("q", [p for _, p in points])
+        )
+
+    @classmethod
+    def from_mapping(cls, points: Mapping[datetime, int]) -> Series:
+        """Returns a series for prices by datetime.
+
+        Args:
+            points (Mapping[datetime, int]): Prices by naive UTC datetime.
+
+        Returns:
+            Series: The sorted series.
+        """
+        return cls.from_points([(to_epoch(dt) * 1000, p) for dt, p in points.items()])
+
+    def __len__(self) -> int:
+        """Returns the number of points.
+
+        Returns:
+            int: Number of points.
+        """
+        return len(self.epochs)
+
+    def __eq__(self, other: object) -> bool:
+        """Compares two series.
+
+        Args:
+            other (object): Another object.
+
+        Returns:
+            bool: True if both series have the same points.
+        """
+        if not isinstance(other, Series):
+            return NotImplemented
+
+        return self.epochs == other.epochs and self.prices == other.prices
+
+    def __repr__(self) -> str:
+        """Returns a representation for debugging.
+
+        Returns:
+            str: The representation.
+        """
+        return f"Series({len(self)} points)"
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> Series:
+        """Returns the points in a time range using binary search.
+
+        Args:
+            start (Optional[int]): Inclusive lower bound in epoch milliseconds.
+            end (Optional[int]): Exclusive upper bound in epoch milliseconds.
+
+        Returns:
+            Series: The points in the range.
+        """
+        lo = 0 if start is None else bisect_left(self.epochs, start)
+        hi = len(self) if end is None else bisect_left(self.epochs, end)
+
+        return Series(self.epochs[lo:hi], self.prices[lo:hi])
+
+    def items(self, ascending: bool = True) -> Iterator[Tuple[datetime, int]]:
+        """Yields the points sorted by time.
+
+        Args:
+            ascending (bool): Yield points going up in time.
+
+        Yields:
+            Tuple[datetime, int]: The next price point.
+        """
+        indices = range(len(self)) if ascending else range(len(self) - 1, -1, -1)
+
+        for i in indices:
+            yield EPOCH + timedelta(milliseconds=self.epochs[i]), self.prices[i]
+
+    def points(self, ascending: bool = True) -> Iterator[Tuple[int, int]]:
+        """Yields the points sorted by time, without creating datetimes.
+
+        Args:
+            ascending (bool): Yield points going up in time.
+
+        Yields:
+            Tuple[int, int]: Epoch seconds and price of the next point.
+        """
+        indices = range(len(self)) if ascending else range(len(self) - 1, -1, -1)
+
+        for i in indices:
+            yield self.epochs[i] // 1000, self.prices[i]
+
+    def to_dict(self) -> Dict[datetime, int]:
+        """Returns the points as a dictionary.
+
+        Returns:
+            Dict[datetime, int]: Prices by datetime.
+        """
+        return dict(self.items())
+
+
 class Graph:
     """Representation of an graph with prices for an item."""
 
-    daily: Dict[datetime, int] = desert.field(
-        marshmallow.fields.Dict(keys=TimeStamp, values=Price)
-    )
-    average: Dict[datetime, int] = desert.field(
-        marshmallow.fields.Dict(keys=TimeStamp, values=Price)
-    )
+    def __init__(
+        self,
+        daily: Union[Series, Mapping[datetime, int], None] = None,
+        average: Union[Series, Mapping[datetime, int], None] = None,
+    ) -> None:
+        """Initialises the graph.
+
+        Args:
+            daily (Union[Series, Mapping[datetime, int], None]): Daily prices.
+            average (Union[Series, Mapping[datetime, int], None]): Averaged daily
+                prices.
+        """
+        self.daily_series = self._series(daily)
+        self.average_series = self._series(average)
+
+    @staticmethod
+    def _series(points: Union[Series, Mapping[datetime, int], None]) -> Series:
+        """Converts points to a series.
+
+        Args:
+            points (Union[Series, Mapping[datetime, int], None]): Price points.
+
+        Returns:
+            Series: The series.
+        """
+        if points is None:
+            return Series()
+        if isinstance(points, Series):
+            return points
+
+        return Series.from_mapping(points)
+
+    @property
+    def daily(self) -> Dict[datetime, int]:
+        """Returns the daily prices.
+
+        Returns:
+            Dict[datetime, int]: Prices by datetime.
+        """
+        return self.daily_series.to_dict()
+
+    @property
+    def average(self) -> Dict[datetime, int]:
+        """Returns the averaged daily prices.
+
+        Returns:
+            Dict[datetime, int]: Prices by datetime.
+        """
+        return self.average_series.to_dict()
+
+    def __eq__(self, other: object) -> bool:
+        """Compares two graphs.
+
+        Args:
+            other (object): Another object.
+
+        Returns:
+            bool: True if both graphs have the same points.
+        """
+        if not isinstance(other, Graph):
+            return NotImplemented
+
+        return (
+            self.daily_series == other.daily_series
+            and self.average_series == other.average_series
+        )
+
+    def __repr__(self) -> str:
+        """Returns a representation for debugging.
 
-    def list_daily_prices(self, ascending: bool = False) -> Iterator:
+        Returns:
+            str: The representation.
+        """
+        return f"Graph(daily={self.daily_series!r}, average={self.average_series!r})"
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> Graph:
+        """Returns the points of the graph in a time range.
+
+        Args:
+            start (Optional[int]): Inclusive lower bound in epoch milliseconds.
+            end (Optional[int]): Exclusive upper bound in epoch milliseconds.
+
+        Returns:
+            Graph: A graph with the points in the range.
+        """
+        return Graph(
+            self.daily_series.slice(start, end), self.average_series.slice(start, end)
+        )
+
+    def list_daily_prices(
+        self, ascending: bool = False
+    ) -> Iterator[Tuple[datetime, int]]:
         """Yield daily prices for an item sorted by time.
 
         Args:
             ascending (bool): Yield prices going up in time.
 
-        Yields:
-            Tuple[datetime, int]: The next daily price point.
+        Returns:
+            Iterator[Tuple[datetime, int]]: Daily price points.
         """
-        for dt in sorted(self.daily.keys(), reverse=not ascending):
-            yield dt, self.daily[dt]
+        return self.daily_series.items(ascending)
+
+    def list_daily_points(self, ascending: bool = False) -> Iterator[Tuple[int, int]]:
+        """Yield daily prices for an item sorted by time, in epoch seconds.
 
-    def list_average_prices(self, ascending: bool = False) -> Iterator:
+        Args:
+            ascending (bool): Yield prices going up in time.
+
+        Returns:
+            Iterator[Tuple[int, int]]: Daily price points.
+        """
+        return self.daily_series.points(ascending)
+
+    def list_average_prices(
+        self, ascending: bool = False
+    ) -> Iterator[Tuple[datetime, int]]:
         """Yield averaged daily prices for an item sorted by time.
 
         Args:
             ascending (bool): Yield prices going up in time.
 
-        Yields:
-            Tuple[datetime, int]: The next averaged daily price point.
+        Returns:
+            Iterator[Tuple[datetime, int]]: Averaged daily price points.
         """
-        for dt in sorted(self.average.keys(), reverse=not ascending):
-            yield dt, self.average[dt]
+        return self.average_series.items(ascending)
+
+
+@dataclass
+class GraphPayload:
+    """Representation of a graph payload as loaded by the marshmallow schema."""
 
+    daily: Dict[datetime, int] = desert.field(
+        marshmallow.fields.Dict(keys=TimeStamp, values=Price)
+    )
+    average: Dict[datetime, int] = desert.field(
+        marshmallow.fields.Dict(keys=TimeStamp, values=Price)
+    )
 
-schema = desert.schema(Graph, meta={"unknown": marshmallow.EXCLUDE})
 
+__getattr__ = lazy_schema(GraphPayload, __name__)
 
-@retrying.retry(
-    retry_on_exception=retry_cases, wait_random_min=1000, wait_random_max=3000
-)
-def get_historical_prices(item_id: int) -> Graph:
+
+def decode_series(
+    series: Mapping[str, Any],
+    strict: bool = True,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> Series:
+    """Decodes a series of price points.
+
+    Points outside of the time range are discarded before their prices are parsed.
+
+    Args:
+        series (Mapping[str, Any]): Prices by epoch timestamp in milliseconds.
+        strict (bool): Raise an error for invalid points instead of dropping them.
+        start (Optional[int]): Inclusive lower bound in epoch milliseconds.
+        end (Optional[int]): Exclusive upper bound in epoch milliseconds.
+
+    Returns:
+        Series: The price points in the time range.
+
+    Raises:
+        ValidationError: An invalid point was found in strict mode.
+    """
+    if not isinstance(series, Mapping):
+        raise marshmallow.ValidationError("Not a valid mapping type.")
+
+    lo = -(2**63) if start is None else start
+    hi = 2**63 if end is None else end
+    points = []
+
+    for k, v in series.items():
+        try:
+            epoch = parse_epoch(k)
+
+            if lo <= epoch < hi:
+                points.append((epoch, v if type(v) is int else parse_price(v)))
+        except marshmallow.ValidationError as error:
+            if strict:
+                raise marshmallow.ValidationError(error.messages, k) from error
+
+    return Series.from_points(points)
+
+
+def decode(
+    content: bytes,
+    strict: bool = True,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> Graph:
+    """Decodes a graph payload.
+
+    Args:
+        content (bytes): The JSON payload.
+        strict (bool): Raise an error for invalid points instead of dropping them.
+        start (Optional[int]): Inclusive lower bound in epoch milliseconds.
+        end (Optional[int]): Exclusive upper bound in epoch milliseconds.
+
+    Returns:
+        Graph: A graph object.
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    data = json.loads(content)
+
+    try:
+        daily = data["daily"]
+        average = data["average"]
+    except (KeyError, TypeError) as error:
+        raise marshmallow.ValidationError("Missing data for required field.") from error
+
+    return Graph(
+        decode_series(daily, strict, start, end),
+        decode_series(average, strict, start, end),
+    )
+
+
+@retrying.retry(**RETRY)
+def get_historical_prices(
+    item_id: int,
+    strict: bool = True,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> Graph:
     """Parses a graph with prices in time for an item.
 
     Args:
         item_id (int): A valid item ID.
+        strict (bool): Raise an error for invalid points instead of dropping them.
+        start (Optional[int]): Inclusive lower bound in epoch milliseconds.
+        end (Optional[int]): Exclusive upper bound in epoch milliseconds.
 
     Returns:
         Graph: A graph object.
     """
-    with requests.get(API_URL.format(item_id=item_id)) as response:
+    with transport.get(API_URL.format(item_id=item_id)) as response:
         response.raise_for_status()
-        return schema.load(response.json())
+        with metrics.timer("decode_seconds", metrics.DECODE_BUCKETS, resource="graph"):
+            return decode(response.content, strict, start, end)
@@ -1,24 +1,193 @@
 """Module for helper functionality."""
 from datetime import datetime
+from functools import lru_cache
 import json
 import re
-from typing import Any, Mapping, Optional
+from typing import Any, Callable, Mapping, Optional
 
+import desert
+import marshmallow
 from marshmallow import fields, ValidationError
 import requests
 import six
 import urllib3.exceptions
 
+from grand_exchanger import metrics
+from . import governor
+
+
+def is_transient(exception: Exception) -> bool:
+    """Returns whether a request failed for a reason that may go away.
+
+    Args:
+        exception (Exception): The exception raised by the request.
+
+    Returns:
+        bool: True for connection errors, throttling and server errors.
+    """
+    if isinstance(exception, requests.HTTPError):
+        return (
+            exception.response is not None
+            and exception.response.status_code in governor.RETRY_STATUSES
+        )
 
-def retry_cases(exception: Exception) -> bool:
-    """Exceptions eligible for request retries."""
     return (
         isinstance(exception, requests.ConnectionError)
+        or isinstance(exception, requests.Timeout)
         or isinstance(exception, json.JSONDecodeError)
         or isinstance(exception, urllib3.exceptions.MaxRetryError)
     )
 
 
+def retry_cases(exception: Exception) -> bool:
+    """Exceptions eligible for request retries, within the global retry budget."""
+    if not is_transient(exception):
+        return False
+
+    if not governor.get_governor().budget.withdraw():
+        metrics.inc("retries_denied_total")
+        return False
+
+    metrics.inc("retries_total", reason=type(exception).__name__)
+    return True
+
+
+RETRY = {
+    "retry_on_exception": retry_cases,
+    "wait_exponential_multiplier": 500,
+    "wait_exponential_max": 30000,
+    "wait_jitter_max": 1000,
+    "stop_max_attempt_number": 8,
+}
+
+
+PRICE_PATTERN = re.compile(r"^([-+]?\d+(?:\.\d+)?)([kmb])$")
+
+MODIFIERS = {"k": 1000, "m": 1000000, "b": 1000000000}
+
+
+def parse_epoch(value: Any) -> int:
+    """Converts an epoch timestamp in milliseconds to an integer.
+
+    Args:
+        value (Any): An epoch timestamp as string or integer.
+
+    Returns:
+        int: Milliseconds since the epoch.
+
+    Raises:
+        ValidationError: The value is not an epoch timestamp.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError) as error:
+        raise ValidationError("Invalid epoch timestamp") from error
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """Converts an epoch timestamp in milliseconds to a datetime object.
+
+    Args:
+        value (Any): An epoch timestamp as string or integer.
+
+    Returns:
+        datetime: A naive datetime in UTC.
+    """
+    return datetime.utcfromtimestamp(parse_epoch(value) / 1000)
+
+
+def parse_price(value: Any) -> int:
+    """Converts a Runescape formatted price to an integer.
+
+    Args:
+        value (Any): A price such as 100, "43,657", "11.3k" or "- 138.2k".
+
+    Returns:
+        int: The price.
+
+    Raises:
+        ValidationError: The value is not a price.
+    """
+    if isinstance(value, six.integer_types):
+        return value
+
+    try:
+        price = value.replace(" ", "")
+        m = PRICE_PATTERN.match(price)
+
+        if m:
+            return int(float(m.group(1)) * MODIFIERS[m.group(2)])
+        else:
+            return int(price.replace(",", ""))
+    except (AttributeError, ValueError) as error:
+        raise ValidationError("Invalid price format") from error
+
+
+def parse_bool(value: Any) -> bool:
+    """Converts a boolean the way marshmallow.fields.Boolean does.
+
+    Args:
+        value (Any): A boolean, or a string or number representing one.
+
+    Returns:
+        bool: The boolean.
+
+    Raises:
+        ValidationError: The value is not a boolean.
+    """
+    try:
+        if value in fields.Boolean.truthy:
+            return True
+        if value in fields.Boolean.falsy:
+            return False
+    except TypeError:
+        pass
+
+    raise ValidationError("Not a valid boolean.")
+
+
+def parse_int(value: Any) -> int:
+    """Converts an integer the way marshmallow.fields.Integer does.
+
+    Args:
+        value (Any): An integer, or a string representing one.
+
+    Returns:
+        int: The integer.
+
+    Raises:
+        ValidationError: The value is not an integer.
+    """
+    if type(value) is int:
+        return value
+
+    if isinstance(value, bool):
+        raise ValidationError("Not a valid integer.")
+
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError) as error:
+        raise ValidationError("Not a valid integer.") from error
+
+
+def parse_str(value: Any) -> str:
+    """Checks a string the way marshmallow.fields.String does.
+
+    Args:
+        value (Any): A string.
+
+    Returns:
+        str: The string.
+
+    Raises:
+        ValidationError: The value is not a string.
+    """
+    if not isinstance(value, str):
+        raise ValidationError("Not a valid string.")
+
+    return value
+
+
 class TimeStamp(fields.Field):
     """Deserializes an epoch timestamp."""
 
@@ -27,13 +196,10 @@ class TimeStamp(fields.Field):
         value: str,
         attr: Optional[str],
         data: Optional[Mapping[str, Any]],
-        **kwargs
+        **kwargs,
     ) -> datetime:
         """Deserializes an epoch timestamp to a datetime object."""
-        try:
-            return datetime.utcfromtimestamp(int(value) / 1000)
-        except ValueError as error:
-            raise ValidationError("Invalid epoch timestamp") from error
+        return parse_timestamp(value)
 
 
 class Price(fields.Field):
@@ -44,22 +210,57 @@ class Price(fields.Field):
         value: Any,
         attr: Optional[str],
         data: Optional[Mapping[str, Any]],
-        **kwargs
+        **kwargs,
     ) -> int:
         """Deserializes a price string to an integer."""
-        try:
-            if isinstance(value, six.integer_types):
-                return value
-            else:
-                price = value.replace(" ", "")
-                m = re.search("^((?:[-+])?\d+(?:\.\d+)?)([kmb])$", price)
-
-                if m:
-                    base = float(m.group(1))
-                    modifier = {"k": 1000, "m": 1000000, "b": 1000000000}[m.group(2)]
-
-                    return int(base * modifier)
-                else:
-                    return int(price.replace(",", ""))
-        except ValueError as error:
-            raise ValidationError("Invalid price format") from error
+        return parse_price(value)
+
+
+class LazyNested(fields.Nested):
+    """Nests a schema that is only built when the field is first used."""
+
+    def __init__(self, build: Callable[[], marshmallow.Schema], **kwargs: Any) -> None:
+        """Initialises the field.
+
+        Args:
+            build (Callable[[], marshmallow.Schema]): Returns the nested schema.
+            kwargs (Any): Arguments for marshmallow.fields.Nested.
+        """
+        super().__init__(marshmallow.Schema, **kwargs)
+        self.build = build
+
+    @property
+    def schema(self) -> marshmallow.Schema:
+        """Returns the nested schema.
+
+        Returns:
+            marshmallow.Schema: The nested schema.
+        """
+        return self.build()
+
+
+def lazy_schema(cls: type, module: str) -> Callable[[str], Any]:
+    """Returns a module __getattr__ that builds the schema of a dataclass on demand.
+
+    Building desert schemas is slow, and the decoders do not need them, so a
+    module's ``schema`` attribute is only built when it is first accessed.
+
+    Args:
+        cls (type): The dataclass of the payload.
+        module (str): The name of the module.
+
+    Returns:
+        Callable[[str], Any]: The module __getattr__.
+    """
+
+    @lru_cache(maxsize=None)
+    def build() -> marshmallow.Schema:
+        return desert.schema(cls, meta={"unknown": marshmallow.EXCLUDE})
+
+    def module_getattr(name: str) -> Any:
+        if name == "schema":
+            return build()
+
+        raise AttributeError(f"module {module!r} has no attribute {name!r}")
+
+    return module_getattr
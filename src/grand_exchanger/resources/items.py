@@ -1,14 +1,16 @@
 """Module for item collection API resources."""
 from dataclasses import dataclass
+import json
 from typing import List
 
 import desert
 import marshmallow
-import requests
 import retrying
 
-from .common import Item
-from .helpers import retry_cases
+from grand_exchanger import metrics
+from . import transport
+from .common import decode_item, Item, item_schema
+from .helpers import lazy_schema, LazyNested, parse_int, RETRY
 
 API_URL = (
     "https://services.runescape.com/m=itemdb_rs/api/catalogue/items.json?"
@@ -16,38 +18,64 @@ API_URL = (
 )
 
 
-ItemSchema = desert.schema_class(Item, meta={"unknown": marshmallow.EXCLUDE})()
-
-
 @dataclass
 class Items:
     """Representation of a page with items."""
 
     total: int
     items: List[Item] = desert.field(
-        marshmallow_field=marshmallow.fields.List(marshmallow.fields.Nested(ItemSchema))
+        marshmallow_field=marshmallow.fields.List(LazyNested(item_schema))
     )
 
 
-schema = desert.schema(Items, meta={"unknown": marshmallow.EXCLUDE})
+__getattr__ = lazy_schema(Items, __name__)
 
 
-@retrying.retry(
-    retry_on_exception=retry_cases, wait_random_min=1000, wait_random_max=3000
-)
-def get_items_page(category_id: int, letter: str, page: int) -> Items:
+def decode(content: bytes, strict: bool = True) -> Items:
+    """Decodes an items page payload.
+
+    Args:
+        content (bytes): The JSON payload.
+        strict (bool): Validate the types of all fields.
+
+    Returns:
+        Items: collection of items
+
+    Raises:
+        ValidationError: A field is missing or invalid.
+    """
+    data = json.loads(content)
+
+    try:
+        total = data["total"]
+        items = data["items"]
+    except (KeyError, TypeError) as error:
+        raise marshmallow.ValidationError("Missing data for required field.") from error
+
+    if not isinstance(items, list):
+        raise marshmallow.ValidationError("Not a valid list.")
+
+    return Items(parse_int(total), [decode_item(i, strict) for i in items])
+
+
+@retrying.retry(**RETRY)
+def get_items_page(
+    category_id: int, letter: str, page: int, strict: bool = True
+) -> Items:
     """Parses a page with items.
 
     Args:
         category_id (int): A valid category ID.
         letter (str): An alphabetic character or #%23" for numbers.
         page (int): A page number.
+        strict (bool): Validate the types of all fields.
 
     Returns:
         Items: collection of items
     """
-    with requests.get(
+    with transport.get(
         API_URL.format(category_id=category_id, letter=letter, page=page)
     ) as response:
         response.raise_for_status()
-        return schema.load(response.json())
+        with metrics.timer("decode_seconds", metrics.DECODE_BUCKETS, resource="items"):
+            return decode(response.content, strict)
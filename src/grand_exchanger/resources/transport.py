@@ -0,0 +1,200 @@
+"""Module for the shared HTTP transport."""
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+
+import requests
+import requests.adapters
+
+from .cache import CachingAdapter, ResponseCache
+from .governor import GovernedAdapter
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests_html
+
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30.0
+
+_pool_size = POOL_SIZE
+_timeout: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+_cache: Optional[ResponseCache] = None
+_origin: Optional[str] = None
+
+_session: Optional[requests.Session] = None
+_html_session: Optional["requests_html.HTMLSession"] = None
+
+
+def configure(
+    pool_size: Optional[int] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+) -> None:
+    """Configures the shared sessions used by all resources.
+
+    Existing sessions are closed, new ones are created on next use.
+
+    Args:
+        pool_size (Optional[int]): Maximum number of pooled connections per host.
+        connect_timeout (Optional[float]): Seconds to wait for a connection.
+        read_timeout (Optional[float]): Seconds to wait between received bytes.
+    """
+    global _pool_size, _timeout
+
+    if pool_size is not None:
+        _pool_size = pool_size
+
+    _timeout = (
+        connect_timeout if connect_timeout is not None else _timeout[0],
+        read_timeout if read_timeout is not None else _timeout[1],
+    )
+
+    close()
+
+
+def set_cache(cache: Optional[ResponseCache]) -> None:
+    """Sets the response cache for JSON resources.
+
+    Args:
+        cache (Optional[ResponseCache]): A response cache, or None to disable caching.
+    """
+    global _cache
+
+    _cache = cache
+    close()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Returns the response cache for JSON resources.
+
+    Returns:
+        Optional[ResponseCache]: The response cache, or None if caching is disabled.
+    """
+    return _cache
+
+
+def set_origin(origin: Optional[str]) -> None:
+    """Sends the requests for the itemdb services to another origin.
+
+    Args:
+        origin (Optional[str]): Scheme, host and port of a stand-in for the itemdb
+            services, such as http://localhost:8080, or None for the real services.
+    """
+    global _origin
+
+    _origin = origin.rstrip("/") if origin else None
+
+
+def route(url: str) -> str:
+    """Returns the URL a request for the itemdb services is sent to.
+
+    Args:
+        url (str): A URL of the itemdb services.
+
+    Returns:
+        str: The URL on the configured origin.
+    """
+    if _origin is None:
+        return url
+
+    return _origin + url[url.index("/", url.index("//") + 2) :]
+
+
+def close() -> None:
+    """Closes the shared sessions and their pooled connections."""
+    global _session, _html_session
+
+    if _session is not None:
+        _session.close()
+        _session = None
+
+    if _html_session is not None:
+        _html_session.close()
+        _html_session = None
+
+
+def _mount(
+    session: requests.Session, cache: Optional[ResponseCache] = None
+) -> requests.Session:
+    """Mounts governed keep-alive connection pools on a session.
+
+    Args:
+        session (requests.Session): A session.
+        cache (Optional[ResponseCache]): A response cache for the session.
+
+    Returns:
+        requests.Session: The same session.
+    """
+    adapter: requests.adapters.HTTPAdapter
+
+    if cache is not None:
+        adapter = CachingAdapter(
+            cache, pool_connections=_pool_size, pool_maxsize=_pool_size
+        )
+    else:
+        adapter = GovernedAdapter(pool_connections=_pool_size, pool_maxsize=_pool_size)
+
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the shared session for JSON resources.
+
+    Returns:
+        requests.Session: A session with pooled connections.
+    """
+    global _session
+
+    if _session is None:
+        _session = _mount(requests.Session(), _cache)
+
+    return _session
+
+
+def get_html_session() -> "requests_html.HTMLSession":
+    """Returns the shared session for HTML resources.
+
+    requests_html is imported on first use, since it pulls in a headless browser
+    stack that only the category scrape needs.
+
+    Returns:
+        requests_html.HTMLSession: A session with pooled connections.
+    """
+    global _html_session
+
+    if _html_session is None:
+        import requests_html
+
+        _html_session = _mount(requests_html.HTMLSession())
+
+    return _html_session
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    """Sends a GET request over the shared session.
+
+    Args:
+        url (str): The URL to request.
+        kwargs (Any): Additional arguments for requests.
+
+    Returns:
+        requests.Response: The response.
+    """
+    kwargs.setdefault("timeout", _timeout)
+    return get_session().get(route(url), **kwargs)
+
+
+def get_html(url: str, **kwargs: Any) -> "requests_html.HTMLResponse":
+    """Sends a GET request for an HTML page over the shared HTML session.
+
+    Args:
+        url (str): The URL to request.
+        kwargs (Any): Additional arguments for requests.
+
+    Returns:
+        requests_html.HTMLResponse: The response with a parsed HTML document.
+    """
+    kwargs.setdefault("timeout", _timeout)
+    return get_html_session().get(route(url), **kwargs)
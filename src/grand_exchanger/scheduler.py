@@ -0,0 +1,71 @@
+"""Module for running work on a fixed cadence."""
+from dataclasses import dataclass
+import math
+import time
+from typing import Callable, Iterator, Optional
+
+
+@dataclass
+class Tick:
+    """A scheduled run."""
+
+    number: int
+    slot: int
+    skipped: int
+
+
+class Scheduler:
+    """Schedules runs at fixed offsets from the start.
+
+    Slot `n` is due at `start + n * interval`, so time spent running does not
+    accumulate as drift. A run that overruns its slot is never overlapped: the slots
+    it ran into are skipped and the next run starts at the following slot.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """Initialises the scheduler.
+
+        Args:
+            interval (float): Seconds between runs.
+            clock (Optional[Callable[[], float]]): Returns the current time in
+                seconds, defaults to time.monotonic.
+            sleep (Optional[Callable[[float], None]]): Waits for a number of seconds,
+                defaults to time.sleep.
+        """
+        self.interval = interval
+        self.clock = clock or time.monotonic
+        self.sleep = sleep or time.sleep
+
+    def ticks(self, cycles: Optional[int] = None) -> Iterator[Tick]:
+        """Yields when runs are due, the first one immediately.
+
+        The caller runs between two ticks.
+
+        Args:
+            cycles (Optional[int]): Number of runs, or None to run forever.
+
+        Yields:
+            Tick: The next run.
+        """
+        start = self.clock()
+        slot = 0
+        skipped = 0
+        number = 0
+
+        while cycles is None or number < cycles:
+            delay = start + slot * self.interval - self.clock()
+
+            if delay > 0:
+                self.sleep(delay)
+
+            yield Tick(number, slot, skipped)
+            number += 1
+
+            elapsed = math.floor((self.clock() - start) / self.interval)
+            skipped = max(elapsed - slot, 0)
+            slot += skipped + 1
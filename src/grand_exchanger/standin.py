@@ -0,0 +1,636 @@
+"""Module for a local stand-in for the itemdb services.
+
+The stand-in serves a synthetic catalogue with the payload shapes of the itemdb
+services, found in ``examples/``, so crawls can be tested at scale on one machine.
+Responses can be delayed by a latency distribution, fail with server errors or
+throttling at given rates, and be rate limited. Faults are drawn from the seed, the
+request path and how often the path was requested, so a run sees the same faults no
+matter in which order concurrent requests arrive.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import string
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+
+ITEMS = 40000
+
+CATEGORIES = 40
+
+DAYS = 180
+
+PAGE_SIZE = 12
+
+MAX_PRICE = 2**31 - 1
+
+LETTERS = "#" + string.ascii_lowercase
+
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+ERROR_STATUSES = (500, 502, 503, 504)
+
+PREFIX = "/m=itemdb_rs"
+
+ICON_URL = "https://secure.runescape.com/m=itemdb_rs/obj_{size}.gif?id={item_id}"
+
+TYPE_ICON_URL = "https://www.runescape.com/img/categories/{name}"
+
+ADJECTIVES = (
+    "3rd age",
+    "Adamant",
+    "Black",
+    "Crystal",
+    "Dragon",
+    "Elder",
+    "Fungal",
+    "Gilded",
+    "Hardened",
+    "Iron",
+    "Jade",
+    "Kyzaj",
+    "Lunar",
+    "Mithril",
+    "Noxious",
+    "Oak",
+    "Primal",
+    "Quick",
+    "Rune",
+    "Steel",
+    "Teak",
+    "Umbral",
+    "Virtus",
+    "White",
+    "Xerician",
+    "Yak-hide",
+    "Zaros",
+)
+
+NOUNS = (
+    "arrows",
+    "axe",
+    "boots",
+    "bow",
+    "chestplate",
+    "dagger",
+    "gloves",
+    "helm",
+    "longsword",
+    "plank",
+    "platelegs",
+    "pouch",
+    "ring",
+    "robe top",
+    "shield",
+    "staff",
+)
+
+
+def format_price(price: int) -> Union[int, str]:
+    """Formats a price the way the itemdb services do.
+
+    Args:
+        price (int): A price.
+
+    Returns:
+        Union[int, str]: The price as a number below 1,000, with thousands
+            separators below 10,000, and abbreviated above.
+    """
+    if price < 1000:
+        return price
+
+    if price < 10000:
+        return f"{price:,}"
+
+    if price < 10**6:
+        return f"{price / 1000:.1f}k"
+
+    if price < 10**9:
+        return f"{price / 10 ** 6:.1f}m"
+
+    return f"{price / 10 ** 9:.1f}b"
+
+
+def get_letter(name: str) -> str:
+    """Returns the letter an item is listed under.
+
+    Args:
+        name (str): The item name.
+
+    Returns:
+        str: The lower case first letter, or # for other characters.
+    """
+    first = name[0].lower()
+
+    return first if first in string.ascii_lowercase else "#"
+
+
+@dataclass(frozen=True)
+class SyntheticItem:
+    """An item of a synthetic catalogue."""
+
+    id: int
+    category_id: int
+    name: str
+    members: bool
+    price: int
+
+
+class Catalogue:
+    """A synthetic catalogue with the payload shapes of the itemdb services."""
+
+    def __init__(
+        self,
+        items: int = ITEMS,
+        categories: int = CATEGORIES,
+        days: int = DAYS,
+        seed: int = 0,
+    ) -> None:
+        """Initialises the catalogue.
+
+        Args:
+            items (int): Number of items.
+            categories (int): Number of categories, with IDs starting at 0.
+            days (int): Number of days of price history.
+            seed (int): Seed of the names, prices and price histories.
+        """
+        rng = random.Random(seed)
+        self.seed = seed
+        self.names = {c: f"Category {c}" for c in range(categories)}
+        self.items: Dict[int, SyntheticItem] = {}
+        self.letters: Dict[Tuple[int, str], List[SyntheticItem]] = {}
+
+        for i in range(items):
+            item = SyntheticItem(
+                i + 1,
+                i % categories,
+                f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+                rng.random() < 0.6,
+                min(int(rng.lognormvariate(8, 2.5)) + 1, MAX_PRICE),
+            )
+            self.items[item.id] = item
+            key = (item.category_id, get_letter(item.name))
+            self.letters.setdefault(key, []).append(item)
+
+        for listed in self.letters.values():
+            listed.sort(key=lambda item: (item.name, item.id))
+
+        today = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        last = int(today.timestamp()) * 1000
+        self.days = [str(last - d * 86400000) for d in reversed(range(days))]
+
+    def html(self) -> str:
+        """Returns the catalogue page that lists the categories.
+
+        Returns:
+            str: An HTML document.
+        """
+        links = "".join(
+            f'<li><a href="./catalogue/category?cat={c}">{name}</a></li>'
+            for c, name in self.names.items()
+        )
+
+        return f'<html><body><ul class="categories">{links}</ul></body></html>'
+
+    def breakdown(self, category_id: int) -> Optional[Dict[str, Any]]:
+        """Returns the item counts per letter of a category.
+
+        Args:
+            category_id (int): A category ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: A category breakdown payload, or None for an
+                unknown category.
+        """
+        if category_id not in self.names:
+            return None
+
+        return {
+            "types": [],
+            "alpha": [
+                {"letter": c, "items": len(self.letters.get((category_id, c), []))}
+                for c in LETTERS
+            ],
+        }
+
+    def page(self, category_id: int, letter: str, page: int) -> Dict[str, Any]:
+        """Returns a page of the items of a category that start with a letter.
+
+        Args:
+            category_id (int): A category ID.
+            letter (str): The letter, as in the breakdown.
+            page (int): The page number, starting at 1.
+
+        Returns:
+            Dict[str, Any]: An items page payload, empty past the last page.
+        """
+        listed = self.letters.get((category_id, letter), [])
+        start = (page - 1) * PAGE_SIZE
+
+        return {
+            "total": len(listed),
+            "items": [self.entry(i) for i in listed[max(start, 0) : start + PAGE_SIZE]],
+        }
+
+    def entry(self, item: SyntheticItem) -> Dict[str, Any]:
+        """Returns the payload of an item as listed on an items page.
+
+        Args:
+            item (SyntheticItem): An item.
+
+        Returns:
+            Dict[str, Any]: An item payload.
+        """
+        category = self.names[item.category_id]
+
+        return {
+            "icon": ICON_URL.format(size="sprite", item_id=item.id),
+            "icon_large": ICON_URL.format(size="big", item_id=item.id),
+            "id": item.id,
+            "type": category,
+            "typeIcon": TYPE_ICON_URL.format(name=category.replace(" ", "%20")),
+            "name": item.name,
+            "description": f"A synthetic {item.name.lower()}.",
+            "current": {"trend": "neutral", "price": format_price(item.price)},
+            "today": {"trend": "neutral", "price": 0},
+            "members": "true" if item.members else "false",
+        }
+
+    def detail(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Returns the details of an item.
+
+        Args:
+            item_id (int): An item ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: An item details payload, or None for an
+                unknown item.
+        """
+        item = self.items.get(item_id)
+
+        if item is None:
+            return None
+
+        prices = self.prices(item)
+        entry = self.entry(item)
+        change = prices[-1] - prices[-2] if len(prices) > 1 else 0
+        entry["today"] = {
+            "trend": _trend(change),
+            "price": f"{'-' if change < 0 else '+'} {format_price(abs(change))}"
+            if change
+            else 0,
+        }
+
+        for days in (30, 90, 180):
+            ratio = prices[-1] / prices[-min(days, len(prices))] - 1
+            entry[f"day{days}"] = {"trend": _trend(ratio), "change": f"{ratio:+.1%}"}
+
+        return {"item": entry}
+
+    def graph(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Returns the price history of an item.
+
+        Args:
+            item_id (int): An item ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: A graph payload with daily prices and their 30
+                day moving average, or None for an unknown item.
+        """
+        item = self.items.get(item_id)
+
+        if item is None:
+            return None
+
+        prices = self.prices(item)
+        daily = {}
+        average = {}
+        total = 0
+
+        for i, day in enumerate(self.days):
+            total += prices[i] - (prices[i - 30] if i >= 30 else 0)
+            daily[day] = prices[i]
+            average[day] = round(total / min(i + 1, 30))
+
+        return {"daily": daily, "average": average}
+
+    def prices(self, item: SyntheticItem) -> List[int]:
+        """Returns the daily prices of an item, a random walk to its current price.
+
+        Args:
+            item (SyntheticItem): An item.
+
+        Returns:
+            List[int]: A price per day, oldest first.
+        """
+        rng = random.Random(f"{self.seed}:{item.id}")
+        price = float(item.price)
+        prices = []
+
+        for _ in self.days:
+            prices.append(max(int(price), 1))
+            price /= 1 + rng.gauss(0, 0.02)
+
+        return prices[::-1]
+
+
+def _trend(change: float) -> str:
+    """Returns the trend of a price change.
+
+    Args:
+        change (float): A price change.
+
+    Returns:
+        str: positive, negative or neutral.
+    """
+    return "positive" if change > 0 else "negative" if change < 0 else "neutral"
+
+
+@dataclass
+class Latency:
+    """A distribution of response delays in seconds.
+
+    fixed delays by the mean, uniform by up to the spread around the mean,
+    exponential by a mean of the mean, and lognormal by a median of the mean with a
+    shape of the spread.
+    """
+
+    distribution: str = "fixed"
+    mean: float = 0.0
+    spread: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draws a delay.
+
+        Args:
+            rng (random.Random): A random number generator.
+
+        Returns:
+            float: Seconds to delay a response.
+
+        Raises:
+            ValueError: The distribution is unknown.
+        """
+        if self.mean <= 0:
+            return 0.0
+        elif self.distribution == "fixed":
+            return self.mean
+        elif self.distribution == "uniform":
+            return max(rng.uniform(self.mean - self.spread, self.mean + self.spread), 0)
+        elif self.distribution == "exponential":
+            return rng.expovariate(1 / self.mean)
+        elif self.distribution == "lognormal":
+            return self.mean * rng.lognormvariate(0, self.spread)
+
+        raise ValueError(f"Unknown latency distribution {self.distribution!r}")
+
+
+class Faults:
+    """Delays, errors and throttling of the responses of a stand-in."""
+
+    def __init__(
+        self,
+        latency: Optional[Latency] = None,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        retry_after: int = 1,
+        seed: int = 0,
+    ) -> None:
+        """Initialises the faults.
+
+        Args:
+            latency (Optional[Latency]): Delay of all responses.
+            error_rate (float): Fraction of requests that fail with a server error.
+            throttle_rate (float): Fraction of requests that are throttled.
+            rate_limit (Optional[float]): Requests per second served before
+                throttling, or None for no limit.
+            retry_after (int): Seconds in the Retry-After header of randomly
+                throttled responses.
+            seed (int): Seed of the delays and faults.
+        """
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.seed = seed
+
+        self._attempts: Dict[str, int] = {}
+        self._tokens = rate_limit or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def draw(self, path: str) -> Tuple[float, Optional[int], Optional[int]]:
+        """Draws the delay and fault of a request.
+
+        Args:
+            path (str): The request path with its query.
+
+        Returns:
+            Tuple[float, Optional[int], Optional[int]]: Seconds to delay the response,
+                and the status and Retry-After seconds of a fault, or None to serve
+                the request.
+        """
+        with self._lock:
+            attempt = self._attempts.get(path, 0)
+            self._attempts[path] = attempt + 1
+            wait = self._take()
+
+        rng = random.Random(f"{self.seed}:{path}:{attempt}")
+        delay = self.latency.sample(rng)
+        roll = rng.random()
+
+        if wait is not None:
+            return delay, 429, max(int(wait + 0.999), 1)
+        elif roll < self.throttle_rate:
+            return delay, 429, self.retry_after
+        elif roll < self.throttle_rate + self.error_rate:
+            return delay, rng.choice(ERROR_STATUSES), None
+
+        return delay, None, None
+
+    def _take(self) -> Optional[float]:
+        """Takes a token from the rate limit bucket, which holds a second of tokens.
+
+        Returns:
+            Optional[float]: None if a token was taken, otherwise seconds until the
+                next token.
+        """
+        if self.rate_limit is None:
+            return None
+
+        now = time.monotonic()
+        self._tokens = min(
+            self._tokens + (now - self._updated) * self.rate_limit, self.rate_limit
+        )
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+
+        return (1 - self._tokens) / self.rate_limit
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves the itemdb endpoints of a stand-in."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StandIn"
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serves a request, unless a fault is drawn for it."""
+        url = urlsplit(self.path)
+
+        if url.path == "/stats":
+            self.send(200, self.server.get_stats())
+            return
+
+        delay, status, retry_after = self.server.faults.draw(self.path)
+
+        if delay:
+            time.sleep(delay)
+
+        if status is None:
+            try:
+                status, body = self.route(url.path, parse_qs(url.query))
+            except (KeyError, ValueError):
+                status, body = 400, {"error": "Invalid query"}
+        else:
+            body = {"error": "Injected fault"}
+
+        self.server.count(status)
+        headers = {"Retry-After": str(retry_after)} if retry_after else {}
+        self.send(status, body, headers)
+
+    def route(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        """Returns the status and body of an endpoint.
+
+        Args:
+            path (str): The request path.
+            query (Dict[str, List[str]]): The query parameters.
+
+        Returns:
+            Tuple[int, Any]: The status, and the body as text or a JSON document.
+        """
+        catalogue = self.server.catalogue
+        body: Any = None
+
+        if path == f"{PREFIX}/catalogue":
+            body = catalogue.html()
+        elif path == f"{PREFIX}/api/catalogue/category.json":
+            body = catalogue.breakdown(int(query["category"][0]))
+        elif path == f"{PREFIX}/api/catalogue/items.json":
+            body = catalogue.page(
+                int(query["category"][0]), query["alpha"][0], int(query["page"][0])
+            )
+        elif path == f"{PREFIX}/api/catalogue/detail.json":
+            body = catalogue.detail(int(query["item"][0]))
+        elif path.startswith(f"{PREFIX}/api/graph/") and path.endswith(".json"):
+            body = catalogue.graph(int(path[len(PREFIX) + 11 : -5]))
+
+        return (200, body) if body is not None else (404, "")
+
+    def send(
+        self, status: int, body: Any, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Sends a response.
+
+        Args:
+            status (int): The status.
+            body (Any): Text, or a JSON document.
+            headers (Optional[Dict[str, str]]): Additional headers.
+        """
+        if isinstance(body, str):
+            data, content_type = body.encode(), "text/html; charset=utf-8"
+        else:
+            data = json.dumps(body, separators=(",", ":")).encode()
+            content_type = "application/json"
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args: Any) -> None:
+        """Does not log requests.
+
+        Args:
+            args (Any): The message and its arguments.
+        """
+
+
+class StandIn(ThreadingHTTPServer):
+    """A threaded HTTP server that stands in for the itemdb services.
+
+    Call serve_forever to handle requests, the origin is accepted by
+    ``ge --api-url``. ``GET /stats`` returns the number of requests served by
+    status.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        catalogue: Catalogue,
+        faults: Optional[Faults] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialises the server and binds its port.
+
+        Args:
+            catalogue (Catalogue): The catalogue to serve.
+            faults (Optional[Faults]): Delays and faults of the responses.
+            host (str): The interface to listen on.
+            port (int): The port, 0 for any free port.
+        """
+        super().__init__((host, port), Handler)
+        self.host = host
+        self.catalogue = catalogue
+        self.faults = faults or Faults()
+        self._statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def origin(self) -> str:
+        """Returns the origin of the server.
+
+        Returns:
+            str: Scheme, host and port.
+        """
+        return f"http://{self.host}:{self.server_port}"
+
+    def count(self, status: int) -> None:
+        """Counts a served request.
+
+        Args:
+            status (int): The status of the response.
+        """
+        with self._lock:
+            self._statuses[status] = self._statuses.get(status, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the number of requests served.
+
+        Returns:
+            Dict[str, Any]: The total and the count by status.
+        """
+        with self._lock:
+            statuses = {str(k): v for k, v in sorted(self._statuses.items())}
+
+        return {"requests": sum(statuses.values()), "statuses": statuses}
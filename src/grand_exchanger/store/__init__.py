@@ -0,0 +1,31 @@
+"""Module for locally persisted state."""
+from .catalogue import Catalogue, CatalogueEntry, get_catalogue
+from .categories import CategoryIndex, get_category_index
+from .checkpoint import Checkpoint
+from .last_prices import LastPrices
+from .paths import state_path, write_atomic
+from .watermarks import Watermarks
+
+
+def reset() -> None:
+    """Forgets all state loaded by this process."""
+    if get_catalogue.cache_info().currsize:
+        get_catalogue().close()
+
+    get_catalogue.cache_clear()
+    get_category_index.cache_clear()
+
+
+__all__ = [
+    "Catalogue",
+    "CatalogueEntry",
+    "CategoryIndex",
+    "Checkpoint",
+    "get_catalogue",
+    "get_category_index",
+    "LastPrices",
+    "reset",
+    "state_path",
+    "Watermarks",
+    "write_atomic",
+]
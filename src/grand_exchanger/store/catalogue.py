@@ -0,0 +1,197 @@
+"""Module for the local item catalogue."""
+from dataclasses import dataclass, field
+from functools import lru_cache
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .paths import state_path
+
+
+MISSING_TTL = 7 * 24 * 60 * 60
+
+CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category_id INTEGER NOT NULL,
+    members INTEGER NOT NULL,
+    price INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS missing (
+    id INTEGER PRIMARY KEY,
+    checked REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class CatalogueEntry:
+    """Metadata and last known price of an item."""
+
+    id: int
+    name: str
+    category_id: int
+    members: bool
+    price: int
+    updated: Optional[float] = field(default=None, compare=False)
+
+
+class Catalogue:
+    """Index of item metadata by ID, persisted in SQLite.
+
+    IDs that the API reported as unknown are remembered for a while, so lookups of
+    those are rejected without a request.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, missing_ttl: float = MISSING_TTL
+    ) -> None:
+        """Initialises the catalogue, creating its database if needed.
+
+        Args:
+            path (Optional[str]): The SQLite database file.
+            missing_ttl (float): Seconds for which unknown IDs are remembered.
+        """
+        self.path = path or state_path("catalogue.sqlite3")
+        self.missing_ttl = missing_ttl
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        self._missing: Dict[int, float] = dict(
+            self._connection.execute("SELECT id, checked FROM missing")
+        )
+
+    def get(self, item_id: int) -> Optional[CatalogueEntry]:
+        """Returns the entry of an item.
+
+        Args:
+            item_id (int): An item ID.
+
+        Returns:
+            Optional[CatalogueEntry]: The entry, or None if the item is not indexed.
+        """
+        return self.get_many([item_id]).get(item_id)
+
+    def get_many(self, item_ids: Iterable[int]) -> Dict[int, CatalogueEntry]:
+        """Returns the entries of many items at once.
+
+        Args:
+            item_ids (Iterable[int]): Item IDs.
+
+        Returns:
+            Dict[int, CatalogueEntry]: Entries by ID for the indexed items.
+        """
+        entries = {}
+
+        with self._lock:
+            for chunk in _chunks(list(set(item_ids)), CHUNK_SIZE):
+                rows = self._connection.execute(
+                    "SELECT id, name, category_id, members, price, updated FROM items "
+                    "WHERE id IN (%s)" % ",".join("?" * len(chunk)),
+                    chunk,
+                )
+
+                for row in rows:
+                    entries[row[0]] = CatalogueEntry(
+                        row[0], row[1], row[2], bool(row[3]), row[4], row[5]
+                    )
+
+        return entries
+
+    def upsert(self, entries: Iterable[CatalogueEntry]) -> None:
+        """Adds or updates entries, forgetting that their IDs were unknown.
+
+        Entries are stored as updated now.
+
+        Args:
+            entries (Iterable[CatalogueEntry]): Entries to store.
+        """
+        now = time.time()
+        rows = [(e.id, e.name, e.category_id, e.members, e.price, now) for e in entries]
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+            found = [(row[0],) for row in rows if row[0] in self._missing]
+
+            if found:
+                self._connection.executemany("DELETE FROM missing WHERE id = ?", found)
+
+                for (item_id,) in found:
+                    del self._missing[item_id]
+
+    def mark_missing(self, item_id: int) -> None:
+        """Remembers that an ID is unknown to the API.
+
+        Args:
+            item_id (int): An item ID.
+        """
+        now = time.time()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO missing VALUES (?, ?)", (item_id, now)
+            )
+            self._missing[item_id] = now
+
+    def is_missing(self, item_id: int) -> bool:
+        """Returns whether an ID was recently reported as unknown.
+
+        Args:
+            item_id (int): An item ID.
+
+        Returns:
+            bool: True if the ID can be rejected without a request.
+        """
+        checked = self._missing.get(item_id)
+
+        return checked is not None and time.time() - checked < self.missing_ttl
+
+    def __len__(self) -> int:
+        """Returns the number of indexed items.
+
+        Returns:
+            int: Number of items.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the database."""
+        with self._lock:
+            self._connection.close()
+
+
+def _chunks(values: List[int], size: int) -> Iterator[List[int]]:
+    """Splits values into chunks that fit in a query.
+
+    Args:
+        values (List[int]): Values to split.
+        size (int): Maximum chunk size.
+
+    Yields:
+        List[int]: The next chunk.
+    """
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+@lru_cache(maxsize=None)
+def get_catalogue() -> Catalogue:
+    """Returns the item catalogue shared by this process.
+
+    Returns:
+        Catalogue: The item catalogue.
+    """
+    return Catalogue()
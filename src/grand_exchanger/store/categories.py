@@ -0,0 +1,192 @@
+"""Module for the category index."""
+from functools import lru_cache
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from grand_exchanger import resources
+from .paths import state_path, write_atomic
+
+
+TTL = 24 * 60 * 60
+MAX_AGE = 7 * 24 * 60 * 60
+MISS_INTERVAL = 10 * 60
+
+
+class CategoryIndex:
+    """Index of categories by ID and by name.
+
+    The index is persisted to disk. Once it is older than its time to live, lookups
+    keep answering from the stale index while it is refreshed in the background.
+    Short-lived processes may exit before that refresh completes, so an index older
+    than its maximum age is refreshed before answering. A lookup that misses refreshes
+    the index as well, at most once per miss interval.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = TTL,
+        max_age: float = MAX_AGE,
+        miss_interval: float = MISS_INTERVAL,
+    ) -> None:
+        """Initialises the index.
+
+        Args:
+            path (Optional[str]): The file to persist the index to.
+            ttl (float): Seconds after which the index is refreshed in the background.
+            max_age (float): Seconds after which the index is refreshed before use.
+            miss_interval (float): Seconds between refreshes caused by lookup misses.
+        """
+        self.path = path or state_path("categories.json")
+        self.ttl = ttl
+        self.max_age = max_age
+        self.miss_interval = miss_interval
+
+        self._names: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}
+        self._updated: Optional[float] = None
+        self._attempted = 0.0
+
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+
+    def categories(self) -> List[Tuple[int, str]]:
+        """Returns all categories sorted by ID.
+
+        Returns:
+            List[Tuple[int, str]]: Tuples of category ID and name.
+        """
+        self._ensure()
+        return sorted(self._names.items())
+
+    def get_name(self, category_id: int) -> Optional[str]:
+        """Returns the name of a category.
+
+        Args:
+            category_id (int): A category ID.
+
+        Returns:
+            Optional[str]: The category name, or None for an unknown ID.
+        """
+        self._ensure()
+
+        if category_id not in self._names:
+            self._refresh_on_miss()
+
+        return self._names.get(category_id)
+
+    def get_id(self, name: str) -> Optional[int]:
+        """Returns the ID of a category.
+
+        Args:
+            name (str): A category name.
+
+        Returns:
+            Optional[int]: The category ID, or None for an unknown name.
+        """
+        self._ensure()
+
+        if name not in self._ids:
+            self._refresh_on_miss()
+
+        return self._ids.get(name)
+
+    def refresh(self) -> None:
+        """Rebuilds the index from the catalogue and persists it."""
+        self._attempted = time.time()
+        names = dict(resources.get_categories())
+        updated = time.time()
+
+        self._set(names, updated)
+        write_atomic(
+            self.path,
+            json.dumps({"updated": updated, "categories": names}).encode(),
+        )
+
+    def _set(self, names: Dict[int, str], updated: float) -> None:
+        """Replaces the content of the index.
+
+        Args:
+            names (Dict[int, str]): Category names by ID.
+            updated (float): Epoch time of the catalogue scrape.
+        """
+        self._names = names
+        self._ids = {name: category_id for category_id, name in names.items()}
+        self._updated = updated
+
+    def _load(self) -> bool:
+        """Loads the persisted index.
+
+        Returns:
+            bool: True if a valid index was found, False otherwise.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = json.load(f)
+
+            names = {int(k): v for k, v in data["categories"].items()}
+            self._set(names, float(data["updated"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        return True
+
+    def _ensure(self) -> None:
+        """Makes sure the index is loaded and not too old, refreshing it if stale."""
+        if self._updated is None:
+            with self._lock:
+                if self._updated is None and not self._load():
+                    self.refresh()
+
+        age = time.time() - self._updated  # type: ignore
+
+        if age > self.max_age:
+            with self._lock:
+                if self._may_refresh(self.max_age):
+                    self._refresh_quietly()
+        elif age > self.ttl:
+            with self._lock:
+                if self._refresher is None or not self._refresher.is_alive():
+                    self._refresher = threading.Thread(
+                        target=self._refresh_quietly, daemon=True
+                    )
+                    self._refresher.start()
+
+    def _refresh_on_miss(self) -> None:
+        """Refreshes the index after a lookup missed, unless it did so recently."""
+        with self._lock:
+            if self._may_refresh(self.miss_interval):
+                self._refresh_quietly()
+
+    def _may_refresh(self, age: float) -> bool:
+        """Returns whether the index is older than an age and not refreshed since.
+
+        Failed refreshes count as well, so an unreachable catalogue is not asked
+        again on every lookup.
+
+        Args:
+            age (float): Seconds after which the index may be refreshed.
+
+        Returns:
+            bool: True if the index may be refreshed.
+        """
+        return time.time() - max(self._updated or 0.0, self._attempted) > age
+
+    def _refresh_quietly(self) -> None:
+        """Refreshes the index, keeping the stale index if the refresh fails."""
+        try:
+            self.refresh()
+        except Exception:  # noqa: S110
+            pass
+
+
+@lru_cache(maxsize=None)
+def get_category_index() -> CategoryIndex:
+    """Returns the category index shared by this process.
+
+    Returns:
+        CategoryIndex: The category index.
+    """
+    return CategoryIndex()
@@ -0,0 +1,147 @@
+"""Module for resumable crawl checkpoints."""
+import os
+import re
+import time
+from typing import List, Optional, Set
+
+from grand_exchanger import exceptions
+from .paths import state_path, write_atomic
+
+
+INTERVAL = 60.0
+
+
+class Checkpoint:
+    """The items a crawl has output, journaled so an interrupted crawl can resume.
+
+    The journal starts with a line identifying the crawl and its settings, followed by
+    a line of item IDs per save. Saves append a single line in one write, and a torn
+    last line left by a crash is ignored when resuming, so every save is atomic.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        settings: str = "",
+        path: Optional[str] = None,
+        interval: float = INTERVAL,
+    ) -> None:
+        """Initialises the checkpoint.
+
+        Args:
+            key (str): Identifies the crawl, a checkpoint of another crawl is never
+                resumed.
+            settings (str): The settings of the crawl that determine its output, on
+                a single line.
+            path (Optional[str]): The journal file.
+            interval (float): Seconds after which output and checkpoint are saved
+                even if the output buffer is not full.
+        """
+        self.key = key
+        self.settings = settings
+        self.path = path or state_path(
+            "checkpoints", re.sub(r"\W+", "-", key).strip("-") + ".journal"
+        )
+        self.interval = interval
+
+        self._done: Set[int] = set()
+        self._pending: List[int] = []
+        self._started = time.monotonic()
+
+    def resume(self) -> int:
+        """Continues the journal of an interrupted crawl, or starts a new one.
+
+        Returns:
+            int: Number of items output before the interruption.
+
+        Raises:
+            CheckpointMismatchException: The interrupted crawl had other settings,
+                with its settings as argument.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except OSError:
+            lines = [b""]
+
+        key, _, settings = lines[0].decode(errors="replace").partition("\t")
+
+        if key != self.key:
+            self.start()
+            return 0
+
+        if settings != self.settings:
+            raise exceptions.CheckpointMismatchException(settings)
+
+        for line in lines[1:-1]:
+            self._done.update(int(i) for i in line.split())
+
+        if lines[-1]:
+            self._rewrite()
+
+        return len(self._done)
+
+    def start(self) -> None:
+        """Starts a new journal, forgetting the items of a previous crawl."""
+        self._done.clear()
+        self._pending.clear()
+        self._rewrite()
+
+    def __contains__(self, item_id: object) -> bool:
+        """Returns whether an item has been output.
+
+        Args:
+            item_id (object): An item ID.
+
+        Returns:
+            bool: True if the item was output by this or the interrupted crawl.
+        """
+        return item_id in self._done
+
+    def add(self, item_id: int) -> None:
+        """Records that an item was output.
+
+        The item is journaled by the next save, which must happen after its output
+        was flushed.
+
+        Args:
+            item_id (int): An item ID.
+        """
+        self._done.add(item_id)
+        self._pending.append(item_id)
+
+    def due(self) -> bool:
+        """Returns whether the interval has passed, starting the next one.
+
+        Returns:
+            bool: True if the output and the checkpoint should be saved.
+        """
+        now = time.monotonic()
+
+        if now - self._started < self.interval:
+            return False
+
+        self._started = now
+        return True
+
+    def save(self) -> None:
+        """Journals the items recorded since the last save."""
+        if self._pending:
+            with open(self.path, "ab") as f:
+                f.write(" ".join(map(str, self._pending)).encode() + b"\n")
+
+            self._pending.clear()
+
+    def clear(self) -> None:
+        """Removes the journal of a completed crawl."""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _rewrite(self) -> None:
+        """Replaces the journal with the items known so far."""
+        lines = [f"{self.key}\t{self.settings}"] + (
+            [" ".join(map(str, self._done))] if self._done else []
+        )
+        write_atomic(self.path, "\n".join(lines).encode() + b"\n")
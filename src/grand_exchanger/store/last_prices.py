@@ -0,0 +1,94 @@
+"""Module for the last polled price of every item."""
+import json
+import time
+from typing import Dict, Optional
+
+from .paths import state_path, write_atomic
+
+
+class LastPrices:
+    """The price of every item at its last emitted poll measurement.
+
+    Polls in changes-only mode emit an item only when its price differs from the
+    one recorded here. Every so often a keyframe emits all items regardless, so
+    series with rare trades still get recent points. The time of the last keyframe
+    is kept with the prices.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialises the prices from disk.
+
+        Args:
+            path (Optional[str]): The file to persist the prices to.
+        """
+        self.path = path or state_path("last_prices.json")
+        self._prices: Dict[int, int] = {}
+        self._keyframe: Optional[float] = None
+
+        try:
+            with open(self.path, "rb") as f:
+                state = json.load(f)
+
+            self._prices = {int(k): v for k, v in state["prices"].items()}
+            self._keyframe = state["keyframe"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def __len__(self) -> int:
+        """Returns the number of items with a price.
+
+        Returns:
+            int: Number of items.
+        """
+        return len(self._prices)
+
+    def is_changed(self, item_id: int, price: int) -> bool:
+        """Returns whether the price of an item differs from the last emitted one.
+
+        Args:
+            item_id (int): An item ID.
+            price (int): The polled price.
+
+        Returns:
+            bool: True if the price moved or the item was never emitted.
+        """
+        return self._prices.get(item_id) != price
+
+    def update(self, item_id: int, price: int) -> None:
+        """Records the price of an emitted measurement.
+
+        Args:
+            item_id (int): An item ID.
+            price (int): The emitted price.
+        """
+        self._prices[item_id] = price
+
+    def is_keyframe_due(self, interval: float, now: Optional[float] = None) -> bool:
+        """Returns whether a poll should emit all items.
+
+        Args:
+            interval (float): Seconds between keyframes, or 0 for no keyframes.
+            now (Optional[float]): Epoch seconds, defaults to the current time.
+
+        Returns:
+            bool: True if the last keyframe is at least the interval ago.
+        """
+        if not interval:
+            return False
+
+        now = time.time() if now is None else now
+
+        return self._keyframe is None or now - self._keyframe >= interval
+
+    def mark_keyframe(self, now: Optional[float] = None) -> None:
+        """Records that a poll emitted all items.
+
+        Args:
+            now (Optional[float]): Epoch seconds, defaults to the current time.
+        """
+        self._keyframe = time.time() if now is None else now
+
+    def save(self) -> None:
+        """Persists the prices."""
+        state = {"keyframe": self._keyframe, "prices": self._prices}
+        write_atomic(self.path, json.dumps(state, separators=(",", ":")).encode())
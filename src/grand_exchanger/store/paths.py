@@ -0,0 +1,52 @@
+"""Module for state file locations."""
+import os
+import tempfile
+
+
+STATE_DIR_VARIABLE = "GE_STATE_DIR"
+
+
+def state_path(*parts: str) -> str:
+    """Returns a path in the state directory.
+
+    The state directory is taken from the GE_STATE_DIR environment variable and
+    defaults to ~/.cache/grand_exchanger. It is created if it does not exist.
+
+    Args:
+        parts (str): Path components relative to the state directory.
+
+    Returns:
+        str: An absolute path.
+    """
+    root = os.environ.get(STATE_DIR_VARIABLE) or os.path.join(
+        os.path.expanduser("~"), ".cache", "grand_exchanger"
+    )
+    path = os.path.join(root, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    return path
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Replaces the content of a file in a single step.
+
+    Readers in other processes see either the old or the new content, never a
+    partially written file.
+
+    Args:
+        path (str): The file to write.
+        data (bytes): The new content.
+
+    Raises:
+        BaseException: The file could not be written.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
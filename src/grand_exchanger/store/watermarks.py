@@ -0,0 +1,162 @@
+"""Module for per-item fetch watermarks."""
+import fcntl
+import json
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from .paths import state_path, write_atomic
+
+
+DAY = 24 * 60 * 60
+
+
+class Watermarks:
+    """The last emitted price point of every item.
+
+    Points at or before an item's watermark have already been emitted, unless the
+    price of the latest point has changed since. Along with the point, the price
+    listed on the catalogue pages is kept, since those prices are abbreviated and
+    cannot be compared with the exact prices of the points.
+
+    Several crawls, such as the shards of one crawl, may share the watermarks. Each
+    saves only the marks it changed, merged into those on disk under a file lock.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialises the watermarks from disk.
+
+        Args:
+            path (Optional[str]): The file to persist the watermarks to.
+        """
+        self.path = path or state_path("watermarks.json")
+        self._marks = self._load()
+        self._changed: Set[int] = set()
+
+    def _load(self) -> Dict[int, Tuple[int, int, Optional[int]]]:
+        """Reads the watermarks on disk.
+
+        Returns:
+            Dict[int, Tuple[int, int, Optional[int]]]: Epoch seconds and price of
+                the last emitted point and the listed price by item ID, empty if
+                the file is missing or unreadable.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                return {
+                    int(k): (v[0], v[1], v[2] if len(v) > 2 else None)
+                    for k, v in json.load(f).items()
+                }
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, item_id: int) -> Optional[Tuple[int, int]]:
+        """Returns the watermark of an item.
+
+        Args:
+            item_id (int): An item ID.
+
+        Returns:
+            Optional[Tuple[int, int]]: Epoch seconds and price of the last emitted
+                point, or None if nothing was emitted yet.
+        """
+        mark = self._marks.get(item_id)
+
+        return None if mark is None else mark[:2]
+
+    def is_current(
+        self, item_id: int, listed_price: int, now: Optional[float] = None
+    ) -> bool:
+        """Returns whether an item cannot have new points.
+
+        This is the case when the last emitted point is from the current game day
+        and the catalogue still lists the item at the price it had back then.
+
+        Args:
+            item_id (int): An item ID.
+            listed_price (int): The price of the item on the catalogue pages.
+            now (Optional[float]): Epoch seconds, defaults to the current time.
+
+        Returns:
+            bool: True if fetching the price history can be skipped.
+        """
+        mark = self._marks.get(item_id)
+        now = time.time() if now is None else now
+
+        return (
+            mark is not None
+            and mark[0] // DAY == now // DAY
+            and mark[2] == listed_price
+        )
+
+    def is_new(self, item_id: int, epoch: int, price: int) -> bool:
+        """Returns whether a price point has not been emitted yet.
+
+        Args:
+            item_id (int): An item ID.
+            epoch (int): The time of the price point in epoch seconds.
+            price (int): The price.
+
+        Returns:
+            bool: True if the point is newer than the watermark, or updates it.
+        """
+        mark = self._marks.get(item_id)
+
+        if mark is None:
+            return True
+
+        return epoch > mark[0] or (epoch == mark[0] and price != mark[1])
+
+    def advance(self, item_id: int, epoch: int, price: int) -> None:
+        """Moves the watermark of an item forward to an emitted point.
+
+        Args:
+            item_id (int): An item ID.
+            epoch (int): The time of the emitted price point in epoch seconds.
+            price (int): The emitted price.
+        """
+        mark = self._marks.get(item_id)
+
+        if mark is None:
+            self._marks[item_id] = (epoch, price, None)
+        elif epoch >= mark[0]:
+            self._marks[item_id] = (epoch, price, mark[2])
+        else:
+            return
+
+        self._changed.add(item_id)
+
+    def set_listed(self, item_id: int, listed_price: int) -> None:
+        """Records the catalogue price of an item whose points were emitted.
+
+        Args:
+            item_id (int): An item ID.
+            listed_price (int): The price of the item on the catalogue pages.
+        """
+        mark = self._marks.get(item_id)
+
+        if mark is not None:
+            self._marks[item_id] = (mark[0], mark[1], listed_price)
+            self._changed.add(item_id)
+
+    def save(self) -> None:
+        """Persists the watermarks changed since loading.
+
+        The watermarks on disk are read again and the changed marks are merged in,
+        unless a mark on disk is newer, so crawls saving at the same time keep each
+        other's marks.
+        """
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            marks = self._load()
+
+            for item_id in self._changed:
+                mark = self._marks[item_id]
+
+                if item_id not in marks or marks[item_id][0] <= mark[0]:
+                    marks[item_id] = mark
+
+            write_atomic(self.path, json.dumps(marks).encode())
+
+        self._marks = marks
+        self._changed.clear()
@@ -0,0 +1,50 @@
+"""Module for timestamp conversions.
+
+Price points are kept as integer epoch seconds from decoding to output. Datetimes
+are only created when a caller asks for one, and every distinct time is formatted
+once, since a crawl repeats the same few hundred days for every item.
+"""
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+EPOCH = datetime(1970, 1, 1)
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def to_epoch(dt: datetime) -> int:
+    """Returns the epoch seconds of a naive UTC datetime.
+
+    Args:
+        dt (datetime): A naive datetime in UTC.
+
+    Returns:
+        int: Seconds since the epoch.
+    """
+    return calendar.timegm(dt.timetuple())
+
+
+def from_epoch(epoch: int) -> datetime:
+    """Returns the naive UTC datetime of epoch seconds.
+
+    Args:
+        epoch (int): Seconds since the epoch.
+
+    Returns:
+        datetime: A naive datetime in UTC.
+    """
+    return EPOCH + timedelta(seconds=epoch)
+
+
+@lru_cache(maxsize=4096)
+def format_epoch(epoch: int) -> str:
+    """Formats epoch seconds as an ISO 8601 time in UTC.
+
+    Args:
+        epoch (int): Seconds since the epoch.
+
+    Returns:
+        str: The time, such as ``2020-07-01T00:00:00Z``.
+    """
+    return from_epoch(epoch).strftime(ISO_FORMAT)
@@ -1,6 +1,27 @@
 """Pytest configuration settings."""
+import pytest
+
+from grand_exchanger import metrics, resources, store
 
 
 def pytest_configure(config):
     """Add end to end marker for integration tests."""
     config.addinivalue_line("markers", "e2e: mark as end-to-end test.")
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    """Fixture for isolating persisted state in a temporary directory."""
+    monkeypatch.setenv("GE_STATE_DIR", str(tmp_path / "state"))
+    store.reset()
+    resources.forget_category_breakdowns()
+    yield tmp_path / "state"
+    store.reset()
+
+
+@pytest.fixture
+def registry():
+    """Fixture for collecting metrics from an empty registry."""
+    metrics.REGISTRY.reset()
+    yield metrics.REGISTRY
+    metrics.REGISTRY.reset()
@@ -0,0 +1,206 @@
+"""Tests for the vectorized price analysis."""
+import json
+import statistics
+import sys
+
+import click.testing
+import pytest
+
+from grand_exchanger import analysis, models
+from grand_exchanger.cli import analyze
+from grand_exchanger.resources.graph import Graph, Series
+
+numpy = pytest.importorskip("numpy")
+
+DAY = 86400000
+
+
+def series(*prices):
+    """Returns a series of daily prices starting at the epoch, None for no price."""
+    return Series.from_points(
+        [(i * DAY, p) for i, p in enumerate(prices) if p is not None]
+    )
+
+
+@pytest.fixture
+def matrix():
+    """Fixture for a matrix of two items with a missing and a zero price."""
+    return analysis.PriceMatrix.from_graphs(
+        [
+            (1, Graph(series(100, 110, 99, 121), series(100, 105, 103, 107))),
+            (2, Graph(series(None, 50, 0, 50), series())),
+        ]
+    )
+
+
+class TestPriceMatrix:
+    """Test class for grand_exchanger.analysis.PriceMatrix."""
+
+    def test_from_graphs(self, matrix):
+        """Series are placed by day, days without a price are NaN."""
+        assert matrix.item_ids.tolist() == [1, 2]
+        assert matrix.days.tolist() == [0, 86400, 172800, 259200]
+        numpy.testing.assert_array_equal(
+            matrix.daily, [[100, 110, 99, 121], [numpy.nan, 50, 0, 50]]
+        )
+        numpy.testing.assert_array_equal(matrix.average[1], [numpy.nan] * 4)
+
+    def test_from_no_graphs(self):
+        """A matrix without items has no days."""
+        matrix = analysis.PriceMatrix.from_graphs([])
+
+        assert len(matrix) == 0
+        assert matrix.daily.shape == (0, 0)
+
+    def test_returns(self, matrix):
+        """Returns are relative to the day before, NaN without a price to compare."""
+        numpy.testing.assert_allclose(
+            matrix.returns(),
+            [[numpy.nan, 0.1, -0.1, 2 / 9], [numpy.nan, numpy.nan, -1, numpy.nan]],
+        )
+
+    def test_volatility(self, matrix):
+        """Volatility is the sample deviation of the returns in the window."""
+        volatility = matrix.volatility(window=3)
+
+        assert volatility[0, 3] == pytest.approx(statistics.stdev([0.1, -0.1, 2 / 9]))
+        assert numpy.isnan(volatility[0, :3]).all()
+        assert numpy.isnan(volatility[1]).all()
+
+    def test_zscores(self, matrix):
+        """Z-scores compare prices with the mean of their window."""
+        zscores = matrix.zscores(window=2)
+        window = [99, 121]
+
+        assert zscores[0, 3] == pytest.approx(
+            (121 - statistics.mean(window)) / statistics.stdev(window)
+        )
+        assert numpy.isnan(zscores[0, 0])
+        assert numpy.isnan(matrix.zscores(window=5)).all()
+
+    def test_zscores_large_prices(self):
+        """Flat windows of large prices have no z-score."""
+        price = 2_147_483_647
+        matrix = analysis.PriceMatrix.from_graphs(
+            [(1, Graph(series(price, price, price), series()))]
+        )
+
+        assert numpy.isnan(matrix.zscores(window=3)).all()
+
+    def test_invalid_window(self, matrix):
+        """Windows of a single value are refused."""
+        with pytest.raises(ValueError):
+            matrix.volatility(window=1)
+
+    def test_save(self, matrix, tmp_path):
+        """Saved matrices are loaded unchanged."""
+        path = str(tmp_path / "prices.npz")
+        matrix.save(path)
+        loaded = analysis.PriceMatrix.load(path)
+
+        numpy.testing.assert_array_equal(loaded.daily, matrix.daily)
+        numpy.testing.assert_array_equal(loaded.average, matrix.average)
+        assert loaded.item_ids.tolist() == [1, 2]
+        assert loaded.days.tolist() == matrix.days.tolist()
+
+    def test_latest(self):
+        """The last value of each row is found, rows without values have none."""
+        columns, values = analysis.latest(
+            numpy.array([[1, 2, numpy.nan], [numpy.nan] * 3, [3, numpy.nan, 4]])
+        )
+
+        assert columns.tolist() == [1, -1, 2]
+        numpy.testing.assert_array_equal(values, [2, numpy.nan, 4])
+        assert analysis.latest(numpy.empty((2, 0)))[0].tolist() == [-1, -1]
+
+    def test_without_numpy(self, mocker):
+        """A missing numpy is reported when a matrix is built."""
+        mocker.patch.dict(sys.modules, {"numpy": None})
+
+        with pytest.raises(ImportError, match="requires numpy"):
+            analysis.PriceMatrix.from_graphs([])
+
+
+class TestAnalyze:
+    """Test class for the analyze command group."""
+
+    @pytest.fixture
+    def mock_models(self, mocker):
+        """Fixture for mocking the categories, items and graphs of the models."""
+        mocker.patch.object(
+            models.Category, "get", lambda id: models.Category(id, "Ammo")
+        )
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: [
+                models.Item(1, "Thing", "Ammo", False, 121),
+                models.Item(2, "Other", "Ammo", False, 0),
+            ],
+        )
+        graphs = {
+            1: Graph(series(100, 110, 99, 121), series(100, 105, 103, 107)),
+            2: Graph(),
+        }
+        mocker.patch.object(
+            models.Item, "get_graph", lambda item, *args: graphs[item.id]
+        )
+
+    def test_category(self, mock_models, tmp_path):
+        """The latest statistics of items with prices are output."""
+        path = str(tmp_path / "prices.npz")
+        result = click.testing.CliRunner().invoke(
+            analyze.cli, ["--window", "3", "--save", path, "category", "1"]
+        )
+
+        assert result.exit_code == 0
+        assert [json.loads(i) for i in result.output.splitlines()] == [
+            {
+                "item_id": 1,
+                "name": "Thing",
+                "category": "Ammo",
+                "time": "1970-01-04T00:00:00Z",
+                "price": 121,
+                "average": 107,
+                "return": pytest.approx(2 / 9),
+                "volatility": pytest.approx(statistics.stdev([0.1, -0.1, 2 / 9])),
+                "zscore": pytest.approx(
+                    (121 - statistics.mean([110, 99, 121]))
+                    / statistics.stdev([110, 99, 121])
+                ),
+            }
+        ]
+        assert len(analysis.PriceMatrix.load(path)) == 2
+
+    def test_missing_statistics(self, mock_models):
+        """Statistics without enough prices are null."""
+        result = click.testing.CliRunner().invoke(analyze.cli, ["category", "1"])
+
+        record = json.loads(result.output)
+        assert record["volatility"] is None
+        assert record["zscore"] is None
+
+    def test_category_invalid(self, mocker):
+        """Exit with a status code of 1 for unknown categories."""
+        from grand_exchanger import exceptions
+
+        mocker.patch.object(
+            models.Category, "get", side_effect=exceptions.NoSuchCategoryException
+        )
+        result = click.testing.CliRunner().invoke(analyze.cli, ["category", "9999"])
+
+        assert result.exit_code == 1
+
+    def test_without_numpy(self, mocker):
+        """A missing numpy is reported before crawling."""
+        mocker.patch.dict(sys.modules, {"numpy": None})
+        get = mocker.patch.object(models.Category, "get")
+
+        result = click.testing.CliRunner(mix_stderr=False).invoke(
+            analyze.cli, ["category", "1"]
+        )
+
+        assert result.exit_code == 1
+        assert "requires numpy" in result.stderr
+        get.assert_not_called()
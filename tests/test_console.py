@@ -1,8 +1,12 @@
 """Tests for top level CLI commands."""
+import json
+import threading
+
 import click.testing
 import pytest
 
-from grand_exchanger import console
+from grand_exchanger import console, standin, store
+from grand_exchanger.resources import transport
 
 
 @pytest.fixture
@@ -21,3 +25,148 @@ def test_sub_help_succeeds(runner):
     """Exit with a status code of 0."""
     result = runner.invoke(console.cli, ["info", "--help"])
     assert result.exit_code == 0
+
+
+def test_unknown_command(runner):
+    """Unknown command groups are reported as usage errors."""
+    result = runner.invoke(console.cli, ["nope"])
+    assert result.exit_code == 2
+
+
+def test_entry_point_plugin(runner, mocker):
+    """Command groups registered by other distributions are loaded."""
+    mocker.patch.object(
+        console, "get_plugins", return_value={"extra": "grand_exchanger.cli.info:cli"}
+    )
+
+    result = runner.invoke(console.cli, ["extra", "--help"])
+    assert result.exit_code == 0
+    assert "ls" in result.output
+
+
+def test_metrics_file(runner, registry, tmp_path):
+    """A summary of the metrics is written at exit."""
+    path = tmp_path / "metrics.json"
+    registry.inc("retries_total")
+
+    result = runner.invoke(
+        console.cli, ["--metrics-file", str(path), "--metrics-port", "0", "info"]
+    )
+
+    assert result.exit_code == 0
+    assert "retries_total" in json.loads(path.read_text())["counters"]
+
+
+@pytest.fixture
+def plugins():
+    """Fixture for forgetting the plugins found by other tests."""
+    console.get_plugins.cache_clear()
+    yield
+    console.get_plugins.cache_clear()
+
+
+def test_plugins_cached(plugins, mocker):
+    """Distributions are scanned again only when the import path changes."""
+    scan = mocker.patch.object(
+        console, "scan_plugins", return_value={"extra": "extra.cli:cli"}
+    )
+
+    assert console.get_plugins()["extra"] == "extra.cli:cli"
+    assert console.get_plugins()["fetch"] == console.PLUGINS["fetch"]
+
+    console.get_plugins.cache_clear()
+    assert "extra" in console.get_plugins()
+    scan.assert_called_once()
+
+    console.get_plugins.cache_clear()
+    mocker.patch("sys.path", ["/nonexistent"])
+    console.get_plugins()
+    assert scan.call_count == 2
+
+
+@pytest.mark.parametrize("select", [True, False])
+def test_scan_plugins(mocker, select):
+    """Plugins are found through the entry points of installed distributions."""
+    entry_point = mocker.Mock(value="extra.cli:cli")
+    entry_point.name = "extra"
+    entry_points = mocker.patch("importlib.metadata.entry_points")
+
+    if select:
+        entry_points.return_value.select.return_value = [entry_point]
+    else:
+        entry_points.return_value = {console.ENTRY_POINT_GROUP: [entry_point]}
+
+    assert console.scan_plugins() == {"extra": "extra.cli:cli"}
+
+
+def test_lazy_imports():
+    """Loading all command groups does not import heavy dependencies or schemas."""
+    import json
+    import subprocess
+    import sys
+
+    script = (
+        "import json, sys\n"
+        "from grand_exchanger import console\n"
+        "for name in console.PLUGINS:\n"
+        "    console.cli.get_command(None, name)\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    )
+    modules = json.loads(result.stdout)
+
+    assert "requests_html" not in modules
+    assert "pyppeteer" not in modules
+    assert "grand_exchanger.resources.graph" not in modules
+    assert "numpy" not in modules
+
+
+@pytest.fixture
+def origin():
+    """Fixture for the origin of a running stand-in with 60 items."""
+    server = standin.StandIn(standin.Catalogue(items=60, categories=3, days=10))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.origin
+    server.shutdown()
+    server.server_close()
+    transport.set_origin(None)
+    transport.set_cache(None)
+
+
+@pytest.mark.parametrize(
+    "args,indexed", [([], 60), (["--category", "1", "--category", "2"], 40)]
+)
+def test_index(runner, origin, args, indexed):
+    """The catalogue is filled with the items of the crawled categories."""
+    result = runner.invoke(
+        console.cli, ["--no-cache", "--api-url", origin, "info", "index", *args]
+    )
+
+    assert result.exit_code == 0
+    assert result.output == f"Indexed {indexed} items, {indexed} in catalogue\n"
+    assert len(store.get_catalogue()) == indexed
+
+
+def test_index_invalid(runner, origin):
+    """Unknown categories are reported without indexing."""
+    result = runner.invoke(
+        console.cli,
+        ["--no-cache", "--api-url", origin, "info", "index", "--category", "99"],
+    )
+
+    assert result.exit_code == 1
+    assert "Invalid category" in result.output
+    assert len(store.get_catalogue()) == 0
+
+
+@pytest.mark.parametrize("ids,exit_code,items", [("1 2 1", 0, 40), ("1 99", 1, 0)])
+def test_info_category(runner, origin, ids, exit_code, items):
+    """The items of all given categories are displayed once."""
+    result = runner.invoke(
+        console.cli, ["--api-url", origin, "info", "category"], input=ids
+    )
+
+    assert result.exit_code == exit_code
+    assert result.output.count("members:") == items
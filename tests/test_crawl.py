@@ -0,0 +1,203 @@
+"""Tests for the crawl engine."""
+from datetime import datetime
+import threading
+import time
+
+import pytest
+
+from grand_exchanger import crawl, models
+from grand_exchanger.timestamps import to_epoch
+
+
+class TestCrawlEngine:
+    """Test class for grand_exchanger.crawl.CrawlEngine."""
+
+    @pytest.fixture
+    def categories(self):
+        """Fixture for a list of categories."""
+        return [models.Category(i, f"Category {i}") for i in range(1, 5)]
+
+    @pytest.fixture
+    def mock_get_items(self, mocker):
+        """Fixture for mocking the item pages of categories, three items a page."""
+
+        def get_pages(category):
+            return [("a", number) for number in range(1, category.id + 1)]
+
+        def get_page(category, letter, number):
+            time.sleep(0.001 * ((category.id + number) % 3))
+            return [
+                models.Item(category.id * 100 + i, "Thing", category.name, False, i)
+                for i in range((number - 1) * 3, number * 3)
+            ]
+
+        mocker.patch.object(models.Category, "get_pages", get_pages)
+        mocker.patch.object(models.Category, "get_page", get_page)
+
+    @pytest.fixture
+    def mock_get_price_points(self, mocker):
+        """Fixture for mocking grand_exchanger.models.Item.get_price_points."""
+
+        def get_price_points(item, start=None, end=None):
+            time.sleep(0.001 * (item.id % 4))
+            yield to_epoch(datetime(2020, 7, 2)), item.id
+            yield to_epoch(datetime(2020, 7, 1)), item.price
+
+        mocker.patch.object(models.Item, "get_price_points", get_price_points)
+
+    def sequential(self, categories):
+        """Returns items in the order of a sequential crawl."""
+        return [(c, i) for c in categories for i in c.get_items()]
+
+    def test_items_ordered(self, categories, mock_get_items):
+        """Ordered crawls yield items in sequential order."""
+        engine = crawl.CrawlEngine(concurrency=3, buffer=2)
+
+        assert list(engine.items(categories)) == self.sequential(categories)
+
+    def test_items_unordered(self, categories, mock_get_items):
+        """Unordered crawls yield every item exactly once."""
+        engine = crawl.CrawlEngine(concurrency=3, ordered=False, buffer=2)
+        result = list(engine.items(categories))
+
+        assert len(result) == 30
+        assert sorted(i.id for _, i in result) == sorted(
+            i.id for _, i in self.sequential(categories)
+        )
+
+    def test_prices_ordered(self, categories, mock_get_items, mock_get_price_points):
+        """Ordered crawls yield price histories in sequential order."""
+        engine = crawl.CrawlEngine(concurrency=4, buffer=3)
+        result = list(engine.prices(categories))
+
+        assert [(c, i) for c, i, _ in result] == self.sequential(categories)
+        assert all(
+            prices
+            == [
+                (to_epoch(datetime(2020, 7, 2)), i.id),
+                (to_epoch(datetime(2020, 7, 1)), i.price),
+            ]
+            for _, i, prices in result
+        )
+
+    def test_prices_unordered(self, categories, mock_get_items, mock_get_price_points):
+        """Unordered crawls yield every price history exactly once."""
+        engine = crawl.CrawlEngine(concurrency=4, ordered=False, buffer=3)
+        result = list(engine.prices(categories))
+
+        assert sorted(i.id for _, i, _ in result) == sorted(
+            i.id for _, i in self.sequential(categories)
+        )
+
+    def test_prices_concurrent(self, categories, mocker):
+        """Requests for price histories overlap in time."""
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: [models.Item(i, "", c.name, False, 1) for i in range(8)],
+        )
+        mocker.patch.object(
+            models.Item,
+            "get_price_points",
+            lambda i, start=None, end=None: time.sleep(0.1) or iter([]),
+        )
+        engine = crawl.CrawlEngine(concurrency=8)
+
+        start = time.monotonic()
+        assert len(list(engine.prices(categories[:1]))) == 8
+        assert time.monotonic() - start < 0.5
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_requests_in_flight(self, categories, mocker, ordered):
+        """Page and price requests together stay within the concurrency."""
+        lock = threading.Lock()
+        in_flight = []
+        active = 0
+
+        def request(result):
+            nonlocal active
+
+            with lock:
+                active += 1
+                in_flight.append(active)
+
+            time.sleep(0.01)
+
+            with lock:
+                active -= 1
+
+            return result
+
+        mocker.patch.object(
+            models.Category,
+            "get_pages",
+            lambda c: request([("a", number) for number in range(1, 9)]),
+        )
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, letter, number: request(
+                [models.Item(number, "", c.name, False, 1)]
+            ),
+        )
+        mocker.patch.object(
+            models.Item, "get_price_points", lambda i, *args: request([])
+        )
+        engine = crawl.CrawlEngine(concurrency=3, ordered=ordered)
+
+        assert len(list(engine.prices(categories[:1]))) == 8
+        assert max(in_flight) == 3
+
+    def test_failure(self, categories, mocker):
+        """Errors while crawling a category are raised to the consumer."""
+
+        def get_page(category, letter, number):
+            if number == 2:
+                raise ValueError
+
+            return [models.Item(1, "Thing", category.name, False, 1)]
+
+        mocker.patch.object(
+            models.Category, "get_pages", return_value=[("a", 1), ("a", 2)]
+        )
+        mocker.patch.object(models.Category, "get_page", get_page)
+        engine = crawl.CrawlEngine(concurrency=2)
+
+        with pytest.raises(ValueError):
+            list(engine.items(categories))
+
+    def test_failure_before_first_item(self, categories, mocker):
+        """Errors while starting to crawl a category are raised to the consumer."""
+        mocker.patch.object(models.Category, "get_pages", side_effect=ValueError)
+        engine = crawl.CrawlEngine(concurrency=2)
+
+        with pytest.raises(ValueError):
+            list(engine.items(categories))
+
+    def test_close_early(self, categories, mock_get_items):
+        """Consumers can stop before the crawl is complete."""
+        engine = crawl.CrawlEngine(concurrency=2, buffer=1)
+        items = engine.items(categories)
+
+        assert next(items)[1].id == 100
+        items.close()
+
+    def test_prices_close_early(
+        self, categories, mock_get_items, mock_get_price_points
+    ):
+        """Pending price requests are cancelled when consumers stop early."""
+        engine = crawl.CrawlEngine(concurrency=2, ordered=False, buffer=4)
+        prices = engine.prices(categories)
+
+        assert len(next(prices)[2]) == 2
+        prices.close()
+
+    def test_prices_skip(self, categories, mock_get_items, mock_get_price_points):
+        """Skipped items are not fetched."""
+        engine = crawl.CrawlEngine(concurrency=2)
+        result = list(engine.prices(categories, skip=lambda i: i.price % 2 == 0))
+
+        assert [i for _, i, _ in result] == [
+            i for _, i in self.sequential(categories) if i.price % 2
+        ]
@@ -1,10 +1,13 @@
 """Test for commands in the fetch group."""
+from datetime import datetime
 import json
 
 import click.testing
 import pytest
 
+from grand_exchanger import models
 from grand_exchanger.cli import fetch
+from grand_exchanger.timestamps import to_epoch
 
 
 @pytest.mark.e2e
@@ -111,3 +114,188 @@ class TestFetch:
         result = runner.invoke(fetch.cli, ["category", "9999"])
 
         assert result.exit_code == 1
+
+
+class TestFetchIncremental:
+    """Test class for incremental fetch commands."""
+
+    @pytest.fixture
+    def runner(self):
+        """Fixture for click runner."""
+        return click.testing.CliRunner()
+
+    @pytest.fixture
+    def mock_models(self, mocker):
+        """Fixture for mocking the item and category models."""
+        mocker.patch.object(
+            models.Category, "get", lambda id: models.Category(id, "Ammo")
+        )
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: [models.Item(1, "Thing", "Ammo", False, 100)],
+        )
+        return mocker.patch.object(
+            models.Item,
+            "get_price_points",
+            return_value=[
+                (to_epoch(datetime(2020, 7, 2)), 100),
+                (to_epoch(datetime(2020, 7, 1)), 90),
+            ],
+        )
+
+    def test_category(self, runner, mock_models):
+        """Points are output once over incremental runs."""
+        args = ["-t0", "2020-01-01", "category", "1", "--incremental"]
+
+        first = runner.invoke(fetch.cli, args)
+        assert first.exit_code == 0
+        assert len(first.output.splitlines()) == 2
+
+        mock_models.return_value = [
+            (to_epoch(datetime(2020, 7, 3)), 110),
+            (to_epoch(datetime(2020, 7, 2)), 100),
+        ]
+        second = runner.invoke(fetch.cli, args)
+        assert [json.loads(i)["time"] for i in second.output.splitlines()] == [
+            "2020-07-03T00:00:00Z"
+        ]
+
+    def test_category_full(self, runner, mock_models):
+        """All points are output without the incremental flag."""
+        args = ["-t0", "2020-01-01", "category", "1"]
+
+        runner.invoke(fetch.cli, args + ["--incremental"])
+        result = runner.invoke(fetch.cli, args)
+
+        assert len(result.output.splitlines()) == 2
+
+    def test_category_current(self, runner, mock_models, mocker):
+        """Price histories of current items are not fetched."""
+        mocker.patch("grand_exchanger.store.Watermarks.is_current", return_value=True)
+        result = runner.invoke(fetch.cli, ["category", "1", "--incremental"])
+
+        assert result.exit_code == 0
+        mock_models.assert_not_called()
+
+    def test_all_resume(self, runner, mock_models, mocker):
+        """Interrupted crawls are resumed without fetching items again."""
+        mocker.patch.object(
+            models.Category,
+            "get_categories",
+            lambda: iter([models.Category(1, "Ammo"), models.Category(2, "Arrows")]),
+        )
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: [models.Item(c.id, "Thing", c.name, False, 100)],
+        )
+        emit = fetch.emit
+
+        def interrupted(category, item, prices, writer, watermarks):
+            if item.id == 2:
+                raise KeyboardInterrupt
+
+            emit(category, item, prices, writer, watermarks)
+
+        mocker.patch.object(fetch, "emit", interrupted)
+        args = ["all", "--incremental", "--checkpoint-interval", "0"]
+        first = runner.invoke(fetch.cli, args)
+
+        mocker.patch.object(fetch, "emit", emit)
+        second = runner.invoke(fetch.cli, args + ["--resume"])
+
+        assert first.exit_code == 1
+        assert second.exit_code == 0
+        assert mock_models.call_count == 3
+        assert second.output.count('"item_id": 1') == 0
+        assert second.output.count('"item_id": 2') == 2
+
+    @pytest.mark.parametrize(
+        "options,command,changed",
+        [
+            (["-t0", "2020-01-01"], [], "start"),
+            ([], ["--format", "line-protocol"], "format"),
+            ([], ["--incremental"], "incremental"),
+        ],
+    )
+    def test_all_resume_other_settings(
+        self, mock_models, mocker, options, command, changed
+    ):
+        """Interrupted crawls are not resumed with other dates, output or options."""
+        mocker.patch.object(
+            models.Category,
+            "get_categories",
+            lambda: iter([models.Category(1, "Ammo")]),
+        )
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: [models.Item(1, "Thing", c.name, False, 100)],
+        )
+        mocker.patch.object(fetch, "emit", side_effect=KeyboardInterrupt)
+        runner = click.testing.CliRunner(mix_stderr=False)
+        runner.invoke(fetch.cli, ["all"])
+
+        result = runner.invoke(fetch.cli, options + ["all", "--resume"] + command)
+
+        assert result.exit_code == 1
+        assert f"other settings ({changed})" in result.stderr
+        assert result.output == ""
+
+    def test_items(self, mock_models, mocker):
+        """Price histories of all valid items that are not current are fetched."""
+        get_many = mocker.patch.object(
+            models.Item,
+            "get_many",
+            side_effect=lambda ids, **kwargs: iter(
+                (i, models.Item(i, "Thing", "Ammo", False, 100) if i != 3 else None)
+                for i in ids
+            ),
+        )
+        mocker.patch.object(
+            models.Category,
+            "get_category_for_item",
+            return_value=models.Category(1, "Ammo"),
+        )
+        mocker.patch(
+            "grand_exchanger.store.Watermarks.is_current",
+            lambda self, item_id, price: item_id == 4,
+        )
+        runner = click.testing.CliRunner(mix_stderr=False)
+        args = ["-t0", "2020-01-01", "item", "1", "3", "2", "4", "--incremental"]
+
+        result = runner.invoke(fetch.cli, args)
+
+        assert result.exit_code == 1
+        assert get_many.call_args[0][0] == (1, 3, 2, 4)
+        assert mock_models.call_count == 2
+        assert [json.loads(i)["tags"]["item_id"] for i in result.stdout.splitlines()][
+            ::2
+        ] == [1, 2]
+        assert "Invalid item 3" in result.stderr
+
+        result = runner.invoke(fetch.cli, ["-t0", "2020-01-01", "item", "2", "4"])
+
+        assert result.exit_code == 0
+        assert len(result.stdout.splitlines()) == 4
+
+    def test_category_current_abbreviated(self, runner, mock_models, mocker):
+        """Items are current while the catalogue lists their abbreviated price."""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: [models.Item(1, "Thing", "Ammo", False, 5900000)],
+        )
+        mock_models.return_value = [(to_epoch(today), 5912345)]
+
+        runner.invoke(fetch.cli, ["category", "1", "--incremental"])
+        result = runner.invoke(fetch.cli, ["category", "1", "--incremental"])
+
+        assert result.exit_code == 0
+        mock_models.assert_called_once()
@@ -1,4 +1,6 @@
 """Tests for commands in the info group."""
+import time
+
 import click.testing
 import pytest
 
@@ -38,3 +40,101 @@ class TestInfo:
         """Exit with a status code of 1."""
         result = runner.invoke(info.cli, ["category", "9999"])
         assert result.exit_code == 1
+
+
+class TestList:
+    """Test class for the ls command."""
+
+    @pytest.fixture
+    def mock_resources(self, mocker):
+        """Fixture for mocking the category resources with slow breakdowns."""
+        from grand_exchanger.resources.category import CategoryBreakdown, LetterCount
+
+        def get_category_breakdown(category_id):
+            time.sleep(0.1)
+            return CategoryBreakdown([LetterCount("a", category_id * 2)])
+
+        mocker.patch(
+            "grand_exchanger.resources.get_categories",
+            return_value=iter([(i, f"Category {i}") for i in range(1, 9)]),
+        )
+        return mocker.patch(
+            "grand_exchanger.resources.category.fetch_category_breakdown",
+            side_effect=get_category_breakdown,
+        )
+
+    def test_counts(self, mock_resources):
+        """Counts of all categories are requested at the same time."""
+        start = time.monotonic()
+        result = click.testing.CliRunner().invoke(info.cli, ["ls", "-c", "8"])
+
+        assert result.exit_code == 0
+        assert time.monotonic() - start < 0.5
+        assert result.output.splitlines() == [
+            f"{i}: Category {i} ({i * 2})" for i in range(1, 9)
+        ]
+
+    def test_without_counts(self, mock_resources):
+        """Categories are listed without requesting their counts."""
+        result = click.testing.CliRunner().invoke(info.cli, ["ls", "--without-counts"])
+
+        assert result.output.splitlines()[0] == "1: Category 1"
+        mock_resources.assert_not_called()
+
+
+class TestItems:
+    """Test class for info commands given many IDs."""
+
+    @pytest.fixture
+    def mock_get_many(self, mocker):
+        """Fixture for mocking grand_exchanger.models.Item.get_many."""
+        from grand_exchanger import models
+
+        def get_many(ids, **kwargs):
+            return iter(
+                (i, models.Item(i, "Thing", "Ammo", False, 100) if i else None)
+                for i in dict.fromkeys(ids)
+            )
+
+        return mocker.patch.object(models.Item, "get_many", side_effect=get_many)
+
+    def test_item(self, mock_get_many):
+        """Items of all IDs are displayed, invalid ones are reported."""
+        runner = click.testing.CliRunner(mix_stderr=False)
+        result = runner.invoke(info.cli, ["item", "1", "0", "2"])
+
+        assert result.exit_code == 1
+        assert result.stdout.count("Thing") == 2
+        assert result.stderr == "Invalid item 0\n"
+
+    def test_stdin(self, mock_get_many):
+        """Without arguments, IDs are read from stdin."""
+        result = click.testing.CliRunner().invoke(
+            info.cli, ["item"], input="1, 2\n2 3\n"
+        )
+
+        assert result.exit_code == 0
+        assert mock_get_many.call_args[0][0] == (1, 2, 2, 3)
+        assert result.output.count("Thing") == 3
+
+    @pytest.mark.parametrize(
+        "text,message",
+        [("", "Missing IDs"), ("1 x", "Invalid value for IDS")],
+    )
+    def test_invalid_stdin(self, mock_get_many, text, message):
+        """Missing or malformed IDs are usage errors."""
+        result = click.testing.CliRunner().invoke(info.cli, ["item"], input=text)
+
+        assert result.exit_code == 2
+        assert message in result.output
+        mock_get_many.assert_not_called()
+
+    def test_tty(self, mock_get_many, mocker):
+        """An interactive stdin is not read for IDs."""
+        stdin = mocker.patch("click.get_text_stream").return_value
+        stdin.isatty.return_value = True
+
+        result = click.testing.CliRunner().invoke(info.cli, ["item"])
+
+        assert result.exit_code == 2
+        stdin.read.assert_not_called()
@@ -0,0 +1,111 @@
+"""Tests for the metrics module."""
+import json
+from urllib.request import urlopen
+
+import pytest
+
+from grand_exchanger import metrics
+
+
+class TestHistogram:
+    """Test class for grand_exchanger.metrics.Histogram."""
+
+    def test_cumulative(self):
+        """Observations are counted in the first bucket that holds them."""
+        histogram = metrics.Histogram([0.1, 1])
+
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(5.65)
+
+
+class TestRegistry:
+    """Test class for grand_exchanger.metrics.Registry."""
+
+    def test_to_dict(self, registry):
+        """Series are summarised by name and labels."""
+        registry.inc("requests_total", endpoint="a", status="200")
+        registry.inc("requests_total", 2, status="200", endpoint="a")
+        registry.inc("requests_total", endpoint="b", status="503")
+        registry.observe("request_seconds", 0.2, [0.5], endpoint="a")
+
+        summary = registry.to_dict()
+
+        assert summary["counters"]["requests_total"] == [
+            {"labels": {"endpoint": "a", "status": "200"}, "value": 3},
+            {"labels": {"endpoint": "b", "status": "503"}, "value": 1},
+        ]
+        assert summary["histograms"]["request_seconds"] == [
+            {
+                "labels": {"endpoint": "a"},
+                "count": 1,
+                "sum": 0.2,
+                "buckets": {"0.5": 1, "+Inf": 1},
+            }
+        ]
+
+    def test_to_prometheus(self, registry):
+        """Series are exposed in the Prometheus text format."""
+        registry.inc("retries_total")
+        registry.inc("errors_total", endpoint='a"b', reason="503")
+        registry.inc("errors_total", endpoint="b", reason="503")
+        registry.observe("decode_seconds", 2, [1], resource="graph")
+        registry.observe("decode_seconds", 0.5, [1], resource="items")
+
+        assert registry.to_prometheus().splitlines() == [
+            "# TYPE ge_errors_total counter",
+            'ge_errors_total{endpoint="a\\"b",reason="503"} 1',
+            'ge_errors_total{endpoint="b",reason="503"} 1',
+            "# TYPE ge_retries_total counter",
+            "ge_retries_total 1",
+            "# TYPE ge_decode_seconds histogram",
+            'ge_decode_seconds_bucket{resource="graph",le="1"} 0',
+            'ge_decode_seconds_bucket{resource="graph",le="+Inf"} 1',
+            'ge_decode_seconds_count{resource="graph"} 1',
+            'ge_decode_seconds_sum{resource="graph"} 2.0',
+            'ge_decode_seconds_bucket{resource="items",le="1"} 1',
+            'ge_decode_seconds_bucket{resource="items",le="+Inf"} 1',
+            'ge_decode_seconds_count{resource="items"} 1',
+            'ge_decode_seconds_sum{resource="items"} 0.5',
+        ]
+
+    def test_time(self, registry, mocker):
+        """Seconds spent in a block are observed, even if it raises."""
+        mocker.patch("time.perf_counter", side_effect=[1.0, 1.25])
+
+        with pytest.raises(ValueError):
+            with registry.time("decode_seconds", resource="graph"):
+                raise ValueError()
+
+        histogram = registry.to_dict()["histograms"]["decode_seconds"][0]
+        assert histogram["sum"] == 0.25
+
+
+class TestExport:
+    """Test class for the metrics exports."""
+
+    def test_write_json(self, registry, tmp_path):
+        """The summary is written as JSON."""
+        registry.inc("retries_total")
+        path = tmp_path / "metrics.json"
+
+        metrics.write_json(str(path))
+
+        assert json.loads(path.read_text()) == registry.to_dict()
+
+    def test_serve(self, registry):
+        """The metrics are served over HTTP."""
+        registry.inc("retries_total")
+        server = metrics.serve(0)
+
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+
+            with urlopen(url) as response:  # noqa: S310
+                assert response.read().decode() == registry.to_prometheus()
+        finally:
+            server.shutdown()
+            server.server_close()
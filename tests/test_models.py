@@ -1,5 +1,6 @@
 """Tests for model classes."""
 from datetime import datetime
+import time
 
 import pytest
 
@@ -13,13 +14,10 @@ class TestItem:
     def mock_get_historical_prices(self, mocker):
         """Fixture for mocking requests.get."""
         mock = mocker.patch("grand_exchanger.resources.get_historical_prices")
-        mock.return_value.list_daily_prices.return_value = iter(
-            [
-                (datetime(2020, 7, 3), 113),
-                (datetime(2020, 7, 2), 111),
-                (datetime(2020, 7, 1), 108),
-            ]
+        mock.return_value.list_daily_points.return_value = iter(
+            [(1593734400, 113), (1593648000, 111), (1593561600, 108)]
         )
+        return mock
 
     @pytest.fixture
     def mock_get_item_details(self, mocker):
@@ -64,6 +62,16 @@ class TestItem:
         """
         )
 
+    @pytest.mark.parametrize(
+        "age,expected",
+        [(59, "0 min ago"), (7260, "2 hours ago"), (86400, "1 day ago")],
+    )
+    def test_to_str_age(self, age, expected):
+        """The age of catalogue prices is displayed."""
+        item = models.Item(1, "Thing", "Swords", False, 100, time.time() - age)
+
+        assert f"price: 100 ({expected})" in item.to_str()
+
     def test_get_historical_prices(self, mock_get_historical_prices):
         """Test retrieval of historical prices."""
         item = models.Item(1, "Thing", "Swords", False, 100)
@@ -74,13 +82,118 @@ class TestItem:
             (datetime(2020, 7, 1), 108),
         ]
 
-    def test_get(self, mock_get_item_details):
+    def test_get_price_points(self, mock_get_historical_prices):
+        """Price points and their time range are in epoch seconds."""
+        item = models.Item(1, "Thing", "Swords", False, 100)
+
+        assert list(item.get_price_points(1593561600, 1593648000))[-1] == (
+            1593561600,
+            108,
+        )
+        mock_get_historical_prices.assert_called_once_with(
+            1, start=1593561600000, end=1593648000000
+        )
+
+    @pytest.fixture
+    def mock_get_categories(self, mocker):
+        """Fixture for mocking grand_exchanger.resources.get_categories."""
+        mock = mocker.patch("grand_exchanger.resources.get_categories")
+        mock.return_value = iter([(1, "Ammo"), (2, "Swords")])
+
+    def test_get(self, mock_get_item_details, mock_get_categories):
         """Test retrieval of item data based on their ID."""
         item = models.Item.get(1)
 
         assert item.id == 1
         assert item.price == 100
 
+    def test_get_from_catalogue(self, mock_get_item_details, mock_get_categories):
+        """Items in the catalogue are resolved without a request."""
+        from grand_exchanger import resources, store
+
+        store.get_catalogue().upsert([store.CatalogueEntry(1, "Thing", 2, True, 90)])
+
+        item = models.Item.get(1)
+
+        assert item == models.Item(1, "Thing", "Swords", True, 90)
+        assert item.updated > time.time() - 60
+        resources.get_item_details.assert_not_called()
+
+        item = models.Item.get(1, live=True)
+
+        assert item.price == 100
+        assert item.updated is None
+        resources.get_item_details.assert_called_once_with(1, live=True)
+        assert store.get_catalogue().get(1).price == 100
+
+    def test_get_unknown_category(self, mock_get_item_details, mock_get_categories):
+        """Items of categories missing from the index are requested, not stored."""
+        from grand_exchanger import resources, store
+
+        store.get_catalogue().upsert([store.CatalogueEntry(1, "Thing", 9, True, 90)])
+        resources.get_item_details.return_value.item.type = "Shields"
+
+        assert models.Item.get(1) == models.Item(1, "Thing", "Shields", True, 100)
+        assert store.get_catalogue().get(1).price == 90
+
+    def test_get_missing(self, mocker):
+        """Unknown IDs are rejected without a request the second time."""
+        mock = mocker.patch("grand_exchanger.resources.get_item_details")
+        mock.side_effect = exceptions.NoSuchItemException
+
+        for _ in range(2):
+            with pytest.raises(exceptions.NoSuchItemException):
+                models.Item.get(1)
+
+        mock.assert_called_once()
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_get_many(self, mocker, mock_get_categories, ordered):
+        """Duplicate IDs are resolved once, unknown items as None."""
+        from grand_exchanger import store
+        from grand_exchanger.resources.common import Item, PriceTrend
+        from grand_exchanger.resources.details import ItemDetails
+
+        def get_item_details(item_id, live):
+            if item_id == 3:
+                raise exceptions.NoSuchItemException
+
+            return ItemDetails(
+                item=Item(
+                    id=item_id,
+                    name="Thing",
+                    description="",
+                    type="Swords",
+                    current=PriceTrend("positive", 100),
+                    today=PriceTrend("positive", 10),
+                    members=True,
+                )
+            )
+
+        mock = mocker.patch(
+            "grand_exchanger.resources.get_item_details", side_effect=get_item_details
+        )
+        store.get_catalogue().upsert(
+            [
+                store.CatalogueEntry(1, "Thing", 2, True, 90),
+                store.CatalogueEntry(4, "Thing", 9, True, 90),
+            ]
+        )
+
+        items = dict(models.Item.get_many([1, 2, 3, 2, 4], ordered=ordered))
+
+        assert items[1].price == 90
+        assert items[2].price == 100
+        assert items[3] is None
+        assert items[4].price == 100
+        assert sorted(c.args[0] for c in mock.call_args_list) == [2, 3, 4]
+
+        items = list(models.Item.get_many([3, 1], live=True))
+
+        assert items[0] == (3, None)
+        assert items[1][1].price == 100
+        assert mock.call_count == 4
+
 
 class TestCategory:
     """Test class for grand_exchanger.models.Category."""
@@ -178,6 +291,99 @@ class TestCategory:
             models.Item(4, "adamant spear", "Not Swords", False, 100),
         ]
 
+    def test_get_items_catalogued(
+        self, mock_resources_get_category_breakdown, mock_resources_get_items_page
+    ):
+        """Crawled items are added to the local catalogue."""
+        from grand_exchanger import store
+
+        list(models.Category(1, "Not Swords").get_items())
+
+        assert len(store.get_catalogue()) == 4
+        assert store.get_catalogue().get(3).category_id == 1
+
+    def test_get_items_pages(
+        self, mock_resources_get_category_breakdown, mock_resources_get_items_page
+    ):
+        """Only the requested pages are crawled."""
+        from grand_exchanger import resources
+
+        category = models.Category(1, "Not Swords")
+
+        assert [i.id for i in category.get_items([("#", 1), ("a", 2)])] == [1]
+        resources.get_category_breakdown.assert_not_called()
+
+    def test_get_pages(self, mocker):
+        """Pages are planned from the breakdown, without empty letters or pages."""
+        from grand_exchanger.resources.category import CategoryBreakdown, LetterCount
+
+        mocker.patch(
+            "grand_exchanger.resources.get_category_breakdown",
+            return_value=CategoryBreakdown(
+                [LetterCount("#", 0), LetterCount("a", 12), LetterCount("b", 25)]
+            ),
+        )
+
+        assert models.Category(1, "Swords").get_pages() == [
+            ("a", 1),
+            ("b", 1),
+            ("b", 2),
+            ("b", 3),
+        ]
+
+    def test_get_items_no_empty_page(
+        self, mock_resources_get_category_breakdown, mock_resources_get_items_page
+    ):
+        """No page past the item count of a letter is requested."""
+        from grand_exchanger import resources
+
+        list(models.Category(1, "Not Swords").get_items(concurrency=1))
+
+        assert [c.args[1:] for c in resources.get_items_page.call_args_list] == [
+            ("%23", 1),
+            ("a", 1),
+        ]
+
+    @pytest.fixture
+    def slow_pages(self, mocker):
+        """Fixture for pages that take longer the lower their number."""
+
+        def get_page(category, letter, number):
+            time.sleep(0.02 * (4 - number))
+            return [models.Item(number, "Thing", category.name, False, 1)]
+
+        return mocker.patch.object(models.Category, "get_page", get_page)
+
+    @pytest.mark.parametrize(
+        "ordered,expected", [(True, [1, 2, 3]), (False, [3, 2, 1])]
+    )
+    def test_get_items_concurrent(self, slow_pages, ordered, expected):
+        """Pages are requested at the same time and yielded in order if asked."""
+        category = models.Category(1, "Swords")
+        pages = [("a", 1), ("a", 2), ("a", 3)]
+
+        start = time.monotonic()
+        items = list(category.get_items(pages, concurrency=3, ordered=ordered))
+
+        assert [i.id for i in items] == expected
+        assert time.monotonic() - start < 0.1
+
+    def test_get_items_failure(self, mocker):
+        """Errors while requesting a page are raised to the consumer."""
+        mocker.patch.object(models.Category, "get_page", side_effect=ValueError)
+        items = models.Category(1, "Swords").get_items([("a", 1), ("a", 2)])
+
+        with pytest.raises(ValueError):
+            list(items)
+
+    def test_get_items_close_early(self, slow_pages):
+        """Pending page requests are cancelled when the consumer stops."""
+        pages = [("a", 3)] * 10
+        items = models.Category(1, "Swords").get_items(pages, concurrency=2)
+
+        assert next(items).id == 3
+        items.close()
+
     def test_total(self, mock_resources_get_category_breakdown):
         """Test category property total."""
         category = models.Category(1, "Not Swords")
@@ -242,16 +448,17 @@ class TestPriceMeasurement:
 
     def test_initialise(self, item, category):
         """Test correct field initalisation."""
-        measurement = models.PriceMeasurement(item, category, 100, datetime(2020, 1, 1))
+        measurement = models.PriceMeasurement(item, category, 100, 1577836800)
 
         assert measurement.item
         assert measurement.category
         assert measurement.price == 100
+        assert measurement.epoch == 1577836800
         assert measurement.dt == datetime(2020, 1, 1)
 
     def test_to_dict(self, item, category):
         """Test correct fields inclusion for InfluxDB."""
-        measurement = models.PriceMeasurement(item, category, 100, datetime(2020, 1, 1))
+        measurement = models.PriceMeasurement(item, category, 100, 1577836800)
 
         assert measurement.to_dict() == {
             "measurement": "price",
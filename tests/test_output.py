@@ -0,0 +1,389 @@
+"""Tests for the output package."""
+from datetime import datetime
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+import click
+import pytest
+
+from grand_exchanger import exceptions, models, output
+from grand_exchanger.timestamps import to_epoch
+
+
+@pytest.fixture
+def measurement():
+    """Fixture for a price measurement."""
+    return models.PriceMeasurement(
+        models.Item(2, "Sword", "Melee weapons - high level", True, 114),
+        models.Category(1, "Melee weapons - high level"),
+        100,
+        to_epoch(datetime(2020, 1, 1)),
+    )
+
+
+class TestJsonWriter:
+    """Test class for grand_exchanger.output.JsonWriter."""
+
+    def test_write(self, measurement):
+        """Measurements are written as newline delimited JSON."""
+        stream = io.StringIO()
+
+        with output.get_writer("json", stream) as writer:
+            writer.write(measurement)
+            writer.write(measurement)
+
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(i) for i in lines] == [measurement.to_dict()] * 2
+
+    def test_batches(self, measurement):
+        """Measurements are buffered until a batch is full."""
+        stream = io.StringIO()
+        writer = output.JsonWriter(stream, batch_size=2)
+
+        writer.write(measurement)
+        assert stream.getvalue() == ""
+
+        writer.write(measurement)
+        assert len(stream.getvalue().splitlines()) == 2
+
+    def test_reserve(self, measurement):
+        """Reserved measurements are written together."""
+        stream = io.StringIO()
+        writer = output.JsonWriter(stream, batch_size=3)
+
+        writer.write(measurement)
+        writer.reserve(2)
+        assert writer.pending == 1
+
+        writer.reserve(3)
+        assert writer.pending == 0
+        assert len(stream.getvalue().splitlines()) == 1
+
+    def test_emitted(self, measurement, registry):
+        """Written measurements are counted for the running command."""
+        root = click.Context(click.Group("ge"), info_name="ge")
+        fetch = click.Context(click.Group("fetch"), root, info_name="fetch")
+
+        with click.Context(click.Command("all"), fetch, info_name="all"):
+            writer = output.JsonWriter(io.StringIO())
+
+        writer.write(measurement)
+        writer.write(measurement)
+        writer.flush()
+        writer.flush()
+
+        counters = registry.to_dict()["counters"]["measurements_emitted_total"]
+        assert counters == [{"labels": {"command": "fetch all"}, "value": 2}]
+
+    def test_abstract(self):
+        """Writers without an encoding cannot be created."""
+        with pytest.raises(TypeError):
+            output.Writer(io.StringIO())
+
+
+class TestParquetWriter:
+    """Test class for grand_exchanger.output.ParquetWriter."""
+
+    @pytest.fixture
+    def measurements(self):
+        """Fixture for measurements over two days and two categories."""
+        pytest.importorskip("pyarrow")
+
+        return [
+            models.PriceMeasurement(
+                models.Item(i, "Sword", f"Category {i % 2}", bool(i % 3), 100),
+                models.Category(i % 2, f"Category {i % 2}"),
+                100 + i,
+                to_epoch(datetime(2020, 1, 1 + i // 4)),
+            )
+            for i in range(8)
+        ]
+
+    def test_write(self, measurements, tmp_path):
+        """Measurements are partitioned by date and category."""
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        with output.get_writer("parquet", destination=str(tmp_path)) as writer:
+            for m in measurements[:3]:
+                writer.write(m)
+
+            writer.flush()
+
+            for m in measurements[3:]:
+                writer.write(m)
+
+        dataset = ds.dataset(str(tmp_path), partitioning="hive")
+        day = ds.field("date") == "2020-01-02"
+        paths = sorted(f.path for f in dataset.get_fragments(filter=day))
+
+        assert [os.path.dirname(os.path.relpath(p, tmp_path)) for p in paths] == [
+            "date=2020-01-02/category_id=0",
+            "date=2020-01-02/category_id=1",
+        ]
+        items = dataset.to_table(filter=day)["item_id"].to_pylist()
+        assert sorted(items) == list(range(4, 8))
+        assert dataset.count_rows() == 8
+
+        metadata = pq.ParquetFile(paths[0]).metadata.row_group(0)
+        columns = {
+            metadata.column(i).path_in_schema: metadata.column(i)
+            for i in range(metadata.num_columns)
+        }
+        assert columns["category"].has_dictionary_page
+        assert not columns["item_id"].has_dictionary_page
+
+    def test_object_store(self, measurements):
+        """Full buffers are appended as row groups to one file per partition."""
+        import pyarrow.dataset as ds
+
+        writer = output.ParquetWriter("mock:///prices", batch_size=3)
+
+        for m in measurements:
+            writer.write(m)
+
+        assert writer.pending == 8
+        writer.close()
+        assert writer.pending == 0
+
+        dataset = ds.dataset(
+            writer.path, filesystem=writer.filesystem, partitioning="hive"
+        )
+        fragments = {
+            os.path.relpath(os.path.dirname(f.path), writer.path): f
+            for f in dataset.get_fragments()
+        }
+
+        assert dataset.count_rows() == 8
+        assert len(fragments) == len(dataset.files) == 4
+        assert fragments["date=2020-01-01/category_id=1"].num_row_groups == 2
+
+    def test_reserve(self, measurements):
+        """Buffers are appended to open files before measurements that do not fit."""
+        from pyarrow import fs
+
+        writer = output.ParquetWriter("mock:///prices", batch_size=4)
+        files = fs.FileSelector(writer.path, allow_not_found=True, recursive=True)
+        writer.write(measurements[0])
+        writer.reserve(3)
+
+        assert writer.filesystem.get_file_info(files) == []
+
+        writer.reserve(4)
+
+        assert writer.filesystem.get_file_info(files)
+        assert writer.pending == 1
+
+    def test_max_open_files(self, measurements):
+        """The least recently written file is closed to open another."""
+        import pyarrow.dataset as ds
+
+        writer = output.ParquetWriter("mock:///prices", batch_size=3, max_open_files=1)
+
+        for m in measurements:
+            writer.write(m)
+
+        assert writer.pending == 3
+        writer.close()
+
+        dataset = ds.dataset(writer.path, filesystem=writer.filesystem)
+        assert dataset.count_rows() == 8
+        assert len(dataset.files) == 6
+
+    def test_s3(self):
+        """S3 compatible endpoints are given as query parameters."""
+        pytest.importorskip("pyarrow")
+        writer = output.ParquetWriter(
+            "s3://bucket/prices?endpoint_override=localhost:9000&scheme=http"
+        )
+
+        assert writer.filesystem.type_name == "s3"
+        assert writer.path == "bucket/prices"
+
+    def test_without_pyarrow(self, mocker):
+        """A missing pyarrow is reported when the writer is created."""
+        mocker.patch.dict(sys.modules, {"pyarrow": None})
+
+        with pytest.raises(ImportError, match="requires pyarrow"):
+            output.ParquetWriter("prices")
+
+    def test_without_destination(self):
+        """Dataset formats require a destination."""
+        with pytest.raises(ValueError):
+            output.get_writer("parquet")
+
+
+class TestLineProtocolWriter:
+    """Test class for grand_exchanger.output.LineProtocolWriter."""
+
+    def test_write(self, measurement):
+        """Measurements are written as line protocol."""
+        stream = io.StringIO()
+
+        with output.get_writer("line-protocol", stream) as writer:
+            writer.write(measurement)
+
+        assert stream.getvalue() == (
+            r"price,category=Melee\ weapons\ -\ high\ level,item_id=2,members=true "
+            "value=100i 1577836800000000000\n"
+        )
+
+    def test_escape_tag(self):
+        """Commas, equal signs, spaces and backslashes are escaped in tags."""
+        from grand_exchanger.output.writers import escape_tag
+
+        assert escape_tag(r"a,b=c d\e") == r"a\,b\=c\ d\\e"
+
+
+class TestInfluxWriter:
+    """Test class for grand_exchanger.output.InfluxWriter."""
+
+    @pytest.fixture
+    def influx(self):
+        """Fixture for a local write endpoint that records the posted batches."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        state = {"batches": [], "responses": [], "delay": 0, "active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                    status = state["responses"].pop(0) if state["responses"] else 204
+
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(state["delay"])
+                state["batches"].append(
+                    (self.path, dict(self.headers), gzip.decompress(body).decode())
+                )
+                self.send_response(status)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+                with lock:
+                    state["active"] -= 1
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        state["url"] = f"http://127.0.0.1:{server.server_port}"
+        yield state
+        server.shutdown()
+        server.server_close()
+
+    def test_write(self, measurement, influx, monkeypatch, registry):
+        """Batches are posted gzipped with the token and nanosecond precision."""
+        monkeypatch.setenv("INFLUX_TOKEN", "secret")
+
+        with output.get_writer(
+            "influx", destination=influx["url"] + "/write?db=prices&precision=s"
+        ) as writer:
+            writer.write(measurement)
+            writer.write(measurement)
+
+        [(path, headers, body)] = influx["batches"]
+        assert path == "/write?db=prices&precision=n"
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Authorization"] == "Token secret"
+        assert body == output.writers.encode_line(measurement) * 2
+        assert (
+            registry.to_dict()["counters"]["measurements_emitted_total"][0]["value"]
+            == 2
+        )
+
+    def test_v2(self, measurement, influx):
+        """Batches for InfluxDB 2.x are sent with its precision."""
+        with output.InfluxWriter(
+            influx["url"] + "/api/v2/write?org=ge&bucket=prices"
+        ) as writer:
+            writer.write(measurement)
+
+        assert influx["batches"][0][0] == (
+            "/api/v2/write?org=ge&bucket=prices&precision=ns"
+        )
+        assert "Authorization" not in influx["batches"][0][1]
+
+    def test_batches(self, measurement, influx):
+        """Batches are posted when full or when their first measurement is due."""
+        writer = output.InfluxWriter(influx["url"] + "/write", batch_size=2)
+        writer.flush()
+
+        writer.write(measurement)
+        writer.reserve(1)
+        assert writer.pending == 1
+
+        writer.reserve(2)
+        writer.write(measurement)
+        writer.write(measurement)
+
+        writer.write(measurement)
+        writer.flush()
+        assert writer.pending == 0
+
+        writer.flush_interval = 0
+        writer.write(measurement)
+        writer.close()
+
+        assert sorted(b.count("\n") for _, _, b in influx["batches"]) == [1, 1, 1, 2]
+
+    def test_concurrency(self, measurement, influx):
+        """No more than the configured number of posts are in flight."""
+        influx["delay"] = 0.05
+        writer = output.InfluxWriter(
+            influx["url"] + "/write", batch_size=1, concurrency=3
+        )
+
+        start = time.monotonic()
+        for _ in range(9):
+            writer.write(measurement)
+            assert writer.pending <= 3
+        writer.close()
+
+        assert len(influx["batches"]) == 9
+        assert influx["peak"] == 3
+        assert time.monotonic() - start < 0.4
+
+    def test_retry(self, measurement, influx):
+        """Throttled and failed posts are retried."""
+        influx["responses"] = [429, 503]
+
+        with output.InfluxWriter(influx["url"] + "/write", backoff=0) as writer:
+            writer.write(measurement)
+
+        assert len(influx["batches"]) == 3
+
+    def test_refused(self, measurement, influx):
+        """Refused batches and exhausted retries fail the flush."""
+        influx["responses"] = [400, 500, 500]
+        writer = output.InfluxWriter(influx["url"] + "/write", retries=1, backoff=0)
+
+        writer.write(measurement)
+        with pytest.raises(exceptions.WriteFailedException):
+            writer.flush()
+
+        writer.write(measurement)
+        with pytest.raises(exceptions.WriteFailedException):
+            writer.close()
+
+    def test_unreachable(self, measurement):
+        """Connection errors are retried until the retries run out."""
+        writer = output.InfluxWriter("http://127.0.0.1:9/write", retries=1, backoff=0)
+
+        writer.write(measurement)
+        with pytest.raises(exceptions.WriteFailedException):
+            writer.close()
+
+    def test_invalid_url(self):
+        """Destinations other than write URLs are refused."""
+        with pytest.raises(ValueError):
+            output.InfluxWriter("http://localhost:8086/query")
@@ -0,0 +1,87 @@
+"""Tests for the crawl planner."""
+import pytest
+
+from grand_exchanger import models, planner
+from grand_exchanger.resources.category import CategoryBreakdown, LetterCount
+
+
+@pytest.fixture
+def categories():
+    """Fixture for categories with different numbers of items."""
+    return [models.Category(i, f"Category {i}") for i in range(1, 4)]
+
+
+@pytest.fixture
+def mock_get_category_breakdown(mocker):
+    """Fixture for mocking grand_exchanger.resources.get_category_breakdown."""
+    counts = {
+        1: [("#", 0), ("a", 30), ("b", 12)],
+        2: [("a", 5)],
+        3: [("c", 100), ("d", 1)],
+    }
+
+    return mocker.patch(
+        "grand_exchanger.resources.get_category_breakdown",
+        side_effect=lambda category_id: CategoryBreakdown(
+            [LetterCount(*i) for i in counts[category_id]]
+        ),
+    )
+
+
+class TestShard:
+    """Test class for grand_exchanger.planner.Shard."""
+
+    def test_parse(self):
+        """Shards are parsed from k/n."""
+        shard = planner.Shard.parse(" 2 / 3")
+
+        assert shard == planner.Shard(2, 3)
+        assert str(shard) == "2/3"
+
+    @pytest.mark.parametrize("value", ["0/3", "4/3", "1", "a/b", "1/0"])
+    def test_parse_invalid(self, value):
+        """Shards outside of 1/n to n/n cause an error."""
+        with pytest.raises(ValueError):
+            planner.Shard.parse(value)
+
+
+class TestPlanner:
+    """Test class for the planning functions."""
+
+    def test_plan_pages(self, categories, mock_get_category_breakdown):
+        """Pages follow from the item counts, skipping letters without items."""
+        pages = list(planner.plan_pages(categories[:2]))
+
+        assert [(p.category.id, p.letter, p.number, p.items) for p in pages] == [
+            (1, "a", 1, 12),
+            (1, "a", 2, 12),
+            (1, "a", 3, 6),
+            (1, "b", 1, 12),
+            (2, "a", 1, 5),
+        ]
+
+    @pytest.mark.parametrize("count", [1, 2, 3, 5])
+    def test_partition(self, categories, mock_get_category_breakdown, count):
+        """Parts are contiguous and differ by at most the cost of one page."""
+        pages = list(planner.plan_pages(categories))
+        parts = planner.partition(pages, count, planner.price_requests)
+        costs = [sum(map(planner.price_requests, part)) for part in parts]
+
+        assert [page for part in parts for page in part] == pages
+        assert max(costs) - min(costs) <= planner.PAGE_SIZE + 1
+        assert parts == planner.partition(pages, count, planner.price_requests)
+
+    def test_partition_empty(self):
+        """Crawls without pages are split into empty parts."""
+        assert planner.partition([], 2) == [[], []]
+
+    def test_plan_shard(self, categories, mock_get_category_breakdown):
+        """A shard crawls its own pages of the categories it covers."""
+        shard = planner.Shard(1, 2)
+        selected, pages = planner.plan_shard(categories, shard)
+        other, rest = planner.plan_shard(categories, planner.Shard(2, 2))
+
+        assert [c.id for c in selected] == [1, 2, 3]
+        assert [c.id for c in other] == [3]
+        assert pages[1] == [("a", 1), ("a", 2), ("a", 3), ("b", 1)]
+        assert len(pages[3]) + len(rest[3]) == 10
@@ -45,3 +45,327 @@ class TestPoll:
         result = runner.invoke(poll.cli, ["category", "9999"])
 
         assert result.exit_code == 1
+
+
+class TestPollWatch:
+    """Test class for the poll watch command."""
+
+    @pytest.fixture
+    def runner(self):
+        """Fixture for click runner."""
+        return click.testing.CliRunner()
+
+    @pytest.fixture
+    def mock_models(self, mocker):
+        """Fixture for mocking the category index and item pages."""
+        from grand_exchanger import models
+
+        mocker.patch.object(
+            models.Category, "get", lambda id: models.Category(id, "Ammo")
+        )
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        return mocker.patch.object(
+            models.Category,
+            "get_page",
+            side_effect=lambda *args: [models.Item(1, "Thing", "Ammo", False, 100)],
+        )
+
+    def test_watch(self, runner, mock_models, mocker):
+        """Every cycle polls the categories and outputs their measurements."""
+        sleep = mocker.patch("time.sleep")
+
+        result = runner.invoke(
+            poll.cli, ["watch", "--category", "1", "--cycles", "3", "-i", "60"]
+        )
+
+        assert result.exit_code == 0
+        assert len(result.output.splitlines()) == 3
+        assert mock_models.call_count == 3
+        assert sleep.call_count == 2
+
+    def test_watch_failure(self, runner, mock_models, mocker):
+        """A failed poll is reported and the next one still runs."""
+        from grand_exchanger import models
+
+        mocker.patch("time.sleep")
+        mock_models.side_effect = [
+            ValueError("bad page"),
+            [models.Item(1, "Thing", "Ammo", False, 100)],
+        ]
+
+        result = runner.invoke(
+            poll.cli, ["watch", "--category", "1", "--cycles", "2", "-i", "60"]
+        )
+
+        assert result.exit_code == 0
+        assert "Poll failed: ValueError('bad page')" in result.output
+        assert result.output.count('"item_id": 1') == 1
+
+
+class TestPollShard:
+    """Test class for polling shards of the catalogue."""
+
+    @pytest.fixture
+    def runner(self):
+        """Fixture for click runner."""
+        return click.testing.CliRunner()
+
+    @pytest.fixture
+    def mock_resources(self, mocker):
+        """Fixture for mocking the category index, breakdowns and item pages."""
+        from grand_exchanger.resources.category import CategoryBreakdown, LetterCount
+        from grand_exchanger.resources.common import Item, PriceTrend
+        from grand_exchanger.resources.items import Items
+
+        def get_items_page(category_id, letter, page):
+            return Items(
+                30,
+                [
+                    Item(
+                        category_id * 1000 + page * 100 + i,
+                        "Thing",
+                        "",
+                        "",
+                        PriceTrend("", 1),
+                        PriceTrend("", 1),
+                        False,
+                    )
+                    for i in range(min(12, 30 - (page - 1) * 12))
+                ],
+            )
+
+        mocker.patch(
+            "grand_exchanger.resources.get_categories",
+            return_value=iter([(1, "Ammo"), (2, "Arrows")]),
+        )
+        mocker.patch(
+            "grand_exchanger.resources.get_category_breakdown",
+            return_value=CategoryBreakdown([LetterCount("a", 30)]),
+        )
+        return mocker.patch(
+            "grand_exchanger.resources.get_items_page", side_effect=get_items_page
+        )
+
+    def test_plan(self, runner, mock_resources):
+        """The plan shows the requests of every shard without crawling."""
+        result = runner.invoke(poll.cli, ["all", "--shard", "1/2", "--plan"])
+
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            "shard 1/2: 3 pages, 30 items, 3 requests",
+            "shard 2/2: 3 pages, 30 items, 3 requests",
+        ]
+        mock_resources.assert_not_called()
+
+    def test_shards(self, runner, mock_resources):
+        """Shards output every item exactly once."""
+        ids = []
+
+        for shard in ["1/3", "2/3", "3/3"]:
+            result = runner.invoke(poll.cli, ["all", "--shard", shard])
+            assert result.exit_code == 0
+            ids += [
+                json.loads(i)["tags"]["item_id"] for i in result.output.splitlines()
+            ]
+
+        assert len(ids) == len(set(ids)) == 60
+        assert mock_resources.call_count == 6
+
+    def test_resume(self, runner, mock_resources):
+        """Interrupted crawls are resumed without outputting items again."""
+        get_items_page = mock_resources.side_effect
+
+        def interrupted(category_id, letter, page):
+            if category_id == 2:
+                raise ValueError("interrupted")
+
+            return get_items_page(category_id, letter, page)
+
+        mock_resources.side_effect = interrupted
+        runner = click.testing.CliRunner(mix_stderr=False)
+
+        first = runner.invoke(poll.cli, ["all"])
+        assert isinstance(first.exception, ValueError)
+
+        mock_resources.side_effect = get_items_page
+        second = runner.invoke(
+            poll.cli, ["all", "--resume", "--checkpoint-interval", "0"]
+        )
+        third = runner.invoke(poll.cli, ["all", "--resume"])
+
+        ids = [
+            json.loads(i)["tags"]["item_id"]
+            for i in first.output.splitlines() + second.output.splitlines()
+        ]
+        assert len(ids) == len(set(ids)) == 60
+        assert second.stderr == "Resuming after 30 items\n"
+        assert third.stderr == "Nothing to resume\n"
+
+    def test_resume_other_settings(self, runner, mock_resources):
+        """Interrupted crawls are not resumed with other output options."""
+        mock_resources.side_effect = ValueError("interrupted")
+        runner = click.testing.CliRunner(mix_stderr=False)
+        runner.invoke(poll.cli, ["all"])
+
+        result = runner.invoke(poll.cli, ["all", "--resume", "--changes-only"])
+
+        assert result.exit_code == 1
+        assert "other settings (changes_only)" in result.stderr
+
+    def test_parquet(self, runner, mock_resources, tmp_path):
+        """Dataset formats are written to the output destination."""
+        ds = pytest.importorskip("pyarrow.dataset")
+        path = str(tmp_path / "prices")
+        result = runner.invoke(poll.cli, ["all", "-f", "parquet", "-o", path])
+
+        assert result.exit_code == 0
+        assert ds.dataset(path, partitioning="hive").count_rows() == 60
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (["-f", "parquet"], "The parquet format requires --output"),
+            (["-o", "prices"], "The json format is written to stdout"),
+        ],
+    )
+    def test_invalid_output(self, runner, mock_resources, args, message):
+        """Destinations are required by dataset formats only."""
+        result = runner.invoke(poll.cli, ["all"] + args)
+
+        assert result.exit_code == 2
+        assert message in result.output
+        mock_resources.assert_not_called()
+
+    def test_invalid_shard(self, runner, mock_resources):
+        """Invalid shards are reported as usage errors."""
+        result = runner.invoke(poll.cli, ["all", "--shard", "3/2"])
+
+        assert result.exit_code == 2
+        assert "not a shard between 1/n and n/n" in result.output
+
+
+class TestPollChanges:
+    """Test class for polling only the items whose price moved."""
+
+    @pytest.fixture
+    def runner(self):
+        """Fixture for click runner."""
+        return click.testing.CliRunner()
+
+    @pytest.fixture
+    def prices(self, mocker):
+        """Fixture for items of a category with prices that can be changed."""
+        from grand_exchanger import models
+
+        prices = {1: 100, 2: 200, 3: 300}
+        mocker.patch.object(
+            models.Category, "get", lambda id: models.Category(id, "Ammo")
+        )
+        mocker.patch.object(models.Category, "get_pages", return_value=[("a", 1)])
+        mocker.patch.object(
+            models.Category,
+            "get_page",
+            lambda c, *args: (
+                [models.Item(i, "Thing", "Ammo", False, p) for i, p in prices.items()]
+            ),
+        )
+        return prices
+
+    def poll(self, runner, *args):
+        """Polls the category and returns the IDs of the output items."""
+        result = runner.invoke(poll.cli, ["category", "1", "--changes-only", *args])
+
+        assert result.exit_code == 0
+        return [json.loads(i)["tags"]["item_id"] for i in result.output.splitlines()]
+
+    def test_changes_only(self, runner, prices, registry):
+        """Items are output again once their price moved."""
+        assert self.poll(runner) == [1, 2, 3]
+        assert self.poll(runner) == []
+
+        prices[2] = 210
+        assert self.poll(runner) == [2]
+        assert len(runner.invoke(poll.cli, ["category", "1"]).output.splitlines()) == 3
+        assert registry.to_dict()["counters"]["measurements_unchanged_total"] == [
+            {"labels": {"command": "category"}, "value": 5}
+        ]
+
+    def test_keyframe(self, runner, prices, mocker):
+        """All items are output once the keyframe interval has passed."""
+        clock = mocker.patch("time.time", return_value=1000.0)
+        args = ["--keyframe-interval", "60"]
+
+        assert self.poll(runner, *args) == [1, 2, 3]
+
+        clock.return_value = 1030.0
+        prices[3] = 310
+        assert self.poll(runner, *args) == [3]
+
+        clock.return_value = 1060.0
+        assert self.poll(runner, *args) == [1, 2, 3]
+        assert self.poll(runner, *args) == []
+
+    def test_watch(self, runner, prices, mocker):
+        """Watchers only output the items whose price moved between polls."""
+        mocker.patch("time.sleep", side_effect=lambda _: prices.update({1: 101}))
+
+        result = runner.invoke(
+            poll.cli,
+            ["watch", "--category", "1", "--cycles", "3", "-i", "60", "--changes-only"],
+        )
+
+        ids = [json.loads(i)["tags"]["item_id"] for i in result.output.splitlines()]
+        assert ids == [1, 2, 3, 1]
+
+    def test_all(self, runner, prices, mocker):
+        """Polls of all items only output the items whose price moved."""
+        from grand_exchanger import models
+
+        mocker.patch.object(
+            models.Category,
+            "get_categories",
+            lambda: iter([models.Category(1, "Ammo")]),
+        )
+        first = runner.invoke(poll.cli, ["all", "--changes-only"])
+        prices[1] = 90
+        second = runner.invoke(poll.cli, ["all", "--changes-only"])
+
+        assert len(first.output.splitlines()) == 3
+        assert [json.loads(i)["fields"] for i in second.output.splitlines()] == [
+            {"value": 90}
+        ]
+
+
+class TestPollItems:
+    """Test class for polling many items."""
+
+    def test_item(self, mocker):
+        """Measurements of all valid IDs from stdin are output."""
+        from grand_exchanger import models
+
+        get_many = mocker.patch.object(
+            models.Item,
+            "get_many",
+            side_effect=lambda ids, **kwargs: iter(
+                (i, models.Item(i, "Thing", "Ammo", False, 100) if i else None)
+                for i in ids
+            ),
+        )
+        mocker.patch.object(
+            models.Category,
+            "get_category_for_item",
+            return_value=models.Category(1, "Ammo"),
+        )
+        runner = click.testing.CliRunner(mix_stderr=False)
+
+        result = runner.invoke(poll.cli, ["item"], input="1,0")
+
+        assert result.exit_code == 1
+        assert json.loads(result.stdout)["tags"]["item_id"] == 1
+        assert result.stderr == "Invalid item 0\n"
+        assert get_many.call_args[1]["live"] is True
+
+        result = runner.invoke(poll.cli, ["item", "1", "2"])
+
+        assert result.exit_code == 0
+        assert len(result.stdout.splitlines()) == 2
@@ -1,11 +1,38 @@
 """Tests for the resources package."""
 from datetime import datetime
+import importlib
+import io
+import json
+import os
+import threading
+import time
 
 import marshmallow
 import pytest
 import requests
 
 from grand_exchanger import exceptions, resources
+from grand_exchanger.resources import (
+    category,
+    details,
+    governor,
+    graph,
+    items,
+    transport,
+)
+from grand_exchanger.resources.cache import (
+    CachingAdapter,
+    Entry,
+    get_endpoint,
+    ResponseCache,
+)
+from grand_exchanger.resources.governor import Limiter, parse_retry_after, RetryBudget
+from grand_exchanger.resources.helpers import (
+    parse_bool,
+    parse_int,
+    parse_price,
+    retry_cases,
+)
 
 
 class TestGraph:
@@ -13,29 +40,41 @@ class TestGraph:
 
     @pytest.fixture
     def mock_requests_get(self, mocker):
-        """Fixture for mocking requests.get."""
-        mock = mocker.patch("requests.get")
-        mock.return_value.__enter__.return_value.json.return_value = {
-            "daily": {"1595808000000": 100, "1595721600000": 120, "1595635200000": 110},
-            "average": {
-                "1595808000000": 100,
-                "1595721600000": 110,
-                "1595635200000": 104,
-            },
-        }
+        """Fixture for mocking requests.Session.get."""
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.__enter__.return_value.content = json.dumps(
+            {
+                "daily": {
+                    "1595808000000": 100,
+                    "1595721600000": 120,
+                    "1595635200000": 110,
+                },
+                "average": {
+                    "1595808000000": 100,
+                    "1595721600000": 110,
+                    "1595635200000": 104,
+                },
+            }
+        ).encode()
 
     @pytest.fixture
     def mock_requests_get_invalid(self, mocker):
-        """Fixture for mocking requests.get."""
-        mock = mocker.patch("requests.get")
-        mock.return_value.__enter__.return_value.json.return_value = {
-            "daily": {"not_an_epoch": 100, "1595721600000": 120, "1595635200000": 110},
-            "average": {
-                "1595808000000": 100,
-                "1595721600000": 110,
-                "1595635200000": 104,
-            },
-        }
+        """Fixture for mocking requests.Session.get."""
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.__enter__.return_value.content = json.dumps(
+            {
+                "daily": {
+                    "not_an_epoch": 100,
+                    "1595721600000": 120,
+                    "1595635200000": 110,
+                },
+                "average": {
+                    "1595808000000": 100,
+                    "1595721600000": 110,
+                    "1595635200000": 104,
+                },
+            }
+        ).encode()
 
     def test_get_historical_prices(self, mock_requests_get):
         """Epoch timestamps and prices are correctly converted."""
@@ -79,6 +118,11 @@ class TestGraph:
             (datetime(2020, 7, 26, 0, 0), 120),
             (datetime(2020, 7, 25, 0, 0), 110),
         ]
+        assert list(price_history.list_daily_points(ascending=True)) == [
+            (1595635200, 110),
+            (1595721600, 120),
+            (1595808000, 100),
+        ]
 
     def test_list_average_prices(self):
         """Daily average prices are correctly returned."""
@@ -105,16 +149,18 @@ class TestCategoryBreakdown:
 
     @pytest.fixture
     def mock_requests_get(self, mocker):
-        """Fixture for mocking requests.get."""
-        mock = mocker.patch("requests.get")
-        mock.return_value.__enter__.return_value.json.return_value = {
-            "types": [],
-            "alpha": [
-                {"letter": "#", "items": 0},
-                {"letter": "a", "items": 4},
-                {"letter": "j", "items": 2},
-            ],
-        }
+        """Fixture for mocking requests.Session.get."""
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.__enter__.return_value.content = json.dumps(
+            {
+                "types": [],
+                "alpha": [
+                    {"letter": "#", "items": 0},
+                    {"letter": "a", "items": 4},
+                    {"letter": "j", "items": 2},
+                ],
+            }
+        ).encode()
 
     def test_initialise(self, mock_requests_get):
         """Correct initialisation of CategoryBreakdown dataclass."""
@@ -130,10 +176,30 @@ class TestCategoryBreakdown:
             ]
         )
 
+    def test_memoized(self, mock_requests_get, mocker):
+        """Breakdowns are requested once, until they are as old as the cache TTL."""
+        from grand_exchanger.resources import category
+
+        clock = mocker.patch("time.monotonic", return_value=100.0)
+
+        assert resources.get_category_breakdown(1) is resources.get_category_breakdown(
+            1
+        )
+        resources.get_category_breakdown(2)
+        assert requests.Session.get.call_count == 2
+
+        clock.return_value += category.MEMO_TTL + 1
+        resources.get_category_breakdown(1)
+        assert requests.Session.get.call_count == 3
+
+        resources.forget_category_breakdowns()
+        resources.get_category_breakdown(2)
+        assert requests.Session.get.call_count == 4
+
     def test_get_categories(self, mocker):
         """Categories are correctly extracted from HTML."""
-        mock = mocker.patch("requests_html.HTMLSession")
-        mock.return_value.get.return_value.html.find.return_value = iter(
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.html.find.return_value = iter(
             [
                 mocker.Mock(text="Ammo", attrs={"href": "catalogue?cat=1"}),
                 mocker.Mock(text="Food", attrs={"href": "catalogue?cat=2"}),
@@ -156,71 +222,75 @@ class TestItems:
 
     @pytest.fixture
     def mock_requests_get(self, mocker):
-        """Fixture for mocking requests.get."""
-        mock = mocker.patch("requests.get")
-        mock.return_value.__enter__.return_value.json.return_value = {
-            "total": 97,
-            "items": [
-                {
-                    "icon": "",
-                    "icon_large": "",
-                    "id": 1,
-                    "type": "Familiars",
-                    "typeIcon": "",
-                    "name": "Thing",
-                    "description": "A thing",
-                    "current": {"trend": "neutral", "price": 100},
-                    "today": {"trend": "neutral", "price": 110},
-                    "members": "true",
-                },
-                {
-                    "icon": "",
-                    "icon_large": "",
-                    "id": 2,
-                    "type": "Melee weapons - high level",
-                    "typeIcon": "",
-                    "name": "Sword",
-                    "description": "A sword",
-                    "current": {"trend": "neutral", "price": "11.3k"},
-                    "today": {"trend": "neutral", "price": "24.4m"},
-                    "members": "false",
-                },
-                {
-                    "icon": "",
-                    "icon_large": "",
-                    "id": 3,
-                    "type": "Melee weapons - high level",
-                    "typeIcon": "",
-                    "name": "Another Sword",
-                    "description": "Another sword",
-                    "current": {"trend": "neutral", "price": "1.8b"},
-                    "today": {"trend": "neutral", "price": "43,657"},
-                    "members": "false",
-                },
-            ],
-        }
+        """Fixture for mocking requests.Session.get."""
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.__enter__.return_value.content = json.dumps(
+            {
+                "total": 97,
+                "items": [
+                    {
+                        "icon": "",
+                        "icon_large": "",
+                        "id": 1,
+                        "type": "Familiars",
+                        "typeIcon": "",
+                        "name": "Thing",
+                        "description": "A thing",
+                        "current": {"trend": "neutral", "price": 100},
+                        "today": {"trend": "neutral", "price": 110},
+                        "members": "true",
+                    },
+                    {
+                        "icon": "",
+                        "icon_large": "",
+                        "id": 2,
+                        "type": "Melee weapons - high level",
+                        "typeIcon": "",
+                        "name": "Sword",
+                        "description": "A sword",
+                        "current": {"trend": "neutral", "price": "11.3k"},
+                        "today": {"trend": "neutral", "price": "24.4m"},
+                        "members": "false",
+                    },
+                    {
+                        "icon": "",
+                        "icon_large": "",
+                        "id": 3,
+                        "type": "Melee weapons - high level",
+                        "typeIcon": "",
+                        "name": "Another Sword",
+                        "description": "Another sword",
+                        "current": {"trend": "neutral", "price": "1.8b"},
+                        "today": {"trend": "neutral", "price": "43,657"},
+                        "members": "false",
+                    },
+                ],
+            }
+        ).encode()
 
     @pytest.fixture
     def mock_requests_get_invalid(self, mocker):
-        """Fixture for mocking requests.get."""
-        mock = mocker.patch("requests.get")
-        mock.return_value.__enter__.return_value.json.return_value = {
-            "total": 97,
-            "items": [
-                {
-                    "icon": "",
-                    "icon_large": "",
-                    "id": 1,
-                    "type": "Familiars",
-                    "typeIcon": "",
-                    "name": "Thing",
-                    "description": "A thing",
-                    "current": {"trend": "neutral", "price": "4.2t"},
-                    "today": {"trend": "neutral", "price": 110},
-                    "members": "true",
-                },
-            ],
-        }
+        """Fixture for mocking requests.Session.get."""
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.__enter__.return_value.content = json.dumps(
+            {
+                "total": 97,
+                "items": [
+                    {
+                        "icon": "",
+                        "icon_large": "",
+                        "id": 1,
+                        "type": "Familiars",
+                        "typeIcon": "",
+                        "name": "Thing",
+                        "description": "A thing",
+                        "current": {"trend": "neutral", "price": "4.2t"},
+                        "today": {"trend": "neutral", "price": 110},
+                        "members": "true",
+                    },
+                ],
+            }
+        ).encode()
 
     def test_get_items_page(self, mock_requests_get):
         """Correct instantiation of items from an items page."""
@@ -261,34 +331,36 @@ class TestItemDetails:
 
     @pytest.fixture
     def mock_requests_get(self, mocker):
-        """Fixture for mocking requests.get."""
-        mock = mocker.patch("requests.get")
-        mock.return_value.__enter__.return_value.json.return_value = {
-            "item": {
-                "icon": "",
-                "icon_large": "",
-                "id": 21787,
-                "type": "Miscellaneous",
-                "typeIcon": "",
-                "name": "Steadfast boots",
-                "description": "A pair of powerful-looking boots.",
-                "current": {"trend": "neutral", "price": "5.9m"},
-                "today": {"trend": "negative", "price": "- 138.2k"},
-                "members": "true",
-                "day30": {"trend": "positive", "change": "+0.0%"},
-                "day90": {"trend": "negative", "change": "-3.0%"},
-                "day180": {"trend": "negative", "change": "-4.0%"},
+        """Fixture for mocking requests.Session.get."""
+        mock = mocker.patch("requests.Session.get")
+        mock.return_value.__enter__.return_value.content = json.dumps(
+            {
+                "item": {
+                    "icon": "",
+                    "icon_large": "",
+                    "id": 21787,
+                    "type": "Miscellaneous",
+                    "typeIcon": "",
+                    "name": "Steadfast boots",
+                    "description": "A pair of powerful-looking boots.",
+                    "current": {"trend": "neutral", "price": "5.9m"},
+                    "today": {"trend": "negative", "price": "- 138.2k"},
+                    "members": "true",
+                    "day30": {"trend": "positive", "change": "+0.0%"},
+                    "day90": {"trend": "negative", "change": "-3.0%"},
+                    "day180": {"trend": "negative", "change": "-4.0%"},
+                }
             }
-        }
+        ).encode()
 
     @pytest.fixture
     def mock_requests_get_404(self, mocker):
-        """Fixture for mocking requests.get."""
+        """Fixture for mocking requests.Session.get."""
 
         def side_effect():
             raise requests.HTTPError
 
-        mock = mocker.patch("requests.get")
+        mock = mocker.patch("requests.Session.get")
         mock.return_value.__enter__.return_value.raise_for_status.side_effect = (
             side_effect
         )
@@ -305,7 +377,649 @@ class TestItemDetails:
         assert item.today.price == -138200
         assert item.members is True
 
+    def test_get_item_details_live(self, mocker):
+        """Live item details revalidate cached responses."""
+        mock = mocker.patch("grand_exchanger.resources.transport.get")
+        mock.return_value.__enter__.return_value.content = b"{}"
+
+        with pytest.raises(marshmallow.ValidationError):
+            resources.get_item_details(1, live=True)
+
+        assert mock.call_args[1] == {"headers": {"Cache-Control": "no-cache"}}
+
+    def test_get_item_details_throttled(self, mocker):
+        """Throttled requests are retried instead of reported as unknown items."""
+        response = requests.Response()
+        response.status_code = 429
+        mocker.patch("time.sleep")
+        mocker.patch(
+            "requests.Session.get"
+        ).return_value.__enter__.return_value = response
+        governor.reset(governor.RetryBudget(ratio=0, minimum=2))
+
+        try:
+            with pytest.raises(requests.HTTPError):
+                resources.get_item_details(1)
+        finally:
+            governor.reset()
+
     def test_get_item_details_invalid_id(self, mock_requests_get_404):
         """Retrieval of an unknown item causes an error."""
         with pytest.raises(exceptions.NoSuchItemException):
             resources.get_item_details(1)
+
+
+class TestTransport:
+    """Test class for grand_exchanger.resources.transport."""
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        """Fixture for restoring the default transport configuration."""
+        yield
+        transport.configure(
+            transport.POOL_SIZE, transport.CONNECT_TIMEOUT, transport.READ_TIMEOUT
+        )
+
+    def test_shared_session(self):
+        """The same pooled session is reused across calls."""
+        assert transport.get_session() is transport.get_session()
+        assert transport.get_html_session() is transport.get_html_session()
+
+    def test_configure_pool_size(self):
+        """Configured pool size is applied to mounted adapters."""
+        transport.configure(pool_size=4)
+        adapter = transport.get_session().get_adapter("https://services.runescape.com")
+
+        assert adapter._pool_maxsize == 4
+        assert adapter._pool_connections == 4
+
+    def test_configure_recreates_session(self):
+        """Reconfiguring the transport replaces the shared session."""
+        session = transport.get_session()
+        transport.configure(pool_size=2)
+
+        assert transport.get_session() is not session
+
+    def test_get_timeouts(self, mocker):
+        """Requests are sent with explicit connect and read timeouts."""
+        mock = mocker.patch("requests.Session.get")
+        transport.configure(connect_timeout=1.5, read_timeout=9)
+        transport.get("https://example.com")
+
+        mock.assert_called_once_with("https://example.com", timeout=(1.5, 9))
+
+    def test_set_origin(self, mocker):
+        """Requests for the itemdb services are sent to the configured origin."""
+        mock = mocker.patch("requests.Session.get")
+        transport.set_origin("http://localhost:8080/")
+
+        try:
+            transport.get("https://services.runescape.com/m=itemdb_rs/api/a.json?b=1")
+        finally:
+            transport.set_origin(None)
+
+        transport.get("https://services.runescape.com/m=itemdb_rs/api/a.json")
+
+        assert [c.args[0] for c in mock.call_args_list] == [
+            "http://localhost:8080/m=itemdb_rs/api/a.json?b=1",
+            "https://services.runescape.com/m=itemdb_rs/api/a.json",
+        ]
+
+    def test_set_cache(self, tmp_path):
+        """JSON resources are served through the configured response cache."""
+        cache = ResponseCache(str(tmp_path))
+        transport.set_cache(cache)
+
+        try:
+            assert transport.get_cache() is cache
+            adapter = transport.get_session().get_adapter("https://example.com")
+            assert adapter.cache is cache
+        finally:
+            transport.set_cache(None)
+
+        assert transport.get_cache() is None
+
+
+class TestResponseCache:
+    """Test class for grand_exchanger.resources.cache."""
+
+    URL = "https://services.runescape.com/m=itemdb_rs/api/graph/2.json"
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Fixture for a response cache."""
+        return ResponseCache(str(tmp_path / "http"))
+
+    @pytest.fixture
+    def adapter(self, cache):
+        """Fixture for a caching transport adapter."""
+        return CachingAdapter(cache)
+
+    @pytest.fixture
+    def mock_send(self, mocker):
+        """Fixture for mocking requests.adapters.HTTPAdapter.send."""
+
+        def response(status_code, content=b"", headers=None):
+            r = requests.Response()
+            r.status_code = status_code
+            r._content = content
+            r.raw = io.BytesIO(content)
+            r.headers.update(headers or {})
+            return r
+
+        mock = mocker.patch("requests.adapters.HTTPAdapter.send")
+        mock.response = response
+        return mock
+
+    def request(self, url=URL):
+        """Prepares a GET request."""
+        return requests.Request("GET", url).prepare()
+
+    def test_get_endpoint(self):
+        """Request URLs are mapped to cacheable endpoints."""
+        assert get_endpoint(self.URL) == "graph"
+        assert get_endpoint("https://a/api/catalogue/items.json?page=1") == "items"
+        assert get_endpoint("https://secure.runescape.com/catalogue") is None
+
+    def test_put_get(self, cache):
+        """Entries are stored compressed and read back."""
+        cache.put(Entry(self.URL, 1.0, b"a" * 1000, {"ETag": '"x"'}))
+        entry = cache.get(self.URL)
+
+        assert entry == Entry(self.URL, 1.0, b"a" * 1000, {"ETag": '"x"'})
+        assert entry.validators == {"If-None-Match": '"x"'}
+        assert cache.get(self.URL + "?other") is None
+
+    def test_evict(self, tmp_path):
+        """Least recently used entries are evicted to fit the disk budget."""
+        cache = ResponseCache(str(tmp_path / "http"))
+
+        for i in range(3):
+            cache.put(Entry(f"{self.URL}?{i}", 1.0, os.urandom(1000)))
+            os.utime(cache._path(f"{self.URL}?{i}"), (i, i))
+
+        cache.max_size = os.path.getsize(cache._path(f"{self.URL}?0")) * 3.5
+        cache.get(f"{self.URL}?0")
+        cache.put(Entry(f"{self.URL}?3", 1.0, os.urandom(1000)))
+
+        assert cache.get(f"{self.URL}?0") is not None
+        assert cache.get(f"{self.URL}?1") is None
+        assert cache.get(f"{self.URL}?3") is not None
+
+    def test_evict_fails(self, cache, mocker):
+        """Entries that cannot be removed are skipped."""
+        cache.put(Entry(self.URL, 1.0, b"a"))
+        mocker.patch("os.unlink", side_effect=OSError)
+
+        cache.max_size = 0
+        assert cache.evict() > 0
+        assert cache.get(self.URL) is not None
+
+    def test_disk_usage_skips_removed(self, cache, mocker):
+        """Entries removed by another process while scanning are skipped."""
+        removed = mocker.Mock()
+        removed.name = "0" * 40
+        removed.stat.side_effect = FileNotFoundError
+        mocker.patch("os.scandir").return_value.__enter__.return_value = [removed]
+
+        assert cache._disk_usage() == 0
+
+    def test_miss_then_hit(self, adapter, mock_send):
+        """Fresh responses are served from the cache."""
+        mock_send.return_value = mock_send.response(200, b"{}")
+
+        assert adapter.send(self.request()).content == b"{}"
+        response = adapter.send(self.request())
+
+        assert response.content == b"{}"
+        assert response.status_code == 200
+        mock_send.assert_called_once()
+
+    def test_no_cache(self, adapter, cache, mock_send):
+        """Fresh entries are revalidated when the request asks for no-cache."""
+        cache.put(Entry(self.URL, time.time(), b"{}", {"ETag": '"v1"'}))
+        mock_send.return_value = mock_send.response(200, b"[]", {"ETag": '"v2"'})
+        request = self.request()
+        request.headers["Cache-Control"] = "no-cache"
+
+        assert adapter.send(request).content == b"[]"
+        assert mock_send.call_args[0][0].headers["If-None-Match"] == '"v1"'
+        assert adapter.send(self.request()).content == b"[]"
+        mock_send.assert_called_once()
+
+    def test_uncacheable(self, adapter, mock_send):
+        """Requests for other endpoints are not cached."""
+        mock_send.return_value = mock_send.response(200, b"<html>")
+
+        adapter.send(self.request("https://secure.runescape.com/catalogue"))
+        adapter.send(self.request("https://secure.runescape.com/catalogue"))
+
+        assert mock_send.call_count == 2
+
+    def test_revalidate_not_modified(self, adapter, cache, mock_send):
+        """Stale entries are revalidated with conditional requests."""
+        headers = {"ETag": '"v1"', "Last-Modified": "Mon, 27 Jul 2020 00:00:00 GMT"}
+        cache.put(Entry(self.URL, 0.0, b"{}", headers))
+        mock_send.return_value = mock_send.response(304)
+
+        response = adapter.send(self.request())
+
+        assert response.content == b"{}"
+        request = mock_send.call_args[0][0]
+        assert request.headers["If-None-Match"] == '"v1"'
+        assert request.headers["If-Modified-Since"] == headers["Last-Modified"]
+        assert cache.get(self.URL).stored > 0
+
+    def test_revalidate_modified(self, adapter, cache, mock_send):
+        """Stale entries are replaced by modified responses."""
+        cache.put(Entry(self.URL, 0.0, b"{}", {"ETag": '"v1"'}))
+        mock_send.return_value = mock_send.response(200, b"[]", {"ETag": '"v2"'})
+
+        assert adapter.send(self.request()).content == b"[]"
+        assert cache.get(self.URL).headers == {"ETag": '"v2"'}
+
+    def test_stale_while_revalidate(self, adapter, cache, mock_send):
+        """Stale entries are served while revalidated in the background."""
+        revalidating = threading.Event()
+        mock_send.side_effect = lambda *args, **kwargs: revalidating.wait() and (
+            mock_send.response(200, b"[]")
+        )
+        cache.stale_while_revalidate = True
+        cache.put(Entry(self.URL, time.time() - cache.ttls["graph"] - 1, b"{}"))
+
+        assert adapter.send(self.request()).content == b"{}"
+        assert adapter.send(self.request()).content == b"{}"
+
+        revalidating.set()
+        adapter.wait()
+
+        mock_send.assert_called_once()
+        assert cache.get(self.URL).body == b"[]"
+        assert adapter._revalidations == {}
+
+    def test_stale_revalidate_fails(self, adapter, cache, mock_send):
+        """Stale entries are kept when the background revalidation fails."""
+        mock_send.side_effect = requests.ConnectionError
+        cache.stale_while_revalidate = True
+        cache.put(Entry(self.URL, time.time() - cache.ttls["graph"] - 1, b"{}"))
+
+        assert adapter.send(self.request()).content == b"{}"
+
+        adapter.wait()
+        assert cache.get(self.URL).body == b"{}"
+
+    def test_max_stale(self, adapter, cache, mock_send):
+        """Entries stale for longer than allowed are revalidated before use."""
+        mock_send.return_value = mock_send.response(304)
+        cache.stale_while_revalidate = True
+        cache.put(Entry(self.URL, 0.0, b"{}", {"Last-Modified": "yesterday"}))
+
+        assert adapter.send(self.request()).content == b"{}"
+        mock_send.assert_called_once()
+        assert mock_send.call_args[0][0].headers["If-Modified-Since"] == "yesterday"
+        assert adapter._revalidations == {}
+
+    def test_error_not_cached(self, adapter, cache, mock_send):
+        """Error responses are not cached."""
+        mock_send.return_value = mock_send.response(404)
+
+        assert adapter.send(self.request()).status_code == 404
+        assert cache.get(self.URL) is None
+
+
+class TestGovernor:
+    """Test class for grand_exchanger.resources.governor."""
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        """Fixture for giving every test a fresh governor."""
+        governor.reset()
+        yield
+        governor.reset()
+
+    @staticmethod
+    def response(status, headers=None):
+        """Returns a bare response with a status code and headers."""
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return response
+
+    def test_additive_increase(self):
+        """Successful requests raise the limit by one per round."""
+        limiter = Limiter(limit=4)
+
+        for _ in range(4):
+            limiter.release(limiter.acquire(), throttled=False)
+
+        assert 4.9 < limiter.limit < 5
+
+    def test_multiplicative_decrease(self):
+        """Throttled requests in flight together halve the limit once."""
+        limiter = Limiter(limit=8)
+        sequences = [limiter.acquire() for _ in range(4)]
+
+        for sequence in sequences:
+            limiter.release(sequence, throttled=True)
+
+        assert limiter.limit == 4
+        limiter.release(limiter.acquire(), throttled=True)
+        assert limiter.limit == 2
+
+    def test_acquire_waits_for_slot(self):
+        """No more requests than the limit are in flight."""
+        limiter = Limiter(limit=1)
+        sequence = limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(
+            target=lambda: limiter.acquire() and acquired.set(), daemon=True
+        )
+        thread.start()
+
+        assert not acquired.wait(0.05)
+        limiter.release(sequence, throttled=False)
+        assert acquired.wait(1)
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("2", 2.0),
+            ("-1", 0.0),
+            ("3600", 300.0),
+            ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+            ("soon", None),
+            (None, None),
+        ],
+    )
+    def test_parse_retry_after(self, value, expected):
+        """Retry-After is parsed as seconds or date and capped."""
+        assert parse_retry_after(value) == expected
+
+    def test_acquire_waits_while_blocked(self):
+        """No requests are sent until a Retry-After delay has passed."""
+        limiter = Limiter()
+        limiter.block(0.05)
+        started = time.monotonic()
+
+        limiter.acquire()
+
+        assert time.monotonic() - started >= 0.05
+
+    def test_throttled_without_retry_after(self):
+        """Throttled responses without Retry-After only lower the limit."""
+        limiter = Limiter()
+        slot = governor.Slot(limiter, limiter.acquire())
+
+        slot.observe(self.response(503))
+        limiter.release(slot.sequence, slot.throttled)
+
+        assert limiter.blocked_until == 0
+        assert limiter.limit == governor.INITIAL_LIMIT / 2
+
+    def test_send_arguments(self, mocker):
+        """Send arguments are passed on to the HTTP adapter."""
+        send = mocker.patch(
+            "requests.adapters.HTTPAdapter.send", return_value=self.response(200)
+        )
+        request = requests.Request("GET", "https://example.com").prepare()
+
+        governor.GovernedAdapter().send(request, timeout=(1, 2), verify=False)
+
+        send.assert_called_once_with(request, False, (1, 2), False, None, None)
+
+    def test_send_metrics(self, mocker, registry):
+        """Requests are counted and timed by endpoint and status."""
+        ok, unavailable = self.response(200), self.response(503)
+        ok._content = b"abc"
+        mocker.patch(
+            "requests.adapters.HTTPAdapter.send",
+            side_effect=[ok, unavailable, requests.ConnectionError()],
+        )
+        adapter = governor.GovernedAdapter()
+
+        for item_id in (1, 2, 3):
+            url = f"https://example.com/api/graph/{item_id}.json"
+
+            try:
+                adapter.send(requests.Request("GET", url).prepare())
+            except requests.ConnectionError:
+                pass
+
+        summary = registry.to_dict()
+        endpoint = "example.com/api/graph/"
+        assert summary["counters"]["requests_total"] == [
+            {"labels": {"endpoint": endpoint, "status": "200"}, "value": 1},
+            {"labels": {"endpoint": endpoint, "status": "503"}, "value": 1},
+        ]
+        assert summary["counters"]["errors_total"] == [
+            {"labels": {"endpoint": endpoint, "reason": "503"}, "value": 1},
+            {"labels": {"endpoint": endpoint, "reason": "ConnectionError"}, "value": 1},
+        ]
+        assert summary["counters"]["response_bytes_total"] == [
+            {"labels": {"endpoint": endpoint}, "value": 3}
+        ]
+        assert summary["histograms"]["request_seconds"][0]["count"] == 3
+
+    def test_retry_after_blocks(self, mocker):
+        """A 429 response with Retry-After holds back the endpoint."""
+        mocker.patch(
+            "requests.adapters.HTTPAdapter.send",
+            return_value=self.response(429, {"Retry-After": "5"}),
+        )
+        transport.close()
+
+        try:
+            url = "https://services.runescape.com/m=itemdb_rs/api/graph/1.json"
+            assert transport.get(url).status_code == 429
+        finally:
+            transport.close()
+
+        limiter = governor.get_governor().get_limiter(url.replace("1.json", "2.json"))
+
+        assert limiter.blocked_until > time.monotonic() + 4
+        assert limiter.limit == governor.INITIAL_LIMIT / 2
+
+    def test_retry_budget(self):
+        """Retries are refused once the budget is spent."""
+        budget = RetryBudget(ratio=0.5, minimum=1)
+
+        for _ in range(4):
+            budget.deposit()
+
+        assert [budget.withdraw() for _ in range(4)] == [True, True, True, False]
+
+    @pytest.mark.parametrize(
+        "status,expected", [(429, True), (503, True), (404, False)]
+    )
+    def test_retry_cases(self, status, expected):
+        """Throttling and server errors are retried, client errors are not."""
+        error = requests.HTTPError(response=self.response(status))
+
+        assert retry_cases(error) is expected
+
+    def test_retry_cases_budget(self, registry):
+        """Transient errors are not retried once the budget is spent."""
+        governor.reset(governor.RetryBudget(ratio=0, minimum=1))
+
+        assert retry_cases(requests.ConnectionError())
+        assert not retry_cases(requests.ConnectionError())
+
+        counters = registry.to_dict()["counters"]
+        assert counters["retries_total"] == [
+            {"labels": {"reason": "ConnectionError"}, "value": 1}
+        ]
+        assert counters["retries_denied_total"] == [{"labels": {}, "value": 1}]
+
+
+class TestDecode:
+    """Test class for the fast payload decoders."""
+
+    EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+    def example(self, name):
+        """Reads an example payload."""
+        with open(os.path.join(self.EXAMPLES, name), "rb") as f:
+            return f.read()
+
+    @pytest.mark.parametrize(
+        "module,name",
+        [
+            ("graph", "graph.json"),
+            ("items", "items.json"),
+            ("details", "item_details.json"),
+        ],
+    )
+    def test_same_as_schema(self, module, name):
+        """Decoders give the same results as the marshmallow schemas."""
+        resource = importlib.import_module(f"grand_exchanger.resources.{module}")
+        content = self.example(name)
+        expected = resource.schema.load(json.loads(content))
+
+        if module == "graph":
+            expected = resource.Graph(expected.daily, expected.average)
+
+        assert resource.decode(content) == expected
+
+    def test_breakdown_same_as_schema(self):
+        """The breakdown decoder gives the same results as its schema."""
+        content = json.dumps(
+            {
+                "types": [],
+                "alpha": [{"letter": "#", "items": 0}, {"letter": "a", "items": "4"}],
+            }
+        ).encode()
+
+        assert category.decode(content) == category.schema.load(json.loads(content))
+
+    def test_graph_not_strict(self):
+        """Invalid points are dropped when not strict."""
+        content = b'{"daily": {"x": 1, "1595808000000": "1.5k"}, "average": {}}'
+
+        assert graph.decode(content, strict=False).daily == {
+            datetime(2020, 7, 27): 1500
+        }
+        with pytest.raises(marshmallow.ValidationError):
+            graph.decode(content)
+
+    def test_graph_range(self):
+        """Points outside of the time range are dropped before parsing prices."""
+        content = json.dumps(
+            {
+                "daily": {
+                    "1595721600000": "bad",
+                    "1595808000000": 2,
+                    "1595894400000": 3,
+                },
+                "average": {"1595808000000": 2, "1595894400000": "bad"},
+            }
+        ).encode()
+
+        result = graph.decode(content, start=1595808000000, end=1595894400000)
+
+        assert list(result.list_daily_prices()) == [(datetime(2020, 7, 27), 2)]
+        assert result.average == {datetime(2020, 7, 27): 2}
+
+    def test_graph_slice(self):
+        """Slicing a graph keeps the points in the half-open range."""
+        days = {datetime(2020, 7, d): d for d in range(1, 6)}
+        result = graph.Graph(days, days).slice(1593648000000, 1593820800000)
+
+        assert result == graph.Graph(
+            {datetime(2020, 7, 2): 2, datetime(2020, 7, 3): 3},
+            {datetime(2020, 7, 2): 2, datetime(2020, 7, 3): 3},
+        )
+        assert list(result.list_daily_prices(ascending=True))[0] == (
+            datetime(2020, 7, 2),
+            2,
+        )
+
+    def test_missing_field(self):
+        """Missing fields cause an error."""
+        with pytest.raises(marshmallow.ValidationError):
+            items.decode(b'{"total": 1}')
+
+    def test_graph_defaults(self):
+        """Graphs without points compare by value and not with other types."""
+        empty = graph.Graph(None, {})
+
+        assert empty == graph.Graph(graph.Series(), graph.Series())
+        assert empty != graph.Graph({datetime(2020, 7, 1): 1}, None)
+        assert empty != {}
+        assert graph.Series() != []
+        assert repr(empty) == "Graph(daily=Series(0 points), average=Series(0 points))"
+
+    @pytest.mark.parametrize(
+        "content",
+        [b'{"daily": [], "average": {}}', b'{"daily": {}}', b"[]"],
+    )
+    def test_graph_invalid(self, content):
+        """Graphs with missing or mistyped series cause an error."""
+        with pytest.raises(marshmallow.ValidationError):
+            graph.decode(content)
+
+    @pytest.mark.parametrize(
+        "module,content",
+        [
+            ("category", b'{"alpha": [{"letter": "a"}]}'),
+            ("details", b"[]"),
+            ("details", b'{"item": {"id": 1}}'),
+            ("items", b'{"total": 1, "items": {}}'),
+        ],
+    )
+    def test_invalid_payload(self, module, content):
+        """Payloads with missing or mistyped fields cause an error."""
+        resource = importlib.import_module(f"grand_exchanger.resources.{module}")
+
+        with pytest.raises(marshmallow.ValidationError):
+            resource.decode(content)
+
+    @pytest.mark.parametrize(
+        "field,value",
+        [("current", {"price": 1}), ("today", None), ("name", 5), ("type", [])],
+    )
+    def test_invalid_item(self, field, value):
+        """Items with missing or mistyped fields cause an error when strict."""
+        data = json.loads(self.example("item_details.json"))
+        data["item"][field] = value
+        content = json.dumps(data).encode()
+
+        with pytest.raises(marshmallow.ValidationError):
+            details.decode(content)
+
+    def test_not_strict(self):
+        """Field types other than numbers are not validated when not strict."""
+        data = json.loads(self.example("item_details.json"))
+        data["item"]["name"] = 5
+        data["item"]["current"]["trend"] = None
+
+        item = details.decode(json.dumps(data).encode(), strict=False).item
+
+        assert item.name == 5
+        assert item.current.trend is None
+        assert item.current.price == 5900000
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [(5, 5), ("1,234", 1234), ("+1.2m", 1200000), ("- 138.2k", -138200)],
+    )
+    def test_parse_price(self, value, expected):
+        """Runescape formatted prices are converted to integers."""
+        assert parse_price(value) == expected
+
+    @pytest.mark.parametrize("value", ["4.2t", None, "k"])
+    def test_parse_price_invalid(self, value):
+        """Invalid prices cause an error."""
+        with pytest.raises(marshmallow.ValidationError):
+            parse_price(value)
+
+    @pytest.mark.parametrize("value", [True, "x", None, [1]])
+    def test_parse_int_invalid(self, value):
+        """Invalid integers cause an error."""
+        with pytest.raises(marshmallow.ValidationError):
+            parse_int(value)
+
+    @pytest.mark.parametrize("value", ["maybe", None, [1]])
+    def test_parse_bool_invalid(self, value):
+        """Invalid booleans cause an error."""
+        with pytest.raises(marshmallow.ValidationError):
+            parse_bool(value)
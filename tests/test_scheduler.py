@@ -0,0 +1,66 @@
+"""Tests for the scheduler."""
+import pytest
+
+from grand_exchanger import scheduler
+
+
+class FakeClock:
+    """A clock that only moves when slept on or told to."""
+
+    def __init__(self):
+        """Starts the clock at zero."""
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        """Returns the current time."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Moves the clock forward."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestScheduler:
+    """Test class for grand_exchanger.scheduler.Scheduler."""
+
+    @pytest.fixture
+    def clock(self):
+        """Fixture for a fake clock."""
+        return FakeClock()
+
+    def run(self, clock, durations):
+        """Runs ticks that take the given durations, returning the ticks."""
+        ticks = []
+        schedule = scheduler.Scheduler(10, clock, clock.sleep)
+
+        for tick in schedule.ticks(len(durations)):
+            ticks.append((clock.now, tick))
+            clock.now += durations[tick.number]
+
+        return ticks
+
+    def test_fixed_cadence(self, clock):
+        """Runs start on slot boundaries regardless of how long they take."""
+        ticks = self.run(clock, [1, 3.5, 9.9, 0])
+
+        assert [t for t, _ in ticks] == [0, 10, 20, 30]
+        assert clock.sleeps == pytest.approx([9, 6.5, 0.1])
+
+    def test_overrun(self, clock):
+        """Overrunning runs skip the slots they ran into."""
+        ticks = self.run(clock, [25, 1, 0])
+
+        assert [t for t, _ in ticks] == [0, 30, 40]
+        assert [(tick.slot, tick.skipped) for _, tick in ticks] == [
+            (0, 0),
+            (3, 2),
+            (4, 0),
+        ]
+
+    def test_forever(self, clock):
+        """Without cycles the ticks do not end."""
+        ticks = scheduler.Scheduler(10, clock, clock.sleep).ticks()
+
+        assert [next(ticks).number for _ in range(100)] == list(range(100))
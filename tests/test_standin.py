@@ -0,0 +1,250 @@
+"""Tests for the stand-in for the itemdb services."""
+import json
+import os
+import random
+import threading
+
+import click.testing
+import pytest
+import requests
+
+from grand_exchanger import console, standin
+from grand_exchanger.cli import serve
+from grand_exchanger.resources import category, details, governor, graph, items
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def example(name):
+    """Reads an example payload."""
+    with open(os.path.join(EXAMPLES, name)) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def catalogue():
+    """Fixture for a small synthetic catalogue."""
+    return standin.Catalogue(items=300, categories=3, days=60, seed=1)
+
+
+@pytest.fixture
+def server(catalogue):
+    """Fixture for a running stand-in without faults."""
+    server = standin.StandIn(catalogue)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestCatalogue:
+    """Test class for grand_exchanger.standin.Catalogue."""
+
+    @pytest.mark.parametrize(
+        "price,expected",
+        [
+            (5, 5),
+            (1234, "1,234"),
+            (12345, "12.3k"),
+            (2345678, "2.3m"),
+            (3 * 10**9, "3.0b"),
+        ],
+    )
+    def test_format_price(self, price, expected):
+        """Prices are abbreviated like the itemdb services do."""
+        assert standin.format_price(price) == expected
+
+    def test_deterministic(self, catalogue):
+        """The same seed gives the same catalogue and price histories."""
+        other = standin.Catalogue(items=300, categories=3, days=60, seed=1)
+
+        assert other.items == catalogue.items
+        assert other.graph(7) == catalogue.graph(7)
+        assert standin.Catalogue(items=300, seed=2).items != catalogue.items
+
+    def test_shapes(self, catalogue):
+        """Payloads have the keys of the examples and decode as such."""
+        listed = example("items.json")["items"][0]
+        detail = example("item_details.json")["item"]
+        letter, count = next(
+            (c["letter"], c["items"])
+            for c in catalogue.breakdown(2)["alpha"]
+            if c["items"]
+        )
+        page = catalogue.page(2, letter, 1)
+
+        assert page["items"][0].keys() == listed.keys()
+        assert catalogue.detail(5)["item"].keys() == detail.keys()
+        assert items.decode(json.dumps(page).encode()).total == count
+        assert details.decode(json.dumps(catalogue.detail(5)).encode()).item.id == 5
+        assert len(graph.decode(json.dumps(catalogue.graph(5)).encode()).daily) == 60
+        assert category.decode(json.dumps(catalogue.breakdown(0)).encode())
+
+    def test_pages(self, catalogue):
+        """Items are listed once, by category and letter, twelve to a page."""
+        listed = []
+
+        for category_id in catalogue.names:
+            for c in catalogue.breakdown(category_id)["alpha"]:
+                pages = -(-c["items"] // standin.PAGE_SIZE)
+
+                for number in range(1, pages + 1):
+                    entries = catalogue.page(category_id, c["letter"], number)["items"]
+                    assert {standin.get_letter(i["name"]) for i in entries} == {
+                        c["letter"]
+                    }
+                    listed += [i["id"] for i in entries]
+
+                assert (
+                    catalogue.page(category_id, c["letter"], pages + 1)["items"] == []
+                )
+
+        assert sorted(listed) == sorted(catalogue.items)
+
+    def test_unknown(self, catalogue):
+        """Unknown categories and items have no payloads."""
+        assert catalogue.breakdown(99) is None
+        assert catalogue.detail(9999) is None
+        assert catalogue.graph(9999) is None
+
+    def test_graph_ends_at_price(self, catalogue):
+        """Price histories end at the current price, averaged over 30 days."""
+        item = catalogue.items[3]
+        payload = catalogue.graph(3)
+        daily = list(payload["daily"].values())
+
+        assert daily[-1] == item.price
+        assert list(payload["average"].values())[-1] == round(sum(daily[-30:]) / 30)
+
+
+class TestFaults:
+    """Test class for grand_exchanger.standin.Faults."""
+
+    @pytest.mark.parametrize(
+        "latency,low,high",
+        [
+            (standin.Latency("fixed", 0.5), 0.5, 0.5),
+            (standin.Latency("uniform", 0.5, 0.1), 0.4, 0.6),
+            (standin.Latency("exponential", 0.5), 0, 10),
+            (standin.Latency("lognormal", 0.5, 0.1), 0.2, 1.2),
+            (standin.Latency("lognormal", 0), 0, 0),
+        ],
+    )
+    def test_latency(self, latency, low, high):
+        """Delays are drawn from the distribution."""
+        rng = random.Random(0)
+
+        assert all(low <= latency.sample(rng) <= high for _ in range(100))
+
+    def test_unknown_distribution(self):
+        """Unknown distributions are refused."""
+        with pytest.raises(ValueError):
+            standin.Latency("pareto", 1).sample(random.Random(0))
+
+    def test_rates(self):
+        """Faults are injected at the configured rates."""
+        faults = standin.Faults(error_rate=0.2, throttle_rate=0.1, retry_after=3)
+        statuses = [faults.draw(f"/a?{i}")[1:] for i in range(2000)]
+
+        assert 300 < sum(s in standin.ERROR_STATUSES for s, _ in statuses) < 500
+        assert 140 < statuses.count((429, 3)) < 260
+
+    def test_deterministic(self):
+        """Faults depend on the path and attempt, not on the order of requests."""
+        paths = [f"/a?{i % 50}" for i in range(200)]
+        first = standin.Faults(error_rate=0.5, seed=3)
+        second = standin.Faults(error_rate=0.5, seed=3)
+
+        drawn = [first.draw(p) for p in paths]
+        redrawn = [second.draw(p) for p in reversed(paths)]
+
+        assert sorted(map(repr, drawn)) == sorted(map(repr, redrawn))
+        assert drawn != [standin.Faults(error_rate=0.5).draw(p) for p in paths]
+
+    def test_rate_limit(self, mocker):
+        """Requests beyond the rate limit are throttled until tokens refill."""
+        clock = mocker.patch("time.monotonic", return_value=100.0)
+        faults = standin.Faults(rate_limit=2)
+
+        assert [faults.draw("/a")[1] for _ in range(3)] == [None, None, 429]
+        assert faults.draw("/a")[2] == 1
+
+        clock.return_value = 100.5
+        assert faults.draw("/a")[1] is None
+        assert faults.draw("/a")[1] == 429
+
+
+class TestStandIn:
+    """Test class for grand_exchanger.standin.StandIn."""
+
+    def test_endpoints(self, server):
+        """The itemdb endpoints are served, unknown resources are not found."""
+        prefix = server.origin + standin.PREFIX
+        urls = {
+            "/catalogue": 200,
+            "/api/catalogue/category.json?category=1": 200,
+            "/api/catalogue/items.json?category=1&alpha=%23&page=1": 200,
+            "/api/catalogue/detail.json?item=4": 200,
+            "/api/graph/4.json": 200,
+            "/api/graph/9999.json": 404,
+            "/api/catalogue/detail.json?item=x": 400,
+            "/nope": 404,
+        }
+
+        with requests.Session() as session:
+            for path, status in urls.items():
+                assert session.get(prefix + path).status_code == status
+
+            stats = session.get(server.origin + "/stats").json()
+
+        assert stats == {"requests": 8, "statuses": {"200": 5, "400": 1, "404": 2}}
+
+    def test_faults(self, catalogue):
+        """Injected faults are sent with their status and Retry-After."""
+        faults = standin.Faults(
+            standin.Latency(mean=0.01), throttle_rate=1, retry_after=7
+        )
+        server = standin.StandIn(catalogue, faults)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        try:
+            response = requests.get(server.origin + "/m=itemdb_rs/api/graph/1.json")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+
+    def test_crawl(self, server, tmp_path):
+        """Commands crawl the stand-in through --api-url."""
+        runner = click.testing.CliRunner()
+        governor.reset()
+
+        result = runner.invoke(
+            console.cli,
+            ["--no-cache", "--api-url", server.origin, "poll", "category", "1"],
+        )
+
+        assert result.exit_code == 0
+        assert len(result.output.splitlines()) == 100
+
+
+class TestServe:
+    """Test class for the serve command."""
+
+    def test_serve(self, mocker):
+        """The origin is printed before serving until interrupted."""
+        serve_forever = mocker.patch.object(
+            standin.StandIn, "serve_forever", side_effect=KeyboardInterrupt
+        )
+        runner = click.testing.CliRunner(mix_stderr=False)
+
+        result = runner.invoke(
+            serve.cli, ["--port", "0", "--items", "10", "--error-rate", "0.5"]
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout.startswith("http://127.0.0.1:")
+        assert "Serving 10 items in 40 categories" in result.stderr
+        serve_forever.assert_called_once()
@@ -0,0 +1,402 @@
+"""Tests for the store package."""
+from datetime import datetime
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from grand_exchanger import exceptions, store
+from grand_exchanger.timestamps import to_epoch
+
+
+class TestCategoryIndex:
+    """Test class for grand_exchanger.store.CategoryIndex."""
+
+    @pytest.fixture
+    def mock_get_categories(self, mocker):
+        """Fixture for mocking grand_exchanger.resources.get_categories."""
+        mock = mocker.patch("grand_exchanger.resources.get_categories")
+        mock.side_effect = lambda: iter([(1, "Ammo"), (2, "Swords"), (3, "Shields")])
+        return mock
+
+    def test_lookups(self, mock_get_categories):
+        """Categories are found by ID and by name."""
+        index = store.CategoryIndex()
+
+        assert index.get_name(2) == "Swords"
+        assert index.get_id("Shields") == 3
+        assert index.get_name(4) is None
+        assert index.get_id("Schwartz") is None
+        assert index.categories() == [(1, "Ammo"), (2, "Swords"), (3, "Shields")]
+
+        mock_get_categories.assert_called_once()
+
+    def test_persisted(self, mock_get_categories):
+        """A persisted index is loaded without scraping the catalogue."""
+        store.CategoryIndex().refresh()
+        index = store.CategoryIndex()
+
+        assert index.get_name(1) == "Ammo"
+        mock_get_categories.assert_called_once()
+
+    def test_corrupt(self, mock_get_categories):
+        """A corrupt index file is rebuilt."""
+        index = store.CategoryIndex()
+
+        with open(index.path, "w") as f:
+            f.write("{")
+
+        assert index.get_name(1) == "Ammo"
+        mock_get_categories.assert_called_once()
+
+    def test_stale(self, mock_get_categories):
+        """A stale index is used while it is refreshed in the background."""
+        refreshing = threading.Event()
+        mock_get_categories.side_effect = lambda: refreshing.wait() and iter(
+            [(1, "Ammo")]
+        )
+        index = store.CategoryIndex(ttl=60)
+
+        with open(index.path, "w") as f:
+            json.dump({"updated": time.time() - 120, "categories": {"1": "Old"}}, f)
+
+        assert index.get_name(1) == "Old"
+        assert index.get_id("Old") == 1
+
+        refreshing.set()
+        index._refresher.join()
+        assert index.get_name(1) == "Ammo"
+
+        with open(index.path) as f:
+            assert json.load(f)["categories"]["1"] == "Ammo"
+
+    def test_stale_refresh_fails(self, mock_get_categories):
+        """A stale index is kept when the refresh fails."""
+        mock_get_categories.side_effect = ConnectionError
+        index = store.CategoryIndex(ttl=60)
+
+        with open(index.path, "w") as f:
+            json.dump({"updated": time.time() - 120, "categories": {"1": "Old"}}, f)
+
+        assert index.get_name(1) == "Old"
+
+        index._refresher.join()
+        assert index.get_name(1) == "Old"
+
+    def test_expired(self, mock_get_categories):
+        """An index past its maximum age is refreshed before answering."""
+        index = store.CategoryIndex(ttl=60, max_age=600)
+
+        with open(index.path, "w") as f:
+            json.dump({"updated": time.time() - 1200, "categories": {"1": "Old"}}, f)
+
+        assert index.get_name(1) == "Ammo"
+        assert index._refresher is None
+
+    def test_expired_refresh_fails(self, mock_get_categories):
+        """An expired index is kept, and not refreshed again, when the refresh fails."""
+        mock_get_categories.side_effect = ConnectionError
+        index = store.CategoryIndex(ttl=60, max_age=600)
+
+        with open(index.path, "w") as f:
+            json.dump({"updated": time.time() - 1200, "categories": {"1": "Old"}}, f)
+
+        assert index.get_name(1) == "Old"
+        assert index.get_id("Old") == 1
+        mock_get_categories.assert_called_once()
+
+    def test_miss(self, mock_get_categories):
+        """A lookup miss refreshes the index at most once per interval."""
+        index = store.CategoryIndex(miss_interval=60)
+
+        with open(index.path, "w") as f:
+            json.dump({"updated": time.time() - 120, "categories": {"1": "Old"}}, f)
+
+        assert index.get_id("Swords") == 2
+        assert index.get_name(4) is None
+        assert index.get_id("Schwartz") is None
+        mock_get_categories.assert_called_once()
+
+    def test_shared(self, mock_get_categories):
+        """The same index is shared within a process."""
+        assert store.get_category_index() is store.get_category_index()
+
+
+class TestPaths:
+    """Test class for grand_exchanger.store.paths."""
+
+    def test_state_path(self, state_dir):
+        """Paths are created in the configured state directory."""
+        path = store.state_path("a", "b.json")
+
+        assert path == os.path.join(str(state_dir), "a", "b.json")
+        assert os.path.isdir(os.path.join(str(state_dir), "a"))
+
+    def test_write_atomic(self, state_dir):
+        """Files are replaced without leaving temporary files behind."""
+        path = store.state_path("file")
+        store.write_atomic(path, b"one")
+        store.write_atomic(path, b"two")
+
+        with open(path, "rb") as f:
+            assert f.read() == b"two"
+
+        assert os.listdir(str(state_dir)) == ["file"]
+
+    def test_write_atomic_fails(self, state_dir, mocker):
+        """A failed write keeps the old content and removes the temporary file."""
+        path = store.state_path("file")
+        store.write_atomic(path, b"one")
+        mocker.patch("os.replace", side_effect=OSError)
+
+        with pytest.raises(OSError):
+            store.write_atomic(path, b"two")
+
+        with open(path, "rb") as f:
+            assert f.read() == b"one"
+
+        assert os.listdir(str(state_dir)) == ["file"]
+
+
+class TestWatermarks:
+    """Test class for grand_exchanger.store.Watermarks."""
+
+    def test_is_new(self):
+        """Points after the watermark or updating it are new."""
+        watermarks = store.Watermarks()
+        assert watermarks.is_new(1, to_epoch(datetime(2020, 7, 1)), 100)
+
+        watermarks.advance(1, to_epoch(datetime(2020, 7, 2)), 100)
+        watermarks.advance(1, to_epoch(datetime(2020, 7, 1)), 90)
+
+        assert watermarks.get(1) == (1593648000, 100)
+        assert not watermarks.is_new(1, to_epoch(datetime(2020, 7, 1)), 90)
+        assert not watermarks.is_new(1, to_epoch(datetime(2020, 7, 2)), 100)
+        assert watermarks.is_new(1, to_epoch(datetime(2020, 7, 2)), 101)
+        assert watermarks.is_new(1, to_epoch(datetime(2020, 7, 3)), 100)
+
+    def test_is_current(self):
+        """Items listed at the price they had at today's point are current."""
+        watermarks = store.Watermarks()
+        watermarks.advance(1, to_epoch(datetime(2020, 7, 2)), 5912345)
+        noon = 1593648000 + 12 * 60 * 60
+
+        assert not watermarks.is_current(1, 5900000, now=noon)
+
+        watermarks.set_listed(1, 5900000)
+        watermarks.set_listed(2, 100)
+
+        assert watermarks.is_current(1, 5900000, now=noon)
+        assert not watermarks.is_current(1, 6000000, now=noon)
+        assert not watermarks.is_current(1, 5900000, now=noon + 24 * 60 * 60)
+        assert not watermarks.is_current(2, 100, now=noon)
+
+    def test_save(self):
+        """Watermarks are persisted."""
+        watermarks = store.Watermarks()
+        watermarks.advance(1, to_epoch(datetime(2020, 7, 2)), 100)
+        watermarks.set_listed(1, 100)
+        watermarks.advance(1, to_epoch(datetime(2020, 7, 3)), 110)
+        watermarks.save()
+
+        assert store.Watermarks().get(1) == (1593734400, 110)
+        assert store.Watermarks().is_current(1, 100, now=1593734400)
+
+    def test_save_concurrent(self):
+        """Crawls saving the same watermarks keep each other's newer marks."""
+        first = store.Watermarks()
+        second = store.Watermarks()
+        first.advance(1, to_epoch(datetime(2020, 7, 2)), 100)
+        first.advance(2, to_epoch(datetime(2020, 7, 3)), 200)
+        second.advance(2, to_epoch(datetime(2020, 7, 2)), 190)
+        second.advance(3, to_epoch(datetime(2020, 7, 2)), 300)
+        first.save()
+        second.save()
+
+        loaded = store.Watermarks()
+
+        assert loaded.get(1) == (1593648000, 100)
+        assert loaded.get(2) == (1593734400, 200)
+        assert loaded.get(3) == (1593648000, 300)
+        assert second.get(1) == (1593648000, 100)
+
+
+class TestLastPrices:
+    """Test class for grand_exchanger.store.LastPrices."""
+
+    def test_is_changed(self):
+        """Prices of items never output or moved since are changed."""
+        last_prices = store.LastPrices()
+        assert last_prices.is_changed(1, 100)
+
+        last_prices.update(1, 100)
+
+        assert not last_prices.is_changed(1, 100)
+        assert last_prices.is_changed(1, 101)
+
+    def test_keyframe(self):
+        """Keyframes are due once the interval has passed, unless disabled."""
+        last_prices = store.LastPrices()
+
+        assert last_prices.is_keyframe_due(60, now=1000)
+        assert not last_prices.is_keyframe_due(0, now=1000)
+
+        last_prices.mark_keyframe(now=1000)
+
+        assert not last_prices.is_keyframe_due(60, now=1059)
+        assert last_prices.is_keyframe_due(60, now=1060)
+
+    def test_save(self):
+        """Prices and the last keyframe are persisted."""
+        last_prices = store.LastPrices()
+        last_prices.update(1, 100)
+        last_prices.mark_keyframe(now=1000)
+        last_prices.save()
+
+        loaded = store.LastPrices()
+
+        assert len(loaded) == 1
+        assert not loaded.is_changed(1, 100)
+        assert not loaded.is_keyframe_due(60, now=1030)
+
+    def test_corrupt(self):
+        """Unreadable state starts over."""
+        with open(store.state_path("last_prices.json"), "w") as f:
+            f.write("[1, 2]")
+
+        assert len(store.LastPrices()) == 0
+
+
+class TestCheckpoint:
+    """Test class for grand_exchanger.store.Checkpoint."""
+
+    def test_resume(self):
+        """Items journaled by an interrupted crawl are resumed."""
+        checkpoint = store.Checkpoint("crawl")
+        checkpoint.start()
+        checkpoint.add(1)
+        checkpoint.save()
+        checkpoint.add(2)
+        checkpoint.save()
+        checkpoint.add(3)
+
+        resumed = store.Checkpoint("crawl")
+
+        assert resumed.resume() == 2
+        assert 1 in resumed and 2 in resumed and 3 not in resumed
+
+    def test_resume_other_crawl(self):
+        """Checkpoints of another crawl are not resumed."""
+        checkpoint = store.Checkpoint("crawl", path=store.state_path("journal"))
+        checkpoint.start()
+        checkpoint.add(1)
+        checkpoint.save()
+
+        other = store.Checkpoint("other", path=checkpoint.path)
+
+        assert other.resume() == 0
+        assert 1 not in other
+
+    def test_resume_other_settings(self):
+        """Checkpoints of the crawl with other settings are refused."""
+        checkpoint = store.Checkpoint("crawl", '{"format": "jsonl"}')
+        checkpoint.start()
+        checkpoint.add(1)
+        checkpoint.save()
+
+        with pytest.raises(exceptions.CheckpointMismatchException) as error:
+            store.Checkpoint("crawl", '{"format": "csv"}').resume()
+
+        assert error.value.args == ('{"format": "jsonl"}',)
+        assert store.Checkpoint("crawl", '{"format": "jsonl"}').resume() == 1
+
+    def test_resume_torn(self):
+        """A line torn by a crash is dropped when resuming."""
+        checkpoint = store.Checkpoint("crawl")
+        checkpoint.start()
+        checkpoint.add(1)
+        checkpoint.save()
+
+        with open(checkpoint.path, "ab") as f:
+            f.write(b"2 3")
+
+        assert store.Checkpoint("crawl").resume() == 1
+
+        with open(checkpoint.path, "rb") as f:
+            assert f.read() == b"crawl\t\n1\n"
+
+    def test_due(self):
+        """Checkpoints are due once per interval."""
+        checkpoint = store.Checkpoint("crawl", interval=0)
+        assert checkpoint.due()
+
+        checkpoint = store.Checkpoint("crawl", interval=60)
+        assert not checkpoint.due()
+
+    def test_clear(self):
+        """Journals of completed crawls are removed."""
+        checkpoint = store.Checkpoint("crawl")
+        checkpoint.start()
+        checkpoint.clear()
+        checkpoint.clear()
+
+        assert not os.path.exists(checkpoint.path)
+
+
+class TestCatalogue:
+    """Test class for grand_exchanger.store.Catalogue."""
+
+    @pytest.fixture
+    def entries(self):
+        """Fixture for catalogue entries."""
+        return [
+            store.CatalogueEntry(i, f"Item {i}", i % 3, i % 2 == 0, 100 * i)
+            for i in range(1, 1201)
+        ]
+
+    def test_get(self, entries):
+        """Entries are found by ID and persisted."""
+        store.get_catalogue().upsert(entries[:2])
+        store.reset()
+
+        assert store.get_catalogue().get(2) == entries[1]
+        assert store.get_catalogue().get(2).updated > time.time() - 60
+        assert store.get_catalogue().get(3) is None
+
+    def test_get_many(self, entries):
+        """Bulk lookups span several queries and skip unknown IDs."""
+        catalogue = store.get_catalogue()
+        catalogue.upsert(entries)
+
+        result = catalogue.get_many(list(range(1, 1300)) + [5])
+
+        assert len(result) == 1200
+        assert result[1200] == entries[-1]
+
+    def test_upsert_updates(self, entries):
+        """Upserting an entry replaces its price."""
+        catalogue = store.get_catalogue()
+        catalogue.upsert(entries[:1])
+        catalogue.upsert([store.CatalogueEntry(1, "Item 1", 1, False, 5)])
+
+        assert catalogue.get(1).price == 5
+        assert len(catalogue) == 1
+
+    def test_missing(self, entries):
+        """Unknown IDs are remembered until they are found or expire."""
+        catalogue = store.get_catalogue()
+        catalogue.mark_missing(1)
+        store.reset()
+
+        catalogue = store.get_catalogue()
+        assert catalogue.is_missing(1)
+        assert not catalogue.is_missing(2)
+
+        catalogue.missing_ttl = 0
+        assert not catalogue.is_missing(1)
+
+        catalogue.missing_ttl = 60
+        catalogue.upsert(entries[:1])
+        assert not catalogue.is_missing(1)